@@ -1,33 +1,49 @@
 # ==========================================
 # 라이브러리 불러오기 (import)
 # ==========================================
+# 무거운 라이브러리(google.genai, pandas, 문서 파서, 워드/Parquet 모듈)는 실제로 쓰는 곳에서 불러옵니다.
+# Streamlit 은 재실행마다 이 파일을 처음부터 다시 실행하고, 컨테이너가 새로 뜰 때마다 첫 화면이 그만큼 늦어지기 때문입니다.
+# (benchmarks/bench_cold_start.py 로 측정)
 import streamlit as st
-from google import genai
 import json
 import os
-from datetime import datetime, timedelta
-import docx
-from pypdf import PdfReader
-import random
-from pptx import Presentation as PptxPresentation
-import pandas as pd
-from io import BytesIO
-from docx import Document as DocxDocument
-from docx.shared import Cm, Pt, RGBColor
-from docx.enum.text import WD_COLOR_INDEX, WD_ALIGN_PARAGRAPH
-from docx.enum.table import WD_ROW_HEIGHT_RULE, WD_CELL_VERTICAL_ALIGNMENT 
-from docx.oxml.ns import qn 
-from docx.oxml import OxmlElement
+import hashlib
+import html
 import re
+import time
+from datetime import date, datetime
+import random
+import perf
+from card_store import DEFAULT_DECK, CardStore, normalize_deck
+from doc_extract import extract_document, extract_documents
+from llm_cache import ResponseCache
+from prompt_packer import calibrated_counter
+from job_queue import ACTIVE_STATUSES, DONE, FAILED, INTERRUPTED, JobQueue
+from generation import QUIZ_BATCH_SIZE, generate_quiz_batches, merge_summary_topics, stream_summary_topics
+from scheduler import DEFAULT_SCHEDULER, FORECAST_DAYS, GRADE_AGAIN, GRADE_GOOD, SCHEDULERS, forecast_due, get_scheduler
+
+perf.begin_rerun()  # 이번 재실행의 구간별 시간 기록 시작 (맨 아래 4번에서 마무리)
 
 # ==========================================
 # 1. 프로그램 기본 설정
 # ==========================================
 # [주의] 배포 시에는 st.secrets를 사용하세요.
 GOOGLE_API_KEY = st.secrets["GOOGLE_API_KEY"]
-client = genai.Client(api_key=GOOGLE_API_KEY)
 MODEL = 'gemini-2.5-flash'
-DB_FILE = "medical_flashcards.json"
+DB_FILE = "medical_flashcards.json"  # 이전 버전 JSON 저장소 (첫 실행 시 자동 이전)
+CARD_DB_FILE = "medical_flashcards.db"
+LLM_CACHE_DIR = ".llm_cache"  # Gemini 응답 캐시 (같은 모델/프롬프트 버전/입력이면 재사용)
+JOB_DB_FILE = "generation_jobs.db"  # 백그라운드 생성 작업 기록
+REVIEW_LOG_DIR = "review_log"  # 채점 기록 Parquet 세그먼트
+JOB_POLL_SECONDS = 1.5
+PROM_FILE = os.environ.get("AIDOCTOR_PROM_FILE")  # 지정하면 재실행마다 Prometheus 텍스트 형식으로 누적 계측값을 씁니다.
+CARDS_PER_PAGE = 20  # 문제 관리 탭 한 페이지에 그리는 카드 수
+
+# 프롬프트 칸별 글자 수 예산 (이만큼 읽으면 나머지 페이지는 추출하지 않음)
+# 파일에서 읽는 글자 수 상한입니다. 요청마다 실제로 넣는 분량은 generation.py 의 토큰 예산으로 정합니다.
+NOTE_CHAR_BUDGET = 30000     # 5문제(요청 1회)당. 족보와 관련 깊은 부분을 고를 수 있게 요청 분량보다 넉넉히 읽습니다.
+JOKBO_CHAR_BUDGET = 20000
+LECTURE_CHAR_BUDGET = 300000  # 강의는 구간으로 나눠 동시에 요약하므로 훨씬 길게 읽습니다.
 
 st.set_page_config(page_title="MEDI-Quiz", page_icon="🩺", layout="wide")
 
@@ -62,7 +78,7 @@ st.markdown("""
 
     /* 3. 탭 스타일 (4등분, 가운데 정렬) */
     [data-testid="stTabs"] [role="tablist"] { display: flex !important; width: 100% !important; }
-    [data-testid="stTabs"] button[role="tab"] { flex: 1 1 25% !important; justify-content: center !important; }
+    [data-testid="stTabs"] button[role="tab"] { flex: 1 1 20% !important; justify-content: center !important; }
     [data-testid="stTabs"] button[role="tab"] p { font-size: 1.3rem !important; text-align: center !important; }
 
     /* 4. 파일 업로더 디자인 커스터마이징 */
@@ -107,78 +123,241 @@ st.markdown("""
 # 2. 백엔드 함수들
 # ==========================================
 
-def set_cell_background(cell, color_hex):
-    cell_properties = cell._element.get_or_add_tcPr()
-    shading_elm = OxmlElement('w:shd')
-    shading_elm.set(qn('w:fill'), color_hex)
-    cell_properties.append(shading_elm)
-
-def set_font_style(run, font_name='맑은 고딕', font_size=9, is_bold=False):
-    run.font.name = font_name
-    run.font.size = Pt(font_size)
-    run.bold = is_bold
-    r = run._element
-    rPr = r.get_or_add_rPr()
-    fonts = OxmlElement('w:rFonts')
-    fonts.set(qn('w:eastAsia'), font_name) 
-    fonts.set(qn('w:ascii'), font_name)    
-    fonts.set(qn('w:hAnsi'), font_name)    
-    rPr.append(fonts)
-
-def load_cards():
-    if not os.path.exists(DB_FILE): return []
-    with open(DB_FILE, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-            return [card for card in data if 'options' in card and isinstance(card['options'], list)]
-        except: return []
-
-def save_all_cards(cards):
-    with open(DB_FILE, "w", encoding="utf-8") as f:
-        json.dump(cards, f, ensure_ascii=False, indent=4)
-
-def save_card_to_file(question, options, correct_index, explanation):
-    cards = load_cards()
-    cards.append({
-        "question": question, "options": options, "correct_index": correct_index,
-        "explanation": explanation, "next_review": datetime.now().strftime("%Y-%m-%d"), "interval": 1
-    })
-    save_all_cards(cards)
-
-def delete_card(index):
-    cards = load_cards()
-    if 0 <= index < len(cards): del cards[index]; save_all_cards(cards)
-
-def update_card_schedule(card_index, is_correct):
-    cards = load_cards()
-    if card_index < len(cards):
-        card = cards[card_index]
-        if is_correct:
-            card['interval'] = card['interval'] * 2 + 1
-            st.toast(f"🎉 정답! {card['interval']}일 뒤에 봅니다.")
+@st.cache_resource
+def get_client():
+    # 재실행마다 새로 만들지 않고 프로세스에서 하나를 같이 씁니다. (google.genai 는 불러오는 데만 0.7초 가량 걸립니다)
+    from google import genai
+    return genai.Client(api_key=GOOGLE_API_KEY)
+
+@st.cache_resource
+def get_card_store():
+    # 프로세스당 한 번만 열고, 기존 JSON(DB_FILE)이 있으면 첫 실행 때 자동으로 옮겨옵니다.
+    return CardStore(CARD_DB_FILE, legacy_json_path=DB_FILE)
+
+@st.cache_resource
+def get_response_cache():
+    return ResponseCache(LLM_CACHE_DIR)
+
+@st.cache_resource
+def get_job_queue():
+    return JobQueue(JOB_DB_FILE)
+
+@st.cache_resource
+def get_review_log():
+    from review_log import ReviewLog
+    return ReviewLog(REVIEW_LOG_DIR)
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def review_stats(deck, log_key):
+    # log_key(세그먼트 목록 + 버퍼의 마지막 채점 id)가 그대로면 통계를 다시 계산하지 않습니다.
+    from review_log import summarize
+    return summarize(get_review_log().load(get_card_store(), deck))
+
+def save_cards(cards, deck, store=None, source="", skipped=None):
+    # 생성된 문제 묶음을 한 번에 검사하고 하나의 트랜잭션으로 저장합니다. 덱에 이미 있는 비슷한 문제는 건너뜁니다.
+    # 반환: 실제로 저장한 문제 수. skipped(list) 를 넘기면 건너뛴 문제를 덧붙입니다. (CardStore.add_cards)
+    # 백그라운드 작업 스레드에서는 st.cache_resource 를 부를 수 없으므로 store 를 직접 넘겨받습니다.
+    # 태그 = 출처 문서 이름 + AI 가 붙인 주제(topic)
+    today = datetime.now().strftime("%Y-%m-%d")
+    source_tag = os.path.splitext(source)[0]
+    return (store or get_card_store()).add_cards([{
+        "question": c.get("question"), "options": c.get("options"), "correct_index": c.get("correct_index"),
+        "explanation": c.get("explanation", ""), "next_review": today, "interval": 1,
+        "source": source, "tags": [source_tag, c.get("topic")]
+    } for c in cards], deck, skipped=skipped)
+
+def update_card_schedule(card_id, is_correct, deck, expected_version=None, duration_ms=None):
+    # expected_version: 화면에 문제를 띄울 때의 카드 버전. 그 사이 같은 덱을 연 다른 창/학생이 먼저 채점했다면 덮어쓰지 않습니다.
+    # 다음 복습일은 사이드바에서 고른 스케줄러(SM-2/FSRS)가 정하고, 채점 기록(풀이 시간 포함)은 로그에 남습니다.
+    store = get_card_store()
+    card = store.get_card(card_id, deck)
+    if card:
+        scheduler = get_scheduler(st.session_state.get('scheduler_name', DEFAULT_SCHEDULER))
+        grade = GRADE_GOOD if is_correct else GRADE_AGAIN
+        state = scheduler.review(card, grade, date.today(), load=lambda start, end: store.due_histogram(start, end, deck))
+        if not store.record_review(card_id, state, grade, scheduler.name, deck, expected_version, duration_ms):
+            st.toast("⚠️ 다른 창에서 먼저 채점한 문제라 복습 일정은 그대로 둡니다.")
+            return
+        get_review_log().maybe_compact(store)
+        if is_correct: st.toast(f"🎉 정답! {state['interval']}일 뒤에 봅니다.")
+        else: st.toast(f"🥲 오답... {state['interval']}일 뒤에 다시 복습!")
+
+def get_summary_docx(summary_data):
+    # 워드 파일은 정리본 내용(해시)이 바뀔 때만 렌더링하고, 그 외 rerun 에서는 저장된 바이트를 그대로 씁니다.
+    cached = st.session_state.get('summary_docx')
+    if cached and cached[0] is summary_data: return cached[2]
+    from summary_docx import render_summary_docx
+    digest = hashlib.sha256(json.dumps(summary_data, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+    docx_bytes = cached[2] if cached and cached[1] == digest else render_summary_docx(summary_data)
+    st.session_state['summary_docx'] = (summary_data, digest, docx_bytes)
+    return docx_bytes
+
+def summary_preview_html(summary_data):
+    # 생성 중인 정리본 미리보기 (워드와 같은 색상 태그를 CSS 클래스로 표시)
+    def cell(text):
+        text = html.escape(text or "").replace("\n", "<br>")
+        return re.sub(r'&lt;(yellow|blue|gray)&gt;(.*?)&lt;/\1&gt;', r'<span class="hl-\1">\2</span>', text)
+    parts = []
+    for item in summary_data:
+        rows = "".join(
+            f"<tr><td><b>{cell(sub.get('key'))}</b></td><td>{cell(sub.get('sub_key'))}</td><td>{cell(sub.get('value'))}</td></tr>"
+            for sub in item.get('sub_sections') or []
+        )
+        parts.append(f"<h4>{cell(item.get('main_topic'))}</h4><table>{rows}</table>")
+    return "".join(parts)
+
+# ── 백그라운드 생성 작업 ──
+def _failure_info(no, error):
+    return {"no": no, "error": str(error), "json_error": isinstance(error, json.JSONDecodeError), "raw": getattr(error, "doc", None)}
+
+def run_quiz_job(report, client, store, deck, source, response_cache, note_pages, jokbo_text, quiz_count, refresh):
+    # 구간별 요청을 동시에 보내고, 끝난 배치부터 바로 저장합니다.
+    n_batches = -(-quiz_count // QUIZ_BATCH_SIZE)
+    saved_count, duplicates, failures, done, skipped = 0, 0, [], 0, []
+    stats = {}  # 이 작업의 요청만 셉니다. (response_cache.stats 는 프로세스 전체라 동시에 도는 다른 작업과 섞임)
+    count = calibrated_counter(client, MODEL, ["\n".join(note_pages[:5]), jokbo_text])
+    for batch_no, quizzes, error in generate_quiz_batches(client, MODEL, note_pages, jokbo_text, quiz_count, response_cache, refresh, count=count, stats=stats):
+        done += 1
+        if error is None and not (isinstance(quizzes, list) and len(quizzes) > 0):
+            error = ValueError("형식 오류: AI가 문제를 생성하지 못하고 빈 배열을 반환했습니다. 정리본 내용을 조금 더 추가해 보세요.")
+        if error is None:
+            try:
+                saved = save_cards(quizzes, deck, store, source, skipped)
+                saved_count += saved
+                duplicates += len(quizzes) - saved
+            except ValueError as e: error = e
+        if error is not None: failures.append(_failure_info(batch_no, error))
+        result = {"saved": saved_count, "duplicates": duplicates, "skipped": skipped, "cache_hits": stats.get("cache_hits", 0),
+                  "shortfall": stats.get("shortfall", 0), "failures": failures}
+        report(done / n_batches, f"{done}/{n_batches}개 묶음 완료 · {saved_count}문제 저장됨", result)
+    return result
+
+def run_summary_job(report, client, response_cache, lecture_pages, jokbo_text, refresh):
+    # 강의를 구간별로 나눠 동시에 스트리밍 요청하고, 주제가 완성될 때마다 합쳐서 중간 결과로 남깁니다.
+    # 중간에 끊겨도(서버 재시작/오류) 받은 주제까지는 작업 기록에 남습니다.
+    chunk_topics, failures, summary_data = {}, [], []
+    count = calibrated_counter(client, MODEL, ["\n".join(lecture_pages[:5]), jokbo_text])
+    for chunk_no, topic, error in stream_summary_topics(client, MODEL, lecture_pages, jokbo_text, response_cache, refresh, count=count):
+        if error is not None: failures.append(_failure_info(chunk_no, error))
         else:
-            card['interval'] = 1
-            st.toast("🥲 오답... 내일 다시 복습!")
-        card['next_review'] = (datetime.now() + timedelta(days=card['interval'])).strftime("%Y-%m-%d")
-        save_all_cards(cards)
+            chunk_topics.setdefault(chunk_no, []).append(topic)
+            summary_data = merge_summary_topics(chunk_topics[no] for no in sorted(chunk_topics))
+        report(None, f"📥 지금까지 {len(summary_data)}개 주제를 받았습니다...", {"summary_data": summary_data, "failures": failures})
+    return {"summary_data": summary_data, "failures": failures}
+
+def current_job(session_key):
+    # 세션이나 주소창(query param)에 남은 작업 id 로 작업을 찾습니다. 새로고침해도 같은 작업을 이어서 봅니다.
+    job_id = st.session_state.get(session_key) or st.query_params.get(session_key)
+    if not job_id: return None
+    st.session_state[session_key] = job_id
+    return get_job_queue().get(job_id)
+
+def start_job(session_key, kind, func, *args):
+    job_id = get_job_queue().submit(kind, func, *args)
+    st.session_state[session_key] = job_id
+    st.query_params[session_key] = job_id
+
+@st.fragment(run_every=JOB_POLL_SECONDS)
+def show_job_progress(session_key):
+    # 이 부분만 주기적으로 다시 그려서 진행 상황을 갱신합니다. 작업이 끝나면 전체 화면을 다시 그립니다.
+    job = get_job_queue().get(st.session_state[session_key])
+    if job is None or job['status'] not in ACTIVE_STATUSES: st.rerun()
+    st.caption("⏳ 생성은 백그라운드에서 진행됩니다. 그동안 다른 탭에서 모의고사를 풀어도 됩니다.")
+    if job['kind'] == 'summary':
+        st.info(job['message'] or "AI가 강의와 족보를 분석하고 있습니다... 완성된 주제부터 아래에 표시됩니다.")
+        if job['result'] and job['result']['summary_data']:
+            st.markdown(summary_preview_html(job['result']['summary_data']), unsafe_allow_html=True)
+    else:
+        st.progress(job['progress'], text=job['message'] or "문제 출제를 준비하고 있습니다...")
+
+def show_failures(failures, unit):
+    for failure in failures:
+        if failure['json_error']:
+            st.error(f"{failure['no']}번 {unit}: AI가 올바른 형식(JSON)으로 만들지 못했습니다. 다시 시도해 주세요.")
+            with st.expander(f"{failure['no']}번 {unit} AI 응답 원본 확인 (디버깅용)"):
+                st.write(failure['raw'] or "응답 없음")
+        else:
+            st.error(f"{failure['no']}번 {unit} 오류: {failure['error']}")
+
+def show_skipped(skipped):
+    # 비슷한 문제가 있어 저장하지 않은 문제와 그 기존 문제를 나란히 보여 줍니다.
+    if not skipped: return
+    with st.expander(f"♻️ 건너뛴 문제 보기 ({len(skipped)}개)"):
+        for item in skipped: st.markdown(f"- {item['question']}  \n  ↳ 기존 문제: {item['similar_to']}")
+
+def show_quiz_job_result(job):
+    result = job['result'] or {}
+    if job['status'] == INTERRUPTED: st.warning("⚠️ 서버가 다시 시작되어 출제가 중단되었습니다. 그 전까지 만든 문제는 저장되어 있습니다.")
+    elif job['status'] == FAILED: st.error(f"오류: {job['error']}")
+    if result.get('saved'):
+        st.success(f"✅ {result['saved']}개 문제가 생성되어 저장되었습니다! '실전 모의고사' 탭에서 확인하세요.")
+        if result.get('cache_hits'):
+            st.caption(f"💾 저장된 AI 응답 {result['cache_hits']}개를 재사용했습니다. 새 문제가 필요하면 '새로 생성'을 체크하세요.")
+    if result.get('shortfall'):
+        st.warning(f"⚠️ {result['shortfall']}문제 부족: AI 응답 일부가 형식이 틀려 다시 요청했지만 요청한 개수를 다 채우지 못했습니다.")
+    if result.get('duplicates'):
+        st.info(f"♻️ 덱에 이미 있는 것과 비슷한 문제 {result['duplicates']}개는 저장하지 않았습니다.")
+        show_skipped(result.get('skipped'))
+    show_failures(result.get('failures', []), "묶음")
+
+def show_summary_job_result(job):
+    result = job['result'] or {}
+    # 끝난(또는 끊긴) 작업의 결과는 한 번만 정리본으로 옮기고 워드도 그때 한 번 렌더링합니다.
+    if result.get('summary_data') and st.session_state.get('summary_job_applied') != job['id']:
+        st.session_state['summary_job_applied'] = job['id']
+        st.session_state['summary_data'] = result['summary_data']
+        get_summary_docx(result['summary_data'])
+        failed_chunks = sorted(failure['no'] for failure in result['failures'])
+        if job['status'] != DONE:
+            st.session_state['summary_warning'] = "⚠️ 생성이 끝나기 전에 중단되어 일부 주제만 들어 있습니다."
+        elif failed_chunks:
+            st.session_state['summary_warning'] = f"⚠️ {len(failed_chunks)}개 구간({', '.join(map(str, failed_chunks))})은 생성 도중 실패해 받은 부분까지만 들어 있습니다."
+    if result.get('summary_data'): return
+    if job['status'] == FAILED: st.error(f"오류: {job['error']}")
+    elif job['status'] == INTERRUPTED: st.error("서버가 다시 시작되어 정리본 생성이 중단되었습니다. 다시 시도해 주세요.")
+    show_failures(result.get('failures', []), "구간")
+
+# ── 문제 관리 탭: 선택한 카드 id 는 페이지를 넘겨도 유지되도록 세션에 집합으로 둡니다 (위젯 콜백) ──
+def toggle_card_selection(card_id):
+    if st.session_state[f"chk_{card_id}"]: st.session_state['selected_card_ids'].add(card_id)
+    else: st.session_state['selected_card_ids'].discard(card_id)
+
+def set_card_selection(card_ids, checked):
+    for card_id in card_ids:
+        if checked: st.session_state['selected_card_ids'].add(card_id)
+        else: st.session_state['selected_card_ids'].discard(card_id)
+        st.session_state[f"chk_{card_id}"] = checked
+
+def clear_card_selection():
+    # 지운 카드가 선택 개수에 남지 않도록 선택 집합과 체크박스 상태를 모두 비웁니다.
+    st.session_state['selected_card_ids'].clear()
+    for key in [key for key in st.session_state if str(key).startswith("chk_")]: del st.session_state[key]
+
+def delete_selected_cards(deck):
+    deleted = get_card_store().delete_cards(list(st.session_state['selected_card_ids']), deck)
+    clear_card_selection()
+    st.session_state['card_delete_notice'] = f"🗑️ {deleted}개 문제를 삭제했습니다."
+
+def delete_all_matching(deck, query, tag):
+    # 검색 결과(검색 조건이 없으면 덱 전체)를 지웁니다. 확인 체크는 다음 일괄 삭제를 위해 다시 풉니다.
+    store = get_card_store()
+    deleted = store.delete_matching(deck, query, tag) if query or tag else store.clear_deck(deck)
+    clear_card_selection()
+    st.session_state['confirm_bulk_delete'] = False
+    st.session_state['card_delete_notice'] = f"🗑️ {deleted}개 문제를 삭제했습니다."
+
+def extract_upload(file, max_chars=None):
+    # 업로드 파일의 텍스트 추출 (내용 해시 캐시 + PDF 페이지 병렬 추출, 예산 도달 시 중단, 소요 시간 포함)
+    return extract_document(file.name, file.getvalue(), max_chars)
 
 def read_file(file):
-    try:
-        if file.name.endswith('.pdf'):
-            reader = PdfReader(file)
-            return "\n".join([page.extract_text() or "" for page in reader.pages])
-        elif file.name.endswith('.docx'):
-            doc = docx.Document(file)
-            texts = []
-            for para in doc.paragraphs:
-                if para.text.strip(): texts.append(para.text)
-            for table in doc.tables:
-                for row in table.rows:
-                    row_texts = [cell.text.strip() for cell in row.cells if cell.text.strip()]
-                    if row_texts: texts.append(" | ".join(row_texts))
-            return "\n".join(texts)
-    except: return ""
-    return ""
+    return extract_upload(file)["text"]
+
+def show_extract_timings(results):
+    def describe(r):
+        if r.get('skipped'): return f"{r['name']} (글자 수 예산 초과로 건너뜀)"
+        return f"{r['name']} {r['pages']}쪽 {r['seconds']:.2f}초" + (" (캐시)" if r['cached'] else "") + (" (앞부분만)" if r['truncated'] else "")
+    st.caption("⏱️ " + " · ".join(describe(r) for r in results))
 
 # ==========================================
 # 3. 화면 구성
@@ -188,125 +367,98 @@ st.markdown("<h1 style='text-align: center; color: #FF6B35; font-size: 3.2rem; m
 if 'generated_quiz' not in st.session_state: st.session_state['generated_quiz'] = None
 if 'show_explanation' not in st.session_state: st.session_state['show_explanation'] = False
 if 'summary_data' not in st.session_state: st.session_state['summary_data'] = None
-
-tab4, tab1, tab2, tab3 = st.tabs(["📋 정리본 형성", "📝 문제 생성", "🧠 실전 모의고사", "🗂️ 문제 관리"])
+if 'selected_card_ids' not in st.session_state: st.session_state['selected_card_ids'] = set()
+
+# 덱 선택: 같은 서버를 여러 학생이 쓰므로 문제와 복습 일정은 덱별로 따로 저장됩니다. (주소창 ?deck=이름 으로 공유/북마크)
+with st.sidebar:
+    deck = normalize_deck(st.text_input("📚 덱 이름", value=st.query_params.get("deck", DEFAULT_DECK), key="deck_name", help="학생마다(또는 과목마다) 다른 이름을 쓰면 문제가 섞이지 않습니다."))
+    st.selectbox(
+        "⏱️ 복습 일정 방식", list(SCHEDULERS), format_func=lambda name: SCHEDULERS[name].label, key="scheduler_name",
+        help="SM-2: 맞힐 때마다 간격 × 쉬움 정도. FSRS: 기억이 90% 아래로 떨어질 시점을 예측해 복습일을 잡습니다."
+    )
+if st.query_params.get("deck") != deck: st.query_params["deck"] = deck
+
+# 첫 실행 때 예전 JSON 에서 형식이 틀려 옮기지 못한 카드가 있으면 한 번 알려 줍니다. (원본 파일은 그대로 있음)
+legacy_import = get_card_store().legacy_import
+if legacy_import and legacy_import['skipped'] and not st.session_state.get('legacy_import_noticed'):
+    st.session_state['legacy_import_noticed'] = True
+    st.warning(f"⚠️ 예전 {DB_FILE} 에서 카드 {legacy_import['cards']}장을 옮겼고, 형식이 틀린 {legacy_import['skipped']}장은 건너뛰었습니다. (원본 파일은 그대로 남아 있습니다)")
+
+# 탭을 바꾸면 다시 실행해서, 위젯이 없는 통계 탭은 열려 있을 때만 계산합니다. (.open)
+# 다른 탭은 업로드한 파일/입력값이 사라지지 않도록 항상 그립니다.
+tab4, tab1, tab2, tab3, tab5 = st.tabs(["📋 정리본 형성", "📝 문제 생성", "🧠 실전 모의고사", "🗂️ 문제 관리", "📊 학습 통계"], key="main_tab", on_change="rerun")
 
 # ==========================================
 # [탭 1] 문제 생성 (AI 쫄보 방지 및 5문제 강제 출제)
 # ==========================================
 with tab1:
     quiz_note_content = ""
+    quiz_note_pages = []
     quiz_jokbo_content = ""
+    # 문제 수 입력은 아래에 있지만, 값은 미리 알 수 있으므로 필요한 만큼만 정리본을 읽습니다.
+    quiz_count = st.session_state.get("quiz_count", QUIZ_BATCH_SIZE)
     col_q1, col_q2 = st.columns(2)
 
     with col_q1:
         quiz_note_file = st.file_uploader("정리본 업로드", type=['docx', 'pdf', 'pptx'], key="quiz_note_uploader", label_visibility="collapsed")
         if quiz_note_file:
-            if quiz_note_file.name.endswith('.pptx'):
-                try:
-                    prs = PptxPresentation(quiz_note_file)
-                    txt = []
-                    for slide in prs.slides:
-                        for shape in slide.shapes:
-                            if shape.has_text_frame: txt.append(shape.text_frame.text)
-                    quiz_note_content = "\n".join(txt)
-                except: pass
-            else:
-                quiz_note_content = read_file(quiz_note_file)
+            quiz_note_result = extract_upload(quiz_note_file, NOTE_CHAR_BUDGET * -(-quiz_count // QUIZ_BATCH_SIZE))
+            quiz_note_content = quiz_note_result["text"]
+            quiz_note_pages = [page for page in quiz_note_result["page_texts"] if page.strip()]
             if quiz_note_content:
                 st.success(f"정리본 읽기 성공! ({len(quiz_note_content)}자)")
+                show_extract_timings([quiz_note_result])
 
 
     with col_q2:
         quiz_jokbo_file = st.file_uploader("족보 업로드", type=['docx', 'pdf'], key="quiz_jokbo_uploader", label_visibility="collapsed")
         if quiz_jokbo_file:
-            quiz_jokbo_content = read_file(quiz_jokbo_file)
+            quiz_jokbo_result = extract_upload(quiz_jokbo_file, JOKBO_CHAR_BUDGET)
+            quiz_jokbo_content = quiz_jokbo_result["text"]
             if quiz_jokbo_content:
                 st.success(f"족보 읽기 성공! ({len(quiz_jokbo_content)}자)")
+                show_extract_timings([quiz_jokbo_result])
 
     st.divider()
     has_jokbo = bool(quiz_jokbo_content)
-
-    if st.button("⚡ 5문제 출제하기", type="primary", use_container_width=True, disabled=not bool(quiz_note_content)):
-        spinner_msg = "족보의 형식을 벤치마킹하여 정리본에서 5문제를 꽉 채워 출제 중입니다..." if has_jokbo else "정리본을 바탕으로 5문제를 만들고 있습니다..."
-        with st.spinner(spinner_msg):
-            try:
-                if has_jokbo:
-                    prompt = f"""
-                    아래는 의대생이 공부한 정리본입니다. 이 학생이 정리본의 내용을 제대로 암기했는지 테스트하는 객관식 문제 5개를 만드세요.
-
-                    [규칙]
-                    - 정리본에 직접 나오는 질환명, 증상, 진단법, 치료법, 수치 등을 묻는 문제를 만드세요.
-                    - "만약~했다면", "어떤 유형의 지식을~" 같은 메타 질문은 절대 만들지 마세요.
-                    - 예시: "~의 1차 치료제는?", "~에서 나타나는 특징적 소견은?", "~의 진단 기준으로 옳은 것은?"
-                    - [족보]의 문제 형식(문체, 보기 개수)만 참고하세요.
-
-                    [정리본]
-                    {quiz_note_content[:15000]}
-
-                    [족보 - 형식 참고용]
-                    {quiz_jokbo_content[:20000]}
-
-                    JSON 배열로 5개 출력:
-                    [{{"question": "질문", "options": ["보기1", "보기2", ...], "correct_index": 0, "explanation": "해설"}}]
-                    """
-                else:
-                    prompt = f"""
-                    아래는 의대생이 공부한 정리본입니다. 이 학생이 정리본의 내용을 제대로 암기했는지 테스트하는 5지선다형 객관식 문제 5개를 만드세요.
-
-                    [규칙]
-                    - 정리본에 직접 나오는 질환명, 증상, 진단법, 치료법, 수치 등을 묻는 문제를 만드세요.
-                    - "만약~했다면", "어떤 유형의 지식을~" 같은 메타 질문은 절대 만들지 마세요.
-                    - 예시: "~의 1차 치료제는?", "~에서 나타나는 특징적 소견은?", "~의 진단 기준으로 옳은 것은?"
-
-                    [정리본]
-                    {quiz_note_content[:15000]}
-
-                    JSON 배열로 5개 출력:
-                    [{{"question": "질문", "options": ["보기1", "보기2", "보기3", "보기4", "보기5"], "correct_index": 0, "explanation": "해설"}}]
-                    """
-                
-                # 강제 JSON 출력 옵션 유지
-                response = client.models.generate_content(
-                    model=MODEL, 
-                    contents=prompt,
-                    config={"response_mime_type": "application/json"}
-                )
-                
-                quizzes = json.loads(response.text)
-
-                if isinstance(quizzes, list) and len(quizzes) > 0:
-                    for quiz in quizzes:
-                        save_card_to_file(quiz['question'], quiz['options'], quiz['correct_index'], quiz['explanation'])
-                    st.success(f"✅ {len(quizzes)}개 문제가 생성되어 저장되었습니다! '실전 모의고사' 탭에서 확인하세요.")
-                else: 
-                    st.error("형식 오류: AI가 문제를 생성하지 못하고 빈 배열을 반환했습니다. 정리본 내용을 조금 더 추가해 보세요.")
-            except json.JSONDecodeError:
-                st.error("AI가 올바른 형식(JSON)으로 문제를 만들지 못했습니다. 다시 시도해 주세요.")
-                with st.expander("AI 응답 원본 확인 (디버깅용)"):
-                    st.write(response.text if 'response' in locals() else "응답 없음")
-            except Exception as e: 
-                st.error(f"오류: {e}")
+    quiz_count = st.number_input("출제할 문제 수", min_value=QUIZ_BATCH_SIZE, max_value=100, value=QUIZ_BATCH_SIZE, step=QUIZ_BATCH_SIZE, key="quiz_count")
+    quiz_refresh = st.checkbox("🔄 저장된 AI 응답을 쓰지 않고 새로 생성", key="quiz_refresh")
+
+    quiz_job = current_job('quiz_job')
+    quiz_running = bool(quiz_job) and quiz_job['status'] in ACTIVE_STATUSES
+    if st.button(f"⚡ {quiz_count}문제 출제하기", type="primary", use_container_width=True, disabled=not bool(quiz_note_content) or quiz_running):
+        start_job(
+            'quiz_job', 'quiz', run_quiz_job, get_client(), get_card_store(), deck, quiz_note_file.name, get_response_cache(),
+            quiz_note_pages, quiz_jokbo_content, quiz_count, quiz_refresh
+        )
+        st.rerun()
+
+    if quiz_running:
+        st.caption("족보의 형식을 벤치마킹하여 정리본에서 문제를 꽉 채워 출제 중입니다..." if has_jokbo else "정리본을 바탕으로 문제를 만들고 있습니다...")
+        show_job_progress('quiz_job')
+    elif quiz_job: show_quiz_job_result(quiz_job)
 
 # ==========================================
 # [탭 2] 실전 모의고사
 # ==========================================
 with tab2:
-    cards = load_cards()
+    store = get_card_store()
     today = datetime.now().strftime("%Y-%m-%d")
-    due_cards = [(i, c) for i, c in enumerate(cards) if c['next_review'] <= today]
+    # 가장 오래 밀린 카드 1장과 남은 개수만 인덱스로 조회합니다.
+    card = store.next_due_card(today, deck)
 
-    if not due_cards:
+    if card is None:
         st.info("🎉 오늘 풀 문제가 없습니다!")
     else:
-        idx, card = due_cards[0]
+        idx = card['id']
         if 'current_quiz_idx' not in st.session_state or st.session_state.current_quiz_idx != idx:
             st.session_state.current_quiz_idx = idx
             st.session_state.selected_opt = None
             st.session_state.eliminated_opts = set()
             st.session_state.show_explanation = False
+            st.session_state.question_started = time.time()
 
-        st.write(f"남은 문제: **{len(due_cards)}개**")
+        st.write(f"남은 문제: **{store.due_count(today, deck)}개**")
         st.markdown(f"""<div class="question-box"><b>Q.</b> {card['question']}</div>""", unsafe_allow_html=True)
         st.write("---")
 
@@ -345,10 +497,11 @@ with tab2:
             if st.session_state.selected_opt is None: st.warning("답을 선택해주세요!")
             else:
                 st.session_state.show_explanation = True
+                duration_ms = int((time.time() - st.session_state.question_started) * 1000)
                 if st.session_state.selected_opt == card['correct_index']:
-                    st.balloons(); st.success("✅ 정답입니다!"); update_card_schedule(idx, True)
+                    st.balloons(); st.success("✅ 정답입니다!"); update_card_schedule(idx, True, deck, card['version'], duration_ms)
                 else:
-                    st.error(f"❌ 오답입니다. 정답은 {circle_numbers[card['correct_index']]}번 입니다."); update_card_schedule(idx, False)
+                    st.error(f"❌ 오답입니다. 정답은 {circle_numbers[card['correct_index']]}번 입니다."); update_card_schedule(idx, False, deck, card['version'], duration_ms)
                 st.rerun()
 
         if st.session_state.show_explanation:
@@ -356,21 +509,54 @@ with tab2:
             if st.button("➡️ 다음 문제 풀기", type="primary", use_container_width=True):
                 st.session_state.show_explanation = False; st.rerun()
 
+    # 덱 전체의 앞으로 90일 복습량 (매번 맞힌다고 가정한 예측). 펼쳤을 때만 계산합니다.
+    forecast_box = st.expander(f"📅 앞으로 {FORECAST_DAYS}일 복습 예정", key="forecast_open", on_change="rerun")
+    if forecast_box.open:
+        with forecast_box:
+            forecast = forecast_due(store.schedule_rows(deck), date.today())
+            if forecast.sum() == 0: st.caption("예정된 복습이 없습니다.")
+            else:
+                st.bar_chart(forecast)
+                st.caption(f"하루 최대 {forecast.max()}장 · 평균 {forecast.mean():.1f}장")
+
 # ==========================================
 # [탭 3] 문제 관리
 # ==========================================
 with tab3:
     st.header("🗂️ 문제 리스트")
-    cards = load_cards()
-    if not cards: st.write("저장된 문제가 없습니다.")
+    if st.session_state.get('card_delete_notice'): st.toast(st.session_state.pop('card_delete_notice'))
+    store = get_card_store()
+    # 전문 검색 + 태그로 거른 뒤, 현재 페이지 카드만 읽어서 그립니다.
+    col_search, col_tag = st.columns([3, 2])
+    with col_search:
+        search_query = st.text_input("🔍 검색 (문제 · 보기 · 해설 · 태그)", key="card_search", placeholder="예: 간염 IgM")
+    with col_tag:
+        tag_labels = {tag: f"{tag} ({count})" for tag, count in store.tag_counts(deck)}
+        search_tag = st.selectbox("🏷️ 태그", [None] + list(tag_labels), format_func=lambda tag: "전체" if tag is None else tag_labels[tag], key="card_tag")
+
+    # 덱/검색 조건이 바뀌면 첫 페이지로 돌아갑니다. 선택해 둔 카드는 덱이 바뀔 때만 비웁니다.
+    if st.session_state.get('card_search_key') != (deck, search_query, search_tag):
+        if st.session_state.get('card_search_key', (deck,))[0] != deck: set_card_selection(list(st.session_state['selected_card_ids']), False)
+        st.session_state['card_search_key'] = (deck, search_query, search_tag)
+        st.session_state['card_page_starts'] = [0]
+    # 페이지는 "직전 페이지 마지막 카드 id" 목록으로 기억합니다. (앞에서 카드가 지워져도 다음 페이지가 밀리지 않음)
+    page_starts = st.session_state['card_page_starts']
+    cards, total = store.search_cards(deck, search_query, search_tag, CARDS_PER_PAGE, page_starts[-1])
+    while not cards and len(page_starts) > 1:  # 이 페이지 카드가 모두 지워졌으면 앞 페이지로
+        page_starts.pop()
+        cards, total = store.search_cards(deck, search_query, search_tag, CARDS_PER_PAGE, page_starts[-1])
+    page, n_pages = len(page_starts), max(1, -(-total // CARDS_PER_PAGE))
+    selected_ids = st.session_state['selected_card_ids']
+
+    if not total: st.write("검색 결과가 없습니다." if search_query or search_tag else "저장된 문제가 없습니다.")
     else:
         circle_numbers = ["①", "②", "③", "④", "⑤"]
-        selected_for_delete = []
+        st.caption(f"{total}개 중 {(page - 1) * CARDS_PER_PAGE + 1}~{(page - 1) * CARDS_PER_PAGE + len(cards)}번째")
 
         for i, card in enumerate(cards):
             col_exp, col_chk = st.columns([20, 1])
             with col_exp:
-                with st.expander(f"#{i+1}. {card['question'][:50]}..."):
+                with st.expander(f"#{(page - 1) * CARDS_PER_PAGE + i + 1}. {card['question'][:50]}..."):
                     st.markdown(f'<div class="question-box">**Q.** {card["question"]}</div>', unsafe_allow_html=True)
                     st.markdown('<div class="options-box">', unsafe_allow_html=True)
                     for opt_i, opt_text in enumerate(card['options']):
@@ -380,265 +566,182 @@ with tab3:
                             st.markdown(f'<div class="option-item"><span class="option-number">{circle_numbers[opt_i]}</span><span>{opt_text}</span></div>', unsafe_allow_html=True)
                     st.markdown('</div>', unsafe_allow_html=True)
                     st.caption(f"💡 해설: {card['explanation']}")
+                    if card['tags']: st.caption("🏷️ " + " · ".join(card['tags']))
             with col_chk:
-                if st.checkbox("", key=f"chk_{i}", label_visibility="collapsed"):
-                    selected_for_delete.append(i)
+                # 체크박스는 카드 id 로 구분하고, 선택 상태는 페이지를 넘겨도 selected_card_ids 에 남습니다.
+                chk_key = f"chk_{card['id']}"
+                if chk_key not in st.session_state: st.session_state[chk_key] = card['id'] in selected_ids
+                st.checkbox("", key=chk_key, on_change=toggle_card_selection, args=(card['id'],), label_visibility="collapsed")
+
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("◀ 이전", use_container_width=True, disabled=page <= 1):
+                page_starts.pop()
+                st.rerun()
+        with col_page:
+            st.markdown(f"<div style='text-align: center;'>{page} / {n_pages} 페이지</div>", unsafe_allow_html=True)
+        with col_next:
+            if st.button("다음 ▶", use_container_width=True, disabled=page >= n_pages):
+                page_starts.append(cards[-1]['id'])
+                st.rerun()
 
         st.divider()
+        col_sel1, col_sel2 = st.columns([1, 1])
+        with col_sel1:
+            st.button("☑️ 이 페이지 전체 선택", use_container_width=True, on_click=set_card_selection, args=([card['id'] for card in cards], True))
+        with col_sel2:
+            st.button(f"선택 해제 ({len(selected_ids)}개)", use_container_width=True, disabled=not selected_ids, on_click=set_card_selection, args=(list(selected_ids), False))
         col_btn1, col_btn2 = st.columns([1, 1])
         with col_btn1:
-            if st.button(f"🗑️ 선택 삭제 ({len(selected_for_delete)}개)", type="primary", use_container_width=True, disabled=len(selected_for_delete) == 0):
-                remaining = [c for i, c in enumerate(cards) if i not in selected_for_delete]
-                save_all_cards(remaining)
-                st.rerun()
+            # 다른 페이지에서 고른 카드까지 id 집합으로 한 번에 지웁니다.
+            st.button(f"🗑️ 선택 삭제 ({len(selected_ids)}개)", type="primary", use_container_width=True, disabled=not selected_ids, on_click=delete_selected_cards, args=(deck,))
         with col_btn2:
-            if st.button("🗑️ 전체 삭제", type="secondary", use_container_width=True):
-                save_all_cards([])
-                st.rerun()
+            # 수천 장을 한 번에 지울 수 있고 되돌릴 수 없으므로 확인 체크를 먼저 받습니다.
+            confirm_bulk = st.checkbox("일괄 삭제 확인 (되돌릴 수 없음)", key="confirm_bulk_delete")
+            bulk_label = f"🗑️ 검색 결과 전체 삭제 ({total}개)" if search_query or search_tag else f"🗑️ 덱 전체 삭제 ({total}개)"
+            st.button(bulk_label, type="secondary", use_container_width=True, disabled=not confirm_bulk,
+                      on_click=delete_all_matching, args=(deck, search_query, search_tag))
+
+    # 덱 파일로 옮기기/나누기. pyarrow 는 이 버튼을 눌렀을 때만 불러옵니다.
+    with st.expander("📦 덱 내보내기 / 가져오기"):
+        col_export, col_import = st.columns(2)
+        with col_export:
+            export_fmt = st.radio("형식", ["parquet", "jsonl.gz"], horizontal=True, key="deck_export_fmt")
+            if st.button(f"'{deck}' 덱 파일 만들기", use_container_width=True, disabled=not total):
+                import io
+                import deck_io
+                buffer = io.BytesIO()
+                with st.spinner("덱 파일을 만드는 중..."):
+                    counts = deck_io.export_deck(store, deck, buffer, export_fmt, review_log=get_review_log())
+                st.session_state['deck_export'] = (f"{deck}.{export_fmt}", buffer.getvalue(), counts)
+            if st.session_state.get('deck_export'):
+                file_name, data, counts = st.session_state['deck_export']
+                st.caption(f"카드 {counts['cards']:,}장 · 채점 기록 {counts['reviews']:,}건 · {len(data) / 1024:,.0f}KB")
+                st.download_button("💾 덱 파일 받기", data=data, file_name=file_name, mime="application/octet-stream", use_container_width=True)
+        with col_import:
+            deck_file = st.file_uploader("덱 파일 (.parquet / .jsonl.gz / 예전 .json)", type=['parquet', 'gz', 'json'], key="deck_import_file")
+            if deck_file and st.button(f"'{deck}' 덱으로 가져오기", type="primary", use_container_width=True):
+                import deck_io
+                progress = st.empty()
+                try:
+                    totals = deck_io.import_deck(store, deck_file, deck, progress=lambda t: progress.caption(f"{t['cards']:,}장 저장됨..."))
+                    progress.success(f"카드 {totals['cards']:,}장, 채점 기록 {totals['reviews']:,}건을 가져왔습니다."
+                                     f" (비슷한 문제 {totals['duplicates']:,}장, 형식 오류 {totals['invalid']:,}장 건너뜀)")
+                    show_skipped(totals['skipped'])
+                except Exception as e: progress.error(f"가져오기 실패: {e}")
 
 # ==========================================
 # [탭 4] 정리본 형성
 # ==========================================
 with tab4:
     lecture_content = ""
+    lecture_pages = []
     jokbo_content = ""
     col_upload1, col_upload2 = st.columns(2)
 
     with col_upload1:
         uploaded_summaries = st.file_uploader("강의자료 업로드", type=['pdf', 'pptx'], key="summary_uploader", accept_multiple_files=True, label_visibility="collapsed")
         if uploaded_summaries:
-            all_texts = []
-            for f in uploaded_summaries:
-                if f.name.endswith('.pdf'):
-                    try:
-                        reader = PdfReader(f)
-                        text = "\n".join([p.extract_text() or "" for p in reader.pages])
-                        if text.strip(): all_texts.append(text)
-                    except: pass
-                elif f.name.endswith('.pptx'):
-                    try:
-                        prs = PptxPresentation(f)
-                        txt = []
-                        for slide in prs.slides:
-                            for shape in slide.shapes:
-                                if shape.has_text_frame: txt.append(shape.text_frame.text)
-                        all_texts.append("\n".join(txt))
-                    except: pass
-            lecture_content = "\n\n".join(all_texts)
-            if lecture_content: st.success(f"강의자료 읽기 성공! ({len(lecture_content)}자)")
+            summary_results = extract_documents([(f.name, f.getvalue()) for f in uploaded_summaries], LECTURE_CHAR_BUDGET)
+            lecture_content = "\n\n".join(r["text"] for r in summary_results if r["text"].strip())
+            lecture_pages = [page for r in summary_results for page in r["page_texts"] if page.strip()]
+            if lecture_content:
+                st.success(f"강의자료 읽기 성공! ({len(lecture_content)}자)")
+                show_extract_timings(summary_results)
 
 
     with col_upload2:
         uploaded_jokbo = st.file_uploader("족보 업로드", type=['pdf', 'docx'], key="jokbo_uploader", label_visibility="collapsed")
         if uploaded_jokbo:
-            if uploaded_jokbo.name.endswith('.pdf'):
-                try:
-                    reader = PdfReader(uploaded_jokbo)
-                    jokbo_content = "\n".join([p.extract_text() or "" for p in reader.pages])
-                except: pass
-            elif uploaded_jokbo.name.endswith('.docx'):
-                try:
-                    doc = docx.Document(uploaded_jokbo)
-                    jokbo_content = "\n".join([p.text for p in doc.paragraphs])
-                except: pass
-            if jokbo_content: st.success(f"족보 읽기 성공! ({len(jokbo_content)}자)")
+            jokbo_result = extract_upload(uploaded_jokbo, JOKBO_CHAR_BUDGET)
+            jokbo_content = jokbo_result["text"]
+            if jokbo_content:
+                st.success(f"족보 읽기 성공! ({len(jokbo_content)}자)")
+                show_extract_timings([jokbo_result])
 
     st.divider()
+    summary_refresh = st.checkbox("🔄 저장된 AI 응답을 쓰지 않고 새로 생성", key="summary_refresh")
 
-    if st.button("📋 통합 표 정리본 생성", type="primary", use_container_width=True, disabled=not bool(lecture_content)):
-        with st.spinner("AI가 강의와 족보를 분석하여 표를 만들고 있습니다... (약 20초 소요)"):
-            try:
-                prompt = f"""
-                당신은 의대 학습 정리 전문가입니다.
-                강의자료를 메인 주제(질환 등)별로 나누고, 표 형태로 정리하세요.
-
-                [구조 요구사항]
-                1. 기본적으로 '소주제' - '내용'의 2단 구성을 따릅니다.
-                2. 단, 소주제 내부에서 또다시 분류가 필요한 경우(예: 진단 내의 혈액검사/영상검사 등)에는 '세부 분류'를 추가하여 3단으로 구성하세요.
-                
-                [서식 규칙]
-                1. 내용(value)은 긴 줄글로 쓰지 말고, 반드시 '1. ', '2. ' 번호를 붙여 개조식으로 작성하세요.
-                2. 각 번호 항목이 끝날 때마다 반드시 줄바꿈을 하세요.
-                
-                [색상 태그 규칙]
-                - 족보 정답 선지 내용: <yellow>내용</yellow>
-                - 족보 오답 선지(강의 관련): <blue>내용</blue>
-                - 족보 오답 선지(강의 무관): <gray>내용</gray>
-                
-                [입력 자료]
-                강의: {lecture_content[:30000]}
-                족보: {jokbo_content[:20000]}
-
-                [출력 형식 - JSON 배열]
-                반드시 아래 구조를 지키세요. 'sub_key'는 하위 분류가 있을 때만 작성하고, 없으면 null 또는 빈 문자열로 두세요.
-                [
-                  {{
-                    "main_topic": "메인 주제명 (예: 급성 A형 간염)",
-                    "sub_sections": [
-                      {{ "key": "개요", "sub_key": "", "value": "1. 정의: ...\\n2. 역학: ..." }},
-                      {{ "key": "진단", "sub_key": "혈액검사", "value": "1. IgM anti-HAV <yellow>양성</yellow>...\\n2. LFT 상승..." }},
-                      {{ "key": "진단", "sub_key": "영상검사", "value": "1. 초음파: 간비대 소견..." }}
-                    ]
-                  }},
-                  ...
-                ]
-                """
-                # [핵심 수정] 무조건 JSON 형식으로만 강제 출력하도록 설정 추가
-                response = client.models.generate_content(
-                    model=MODEL, 
-                    contents=prompt,
-                    config={"response_mime_type": "application/json"}
-                )
-                
-                st.session_state['summary_data'] = json.loads(response.text)
-                st.rerun()
-                
-            except json.JSONDecodeError:
-                st.error("AI가 올바른 형식(JSON)으로 표를 만들지 못했습니다. 다시 시도해 주세요.")
-                with st.expander("AI 응답 원본 확인 (디버깅용)"):
-                    st.write(response.text if 'response' in locals() else "응답 없음")
-            except Exception as e: 
-                st.error(f"오류: {e}")
+    summary_job = current_job('summary_job')
+    summary_running = bool(summary_job) and summary_job['status'] in ACTIVE_STATUSES
+    if st.button("📋 통합 표 정리본 생성", type="primary", use_container_width=True, disabled=not bool(lecture_content) or summary_running):
+        start_job(
+            'summary_job', 'summary', run_summary_job, get_client(), get_response_cache(),
+            lecture_pages, jokbo_content, summary_refresh
+        )
+        st.rerun()
+
+    if summary_running:
+        show_job_progress('summary_job')
+    elif summary_job: show_summary_job_result(summary_job)
 
     # ── 워드 다운로드 ──
     if st.session_state['summary_data']:
         st.success("✅ 정리본 생성이 완료되었습니다! 아래 버튼을 눌러 다운로드하세요.")
+        if st.session_state.get('summary_warning'): st.warning(st.session_state.pop('summary_warning'))
         
         try:
-            doc_out = DocxDocument()
-            
-            # [제목]
-            title = doc_out.add_heading('의대 강의/족보 통합 정리본', level=0)
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            run_title = title.runs[0]
-            set_font_style(run_title, font_size=16, is_bold=True)
-            
-            # [범례]
-            legend = doc_out.add_paragraph()
-            legend.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            
-            run_y = legend.add_run('■ 정답  ')
-            set_font_style(run_y, font_size=9)
-            run_y.font.highlight_color = WD_COLOR_INDEX.YELLOW
-            
-            run_b = legend.add_run('■ 관련 오답  ')
-            set_font_style(run_b, font_size=9)
-            run_b.font.color.rgb = RGBColor(0x19, 0x71, 0xC2)
-            
-            run_g = legend.add_run('■ 무관 오답')
-            set_font_style(run_g, font_size=9)
-            run_g.font.color.rgb = RGBColor(0xAD, 0xB5, 0xBD)
-            
-            doc_out.add_paragraph() 
-
-            for item in st.session_state['summary_data']:
-                main_topic = item.get('main_topic', '')
-                sub_sections = item.get('sub_sections', [])
-                
-                if not sub_sections: continue
-
-                # 3열 테이블 생성 (소주제 / 세부분류 / 내용)
-                table = doc_out.add_table(rows=0, cols=3)
-                table.style = 'Table Grid' 
-                
-                # 메인 주제 행 (3칸 병합)
-                row_main = table.add_row()
-                cell_main = row_main.cells[0]
-                cell_main.merge(row_main.cells[1])
-                cell_main.merge(row_main.cells[2])
-                cell_main.text = main_topic
-                
-                set_cell_background(cell_main, "495057") 
-                p_main = cell_main.paragraphs[0]
-                p_main.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                run_main = p_main.runs[0]
-                run_main.font.color.rgb = RGBColor(255, 255, 255)
-                set_font_style(run_main, font_size=10, is_bold=True)
-
-                last_key = None
-                key_cell_anchor = None
-
-                for sub in sub_sections:
-                    key = sub.get('key', '')
-                    sub_key = sub.get('sub_key', '')
-                    content = sub.get('value', '')
-                    
-                    row = table.add_row()
-                    row.height_rule = WD_ROW_HEIGHT_RULE.AT_LEAST
-                    row.height = Cm(1.5) 
-                    
-                    # ── 1열: 소주제 (셀 병합 + 폰트 9pt) ──
-                    cell_key = row.cells[0]
-                    
-                    if key == last_key and key_cell_anchor is not None:
-                        key_cell_anchor.merge(cell_key)
-                    else:
-                        cell_key.text = key
-                        cell_key.width = Cm(2.5) 
-                        set_cell_background(cell_key, "E9ECEF")
-                        
-                        p_k = cell_key.paragraphs[0]
-                        p_k.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        set_font_style(p_k.runs[0], font_size=9, is_bold=True)
-                        cell_key.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                        
-                        key_cell_anchor = cell_key
-                        last_key = key
-                    
-                    # ── 2열 & 3열 처리 ──
-                    if sub_key and sub_key.strip():
-                        cell_sub = row.cells[1]
-                        cell_sub.text = sub_key
-                        cell_sub.width = Cm(2.5)
-                        set_cell_background(cell_sub, "F8F9FA")
-                        
-                        p_sub = cell_sub.paragraphs[0]
-                        p_sub.alignment = WD_ALIGN_PARAGRAPH.CENTER
-                        set_font_style(p_sub.runs[0], font_size=9, is_bold=True)
-                        cell_sub.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                        
-                        cell_val = row.cells[2]
-                    else:
-                        cell_sub = row.cells[1]
-                        cell_sub.merge(row.cells[2])
-                        cell_val = row.cells[1]
-
-                    # ── 내용 채우기 ──
-                    cell_val.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
-                    p = cell_val.paragraphs[0]
-                    p.paragraph_format.line_spacing = 1.0 
-                    p.paragraph_format.space_before = Pt(6)
-                    p.paragraph_format.space_after = Pt(6)
-                    
-                    parts = re.split(r'(<(?:yellow|blue|gray)>.*?</(?:yellow|blue|gray)>)', content)
-                    for part in parts:
-                        if not part: continue
-                        tag_match = re.match(r'<(yellow|blue|gray)>(.*?)</\1>', part)
-                        if tag_match:
-                            tag_type = tag_match.group(1)
-                            text_body = tag_match.group(2)
-                            run = p.add_run(text_body)
-                            
-                            if tag_type == 'yellow':
-                                run.font.highlight_color = WD_COLOR_INDEX.YELLOW
-                                set_font_style(run, font_size=9, is_bold=False)
-                            elif tag_type == 'blue':
-                                run.font.color.rgb = RGBColor(0x19, 0x71, 0xC2)
-                                set_font_style(run, font_size=9, is_bold=True)
-                            elif tag_type == 'gray':
-                                run.font.color.rgb = RGBColor(0xAD, 0xB5, 0xBD)
-                                set_font_style(run, font_size=9, is_bold=False)
-                        else:
-                            run = p.add_run(part)
-                            set_font_style(run, font_size=9, is_bold=False)
+            docx_bytes = get_summary_docx(st.session_state['summary_data'])
+            st.download_button("💾 표 정리본 다운로드 (Word)", data=docx_bytes, file_name="통합_표_정리본.docx", mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document", use_container_width=True)
 
-                doc_out.add_paragraph() 
+        except Exception as e:
+            st.error(f"워드 생성 오류: {e}")
+# ==========================================
+# [탭 5] 학습 통계 (채점 기록 로그)
+# ==========================================
+with tab5:
+    if tab5.open:
+        store = get_card_store()
+        review_log = get_review_log()
+        stats = review_stats(deck, (review_log.version_key(), store.pending_review_stats()[1]))
+        if stats is None:
+            st.info("아직 채점 기록이 없습니다. 실전 모의고사에서 문제를 풀면 여기에 통계가 쌓입니다.")
+        else:
+            overview = stats['overview']
+            col_s1, col_s2, col_s3 = st.columns(3)
+            col_s1.metric("채점 수", f"{overview['reviews']:,}")
+            col_s2.metric("정답률", f"{overview['accuracy']:.0%}")
+            col_s3.metric("문제당 풀이 시간(중앙값)", f"{overview['median_seconds']:.0f}초" if overview['median_seconds'] is not None else "-")
 
-            bio = BytesIO()
-            doc_out.save(bio)
-            bio.seek(0)
-            
-            st.download_button("💾 표 정리본 다운로드 (Word)", data=bio, file_name="통합_표_정리본.docx", mime="application/vnd.openxmlformats-officedocument.wordprocessingml.document", use_container_width=True)
+            st.subheader("📄 출처 문서별")
+            st.dataframe(stats['by_source'], use_container_width=True, column_config={
+                "reviews": "채점 수", "accuracy": st.column_config.ProgressColumn("정답률", min_value=0, max_value=1, format="percent"),
+                "median_seconds": st.column_config.NumberColumn("풀이 시간(초)", format="%.0f")
+            })
 
-        except Exception as e:
-            st.error(f"워드 생성 오류: {e}")
\ No newline at end of file
+            if not stats['by_tag'].empty:
+                st.subheader("🏷️ 주제(태그)별 정답률")
+                st.bar_chart(stats['by_tag'].head(20)['accuracy'], horizontal=True)
+
+            if stats['retention']['reviews'].any():
+                st.subheader("📉 복습 간격별 기억률")
+                st.caption("지난 복습 후 며칠 만에 다시 풀었는지에 따라 맞힌 비율입니다.")
+                st.line_chart(stats['retention']['recall'])
+
+            st.subheader("📆 날짜별 채점 수")
+            st.bar_chart(stats['daily']['reviews'])
+
+
+# ==========================================
+# 4. 성능 계측 (주소창 ?debug=1 또는 AIDOCTOR_DEBUG=1 이면 사이드바에 표시)
+# ==========================================
+rerun_events, rerun_seconds = perf.end_rerun()
+if PROM_FILE: perf.write_prometheus(PROM_FILE)
+if st.query_params.get("debug") == "1" or os.environ.get("AIDOCTOR_DEBUG") == "1":
+    import pandas as pd
+    with st.sidebar.expander("🔧 성능 계측", expanded=True):
+        st.caption(f"이번 재실행: {rerun_seconds * 1000:.0f}ms (백그라운드 생성 작업은 누적값에만 들어갑니다)")
+        breakdown = perf.summarize_events(rerun_events)
+        if breakdown:
+            st.dataframe(pd.DataFrame(
+                [{"구간": name, "횟수": count, "ms": round(total * 1000, 1), "비율": total / rerun_seconds if rerun_seconds else 0.0} for name, count, total in breakdown]
+            ), hide_index=True, use_container_width=True, column_config={"비율": st.column_config.ProgressColumn("비율", min_value=0, max_value=1, format="percent")})
+            with st.popover("이벤트 상세"): st.dataframe(pd.DataFrame(rerun_events), hide_index=True)
+        st.markdown("**누적 (프로세스 시작 이후)**")
+        st.dataframe(pd.DataFrame([
+            {"구간": row['name'], "라벨": ", ".join(f"{k}={v}" for k, v in row['labels'].items()), "횟수": row['count'],
+             "평균 ms": round(row['sum'] / row['count'] * 1000, 1), "최대 ms": round(row['max'] * 1000, 1),
+             "합계 필드": ", ".join(f"{k}={round(v, 3):,}" for k, v in row['fields'].items())}
+            for row in perf.snapshot()
+        ]), hide_index=True, use_container_width=True)
+        st.download_button("📈 Prometheus 텍스트 받기", perf.prometheus_text(), file_name="aidoctor_metrics.prom", mime="text/plain")
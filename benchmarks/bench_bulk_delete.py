@@ -0,0 +1,62 @@
+# ==========================================
+# 선택 삭제 벤치마크: 이전 탭3 방식 vs id 집합 한 번에 삭제
+# ==========================================
+# 덱의 10% 를 골라 지울 때
+# - 이전 방식: 남길 카드를 `i not in 선택 리스트` 로 골라(O(N·K)) JSON 전체를 다시 씀
+# - 카드별 삭제: DELETE 를 id 마다 한 번씩 (executemany)
+# - 집합 삭제: CardStore.delete_cards (id 집합을 JSON 배열 하나로 넘겨 DELETE 한 문장)
+# 사용법: python benchmarks/bench_bulk_delete.py [덱 크기 ...]
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_store import CardStore  # noqa: E402
+
+
+def make_card(i):
+    return {"question": f"{i}번 문제: 급성 A형 간염의 진단에 가장 유용한 검사는?", "options": ["IgM anti-HAV", "HBsAg"], "correct_index": 0}
+
+
+def bench_legacy(workdir, cards, selected):
+    path = os.path.join(workdir, "legacy.json")
+    with open(path, "w", encoding="utf-8") as f: json.dump(cards, f, ensure_ascii=False, indent=4)
+    start = time.perf_counter()
+    with open(path, "r", encoding="utf-8") as f: loaded = json.load(f)
+    remaining = [c for i, c in enumerate(loaded) if i not in selected]
+    with open(path, "w", encoding="utf-8") as f: json.dump(remaining, f, ensure_ascii=False, indent=4)
+    return time.perf_counter() - start
+
+
+def bench_store(workdir, cards, selected, single_statement):
+    store = CardStore(os.path.join(workdir, f"store_{single_statement}.db"))
+    store.add_cards(cards, skip_duplicates=False)
+    ids = [card["id"] for batch in store.iter_cards() for card in batch]
+    selected_ids = [ids[i] for i in selected]
+    start = time.perf_counter()
+    if single_statement: store.delete_cards(set(selected_ids))
+    else:
+        with store._write():
+            store._conn.executemany("DELETE FROM cards WHERE id = ? AND deck = ?", [(card_id, "default") for card_id in selected_ids])
+    seconds = time.perf_counter() - start
+    assert sum(len(batch) for batch in store.iter_cards()) == len(cards) - len(selected)
+    return seconds
+
+
+def main(sizes):
+    print(f"{'덱 크기':>8} | {'삭제 수':>6} | {'이전 방식':>9} | {'카드별 DELETE':>12} | {'집합 DELETE':>10}")
+    for size in sizes:
+        cards = [make_card(i) for i in range(size)]
+        selected = random.Random(size).sample(range(size), size // 10)  # 이전 코드처럼 리스트
+        with tempfile.TemporaryDirectory() as workdir:
+            legacy = bench_legacy(workdir, cards, selected)
+            per_row = bench_store(workdir, cards, selected, single_statement=False)
+            single = bench_store(workdir, cards, selected, single_statement=True)
+        print(f"{size:>8} | {len(selected):>6} | {legacy:>8.2f}s | {per_row * 1000:>10.0f}ms | {single * 1000:>8.0f}ms")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10000, 50000])
@@ -0,0 +1,68 @@
+# ==========================================
+# 카드 저장 벤치마크: 기존 JSON 카드별 저장 루프 vs 배치 저장
+# ==========================================
+# 사용법: python benchmarks/bench_card_store.py [기존 카드 수 ...]
+#   예) python benchmarks/bench_card_store.py 1000 10000 100000
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_store import CardStore  # noqa: E402
+
+BATCH_SIZE = 5  # 탭1 '5문제 출제하기' 한 번 분량
+# 합성 카드는 번호만 다른 같은 문제라서 중복 검사는 끄고 저장 경로만 잽니다. (중복 검사 비용은 bench_dedup.py)
+
+
+def make_card(i):
+    return {
+        "question": f"{i}번 문제: 급성 A형 간염의 진단에 가장 유용한 검사는?",
+        "options": ["IgM anti-HAV", "IgG anti-HAV", "HBsAg", "anti-HCV", "HBV DNA"],
+        "correct_index": 0, "explanation": "급성기에는 IgM anti-HAV 가 양성입니다.",
+        "next_review": "2025-01-01", "interval": 1
+    }
+
+
+# ── 이전 구현 (save_card_to_file 가 매번 전체 JSON 을 읽고 다시 씀) ──
+def legacy_save_card(path, card):
+    with open(path, "r", encoding="utf-8") as f:
+        cards = [c for c in json.load(f) if 'options' in c and isinstance(c['options'], list)]
+    cards.append(card)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(cards, f, ensure_ascii=False, indent=4)
+
+
+def bench_legacy(workdir, existing, batch):
+    path = os.path.join(workdir, "legacy.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump([make_card(i) for i in range(existing)], f, ensure_ascii=False, indent=4)
+    start = time.perf_counter()
+    for card in batch: legacy_save_card(path, card)
+    return time.perf_counter() - start
+
+
+def bench_store(workdir, existing, batch, bulk):
+    store = CardStore(os.path.join(workdir, f"store_{'bulk' if bulk else 'loop'}.db"))
+    store.add_cards([make_card(i) for i in range(existing)], skip_duplicates=False)
+    start = time.perf_counter()
+    if bulk: store.add_cards(batch, skip_duplicates=False)
+    else:
+        for card in batch: store.add_cards([card], skip_duplicates=False)
+    return time.perf_counter() - start
+
+
+def main(sizes):
+    batch = [make_card(-i) for i in range(BATCH_SIZE)]
+    print(f"{'기존 카드':>10} | {'JSON 카드별':>12} | {'SQLite 카드별':>13} | {'SQLite 배치':>11}")
+    for existing in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            legacy = bench_legacy(workdir, existing, batch)
+            loop = bench_store(workdir, existing, batch, bulk=False)
+            bulk = bench_store(workdir, existing, batch, bulk=True)
+        print(f"{existing:>10} | {legacy * 1000:>10.1f}ms | {loop * 1000:>11.2f}ms | {bulk * 1000:>9.2f}ms")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,74 @@
+# ==========================================
+# 앱 시작(콜드 스타트) 시간과 재실행 1회 비용 측정
+# ==========================================
+# 컨테이너가 0대까지 줄었다가 뜨는 경우처럼, 새 파이썬 프로세스에서 AIdoctor_app.py 를 Streamlit AppTest 로
+# 처음 실행하는 시간(모듈 불러오기 + 첫 화면)과 이어지는 재실행 시간을 잽니다. 매 반복마다 새 프로세스를 띄웁니다.
+# - streamlit: streamlit 자체를 불러오는 시간 (앱과 무관, 참고용)
+# - 첫 실행: 앱 스크립트 첫 실행 (앱이 불러오는 모듈 + 저장소 열기 + 첫 화면)
+# - 재실행: 두 번째부터의 재실행 중앙값
+# 첫 실행이 끝난 시점에 이미 불러와진 무거운 모듈도 보여줍니다. (API 키는 가짜라 네트워크 요청은 없습니다)
+# 이전 버전과 비교하려면: git worktree add /tmp/old HEAD~1 && python benchmarks/bench_cold_start.py --app /tmp/old/AIdoctor_app.py
+# 사용법: python benchmarks/bench_cold_start.py [--app 경로] [--repeat 5] [--reruns 10]
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AIdoctor_app.py")
+HEAVY_MODULES = ("google.genai", "pandas", "pyarrow", "pypdf", "pptx", "docx", "numpy")
+
+
+def child(app, reruns):
+    # 새 프로세스 안에서 실행됩니다. 결과를 JSON 한 줄로 출력합니다.
+    import logging
+    logging.disable(logging.WARNING)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(app)))
+    start = time.perf_counter()
+    from streamlit.testing.v1 import AppTest
+    imported = time.perf_counter()
+    at = AppTest.from_file(app, default_timeout=120)
+    at.secrets["GOOGLE_API_KEY"] = "offline-benchmark"
+    at.run()
+    first = time.perf_counter()
+    if at.exception: raise RuntimeError(at.exception[0].message)
+    heavy = [name for name in HEAVY_MODULES if name in sys.modules]
+    rerun_times = []
+    for _ in range(reruns):
+        s = time.perf_counter()
+        at.run()
+        rerun_times.append(time.perf_counter() - s)
+    print(json.dumps({"streamlit": imported - start, "first_run": first - imported, "rerun": statistics.median(rerun_times), "heavy": heavy}))
+
+
+def measure(app, repeat, reruns):
+    results = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as workdir:  # 매번 빈 DB/캐시 폴더에서 시작
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--child", "--app", os.path.abspath(app), "--reruns", str(reruns)],
+                                 cwd=workdir, capture_output=True, text=True, check=True)
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="앱 콜드 스타트 / 재실행 시간 측정")
+    parser.add_argument("--app", default=APP_PATH)
+    parser.add_argument("--repeat", type=int, default=5, help="새 프로세스로 반복할 횟수")
+    parser.add_argument("--reruns", type=int, default=10, help="프로세스마다 이어서 재실행할 횟수")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child: return child(args.app, args.reruns)
+
+    results = measure(args.app, args.repeat, args.reruns)
+    print(f"{args.app} (새 프로세스 {args.repeat}회, 중앙값)")
+    for key, label in (("streamlit", "streamlit 불러오기"), ("first_run", "첫 실행"), ("rerun", "재실행")):
+        print(f"  {label:<14} {statistics.median(r[key] for r in results) * 1000:8.0f}ms")
+    print(f"  첫 실행 후 불러와진 모듈: {', '.join(results[0]['heavy']) or '-'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+# ==========================================
+# 덱 파일 벤치마크: 예전 JSON(indent=4) vs Parquet vs gzip JSONL
+# ==========================================
+# 합성 덱(기본 100,000장, 카드마다 채점 기록 2건)을 세 형식으로 내보내고
+# - 파일 크기와 내보내기 시간
+# - 읽기만 하는 시간과 그동안의 최대 메모리 (파이썬 객체는 tracemalloc, Parquet 버퍼는 pyarrow 메모리 풀)
+# - 새 DB 로 가져오는 시간 (deck_io.import_deck. 합성 카드끼리 비슷하므로 중복 검사는 끄고 잽니다)
+# 을 비교합니다. 예전 JSON 은 앱이 쓰던 그대로 json.dump(카드 목록, indent=4) 입니다. (채점 기록 없음)
+# 사용법: python benchmarks/bench_deck_io.py [카드 수]
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import deck_io  # noqa: E402
+from card_store import CardStore  # noqa: E402
+from review_log import ReviewLog  # noqa: E402
+
+DECK = "bench"
+SENTENCES = [
+    "급성 A형 간염은 IgM anti-HAV 양성으로 진단한다.", "Crohn disease shows skip lesions and transmural inflammation.",
+    "철결핍빈혈에서는 ferritin 이 감소하고 TIBC 가 증가한다.", "갑상샘중독증의 1차 치료제는 methimazole 이다."
+]
+
+
+def make_cards(start, count):
+    return [{
+        "question": f"{i}번. {SENTENCES[i % 4]} 이에 대한 설명으로 옳은 것은? (변형 {i * 7919 % 100003})",
+        "options": [f"{SENTENCES[(i + k) % 4][:18]} {i * 31 + k}" for k in range(5)], "correct_index": i % 5,
+        "explanation": SENTENCES[i % 4] * 2, "source": f"강의{i % 40:02d}.pdf", "tags": [f"강의{i % 40:02d}", f"주제{i % 12}"],
+        "next_review": "2026-11-01", "interval": 6, "ease": 2.5, "reps": 2, "last_review": "2026-10-26",
+        "reviews": [
+            {"reviewed_at": "2026-10-20T09:00:00", "grade": 3, "scheduler": "sm2", "interval": 1, "ease": 2.5, "duration_ms": 8000},
+            {"reviewed_at": "2026-10-26T09:00:00", "grade": 3, "scheduler": "sm2", "elapsed_days": 6, "interval": 6, "ease": 2.5, "duration_ms": 6000},
+        ]
+    } for i in range(start, start + count)]
+
+
+def read_all(path, fmt):
+    # 파일을 묶음 단위로 끝까지 읽기만 합니다. 반환: (카드 수, 읽는 동안 pyarrow 메모리 풀 최대 사용량)
+    if fmt == "legacy":
+        with open(path, encoding="utf-8") as f: return len(json.load(f)), 0
+    cards, arrow_peak = 0, 0
+    for batch in deck_io.open_deck_file(path, fmt)[1]:
+        cards += len(batch)
+        arrow_peak = max(arrow_peak, pa.total_allocated_bytes())
+    return cards, arrow_peak
+
+
+def measure_read(path, fmt):
+    # 시간은 tracemalloc 없이 한 번, 메모리는 tracemalloc 을 켜고 한 번 더 읽어서 잽니다. (tracemalloc 이 실행을 느리게 하므로)
+    start = time.perf_counter()
+    cards = read_all(path, fmt)[0]
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    arrow_peak = read_all(path, fmt)[1]
+    peak = tracemalloc.get_traced_memory()[1] + arrow_peak
+    tracemalloc.stop()
+    return cards, seconds, peak
+
+
+def main(n_cards=100000):
+    with tempfile.TemporaryDirectory() as workdir:
+        store, log = CardStore(os.path.join(workdir, "source.db")), ReviewLog(os.path.join(workdir, "review_log"))
+        start = time.perf_counter()
+        for i in range(0, n_cards, deck_io.BATCH_SIZE):
+            store.import_cards(make_cards(i, min(deck_io.BATCH_SIZE, n_cards - i)), DECK, skip_duplicates=False)
+        log.maybe_compact(store, 1)
+        print(f"합성 덱 {n_cards:,}장 준비: {time.perf_counter() - start:.1f}초\n")
+
+        paths = {fmt: os.path.join(workdir, name) for fmt, name in
+                 (("legacy", "medical_flashcards.json"), ("parquet", "deck.parquet"), ("jsonl.gz", "deck.jsonl.gz"))}
+        print(f"{'형식':>10} | {'파일 크기':>10} | {'내보내기':>8} | {'읽기':>8} | {'읽기 최대 메모리':>12} | {'가져오기':>8}")
+        for fmt, path in paths.items():
+            start = time.perf_counter()
+            if fmt == "legacy":
+                with open(path, "w", encoding="utf-8") as f: json.dump([c for batch in store.iter_cards(DECK) for c in batch], f, indent=4)
+            else: deck_io.export_deck(store, DECK, path, review_log=log)
+            export_seconds = time.perf_counter() - start
+
+            cards, read_seconds, peak = measure_read(path, fmt)
+            assert cards == n_cards, (fmt, cards)
+            target = CardStore(os.path.join(workdir, f"import_{fmt}.db"))
+            start = time.perf_counter()
+            totals = deck_io.import_deck(target, path, DECK, "json" if fmt == "legacy" else fmt, skip_duplicates=False)
+            import_seconds = time.perf_counter() - start
+            assert totals["cards"] == n_cards, (fmt, totals)
+            print(f"{fmt:>10} | {os.path.getsize(path) / 2 ** 20:8.1f}MB | {export_seconds:7.2f}초 | {read_seconds:7.2f}초 | "
+                  f"{peak / 2 ** 20:13.1f}MB | {import_seconds:7.1f}초")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
@@ -0,0 +1,65 @@
+# ==========================================
+# 중복 문제 검사 벤치마크: 덱 전체 1:1 비교 vs MinHash/LSH 인덱스
+# ==========================================
+# 합성 덱(기본 50,000장)에 새 문제 5개(그중 일부는 기존 문제를 살짝 바꾼 것)를 넣을 때
+# - 전체 비교: 모든 카드와 card_dedup.is_duplicate (정답 비교 + 3-gram 자카드 유사도) 를 직접 계산
+# - 인덱스: CardStore.add_cards (LSH 후보 조회 + 서명 비교 + 저장까지)
+# 의 시간과 찾아낸 중복 수를 비교합니다.
+# 사용법: python benchmarks/bench_dedup.py [덱 크기 ...]
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_dedup import is_duplicate  # noqa: E402
+from card_store import CardStore  # noqa: E402
+
+SYLLABLES = "가나다라마바사아자차카타파하간신폐심장혈압당뇨염증종양세포항체결핵감염진단치료약물"
+
+
+def make_word(rng):
+    return "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+
+
+def make_card(rng, vocab):
+    question = " ".join(rng.choice(vocab) for _ in range(8)) + "에 대한 설명으로 옳은 것은?"
+    return {"question": question, "options": [" ".join(rng.choice(vocab) for _ in range(3)) for _ in range(5)], "correct_index": 0}
+
+
+def near_duplicate(rng, card):
+    # 보기 순서를 섞고 조사를 바꾼 같은 문제 (정답은 그대로)
+    options = list(card["options"])
+    rng.shuffle(options)
+    return {
+        "question": card["question"].replace("옳은 것은?", "옳은 것은 무엇인가?"), "options": options,
+        "correct_index": options.index(card["options"][card["correct_index"]])
+    }
+
+
+def main(sizes):
+    print(f"{'덱 크기':>8} | {'덱 준비':>8} | {'전체 비교':>10} | {'LSH 인덱스':>10} | 중복(전체/인덱스)")
+    for size in sizes:
+        rng = random.Random(size)
+        vocab = [make_word(rng) for _ in range(2000)]
+        deck = [make_card(rng, vocab) for _ in range(size)]
+        batch = [near_duplicate(rng, deck[rng.randrange(size)]) for _ in range(2)] + [make_card(rng, vocab) for _ in range(3)]
+        with tempfile.TemporaryDirectory() as workdir:
+            start = time.perf_counter()
+            store = CardStore(os.path.join(workdir, "cards.db"))
+            store.add_cards(deck, skip_duplicates=False)
+            prepare = time.perf_counter() - start
+
+            start = time.perf_counter()
+            scan_dups = sum(any(is_duplicate(card, other) for other in deck) for card in batch)
+            scan = time.perf_counter() - start
+
+            start = time.perf_counter()
+            saved = store.add_cards(batch)
+            indexed = time.perf_counter() - start
+        print(f"{size:>8} | {prepare:>7.1f}s | {scan * 1000:>8.0f}ms | {indexed * 1000:>8.1f}ms | {scan_dups}/{len(batch) - saved}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [5000, 50000])
@@ -0,0 +1,127 @@
+# ==========================================
+# 문서 추출 벤치마크: PDF / PPTX 직렬 추출 vs 프로세스 풀 병렬 추출
+# ==========================================
+# 같은 내용의 합성 PDF 와 PPTX(쪽 수를 키워 가며)를 doc_extract 로 끝까지 추출하는 시간을 잽니다.
+# - 직렬: 한 프로세스에서 앞에서부터 (PPTX 는 앱에서 이 방식)
+# - 풀: doc_extract 의 PDF 병렬 추출과 같은 방식으로 쪽 구간을 spawn 프로세스 풀에 나눠 보냄
+#   (PPTX 는 앱에 없는 경로라 여기서 같은 방식으로 흉내 냅니다. 워커마다 파일 전체를 다시 열어야 합니다)
+# 쪽당 비용이 큰 PDF(pypdf) 는 풀이 이득이고, 쪽당 비용이 작은 PPTX 는 파일을 여는 비용이 대부분이라
+# 워커마다 다시 여는 만큼 이득이 없어집니다. CPU 가 1개면 풀 쪽은 항상 느리며, 이때 풀 시간은 워커들의 CPU 시간 합과
+# 거의 같으므로 '풀 시간 / 워커 수' 가 직렬보다 짧은지로 여러 코어에서의 이득을 가늠할 수 있습니다.
+# 사용법: python benchmarks/bench_extract.py [쪽 수 ...] [--workers 4]
+import argparse
+import multiprocessing
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from itertools import islice
+
+from pptx import Presentation
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import doc_extract  # noqa: E402
+
+SENTENCES = [
+    "Acute hepatitis A is diagnosed by IgM anti-HAV.", "Crohn disease shows skip lesions and transmural inflammation.",
+    "Iron deficiency anemia: low ferritin, high TIBC.", "Nephrotic syndrome: proteinuria > 3.5 g/day, hypoalbuminemia, edema.",
+    "Methimazole is the first-line drug for thyrotoxicosis.", "Use CHA2DS2-VASc to decide anticoagulation in atrial fibrillation."
+]
+
+
+def make_pages(rng, n_pages):
+    # PDF 는 글꼴을 넣지 않고 기본 Helvetica 로 쓰므로 ASCII 문장만 씁니다.
+    return [f"Page {p + 1}\n" + "\n".join(rng.choice(SENTENCES) for _ in range(12)) for p in range(n_pages)]
+
+
+def make_pdf(pages):
+    # 쪽마다 글자 줄이 들어간 최소한의 PDF (pypdf 로 추출 가능)
+    escape = lambda line: line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")  # noqa: E731
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for page in pages:
+        stream = "BT /F1 11 Tf 14 TL 50 800 Td " + " ".join(f"({escape(line)}) '" for line in page.split("\n")) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(len(objects))
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>"
+    out, offsets = bytearray(b"%PDF-1.4\n"), []
+    for i, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{i} 0 obj\n{obj}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode() + "".join(f"{o:010d} 00000 n \n" for o in offsets).encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_pptx(pages):
+    prs = Presentation()
+    for page in pages:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = page.split("\n")[0]
+        slide.placeholders[1].text = "\n".join(page.split("\n")[1:])
+    bio = BytesIO()
+    prs.save(bio)
+    return bio.getvalue()
+
+
+def _pptx_slide_range(data, start, end):
+    # 워커에서 실행: 파일을 다시 열고 start~end 슬라이드만 추출 (doc_extract._pdf_page_range 의 PPTX 판)
+    return list(islice(doc_extract._iter_pptx_slides(data, start), end - start))
+
+
+def extract_serial(kind, data):
+    doc_extract._cache.clear()
+    workers = doc_extract.MAX_WORKERS
+    doc_extract.MAX_WORKERS = 1  # PDF 도 직렬로
+    try: return doc_extract.extract_document(f"note.{kind}", data)["pages"]
+    finally: doc_extract.MAX_WORKERS = workers
+
+
+def extract_pool(kind, data, n_pages, pool, workers):
+    # doc_extract._iter_pdf_pages 와 같은 구간 크기로 나눠 보내고 순서대로 모읍니다.
+    step = max(doc_extract.MIN_PAGES_PER_TASK, -(-n_pages // (workers * 2)))
+    func = doc_extract._pdf_page_range if kind == "pdf" else _pptx_slide_range
+    futures = [pool.submit(func, data, s, min(s + step, n_pages)) for s in range(0, n_pages, step)]
+    return sum(len(future.result()) for future in futures)
+
+
+def best_of(runs, op):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = op()
+        times.append(time.perf_counter() - start)
+    return min(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF / PPTX 추출: 직렬 vs 프로세스 풀")
+    parser.add_argument("pages", type=int, nargs="*", default=[30, 100, 300, 1000], help="합성 문서 쪽 수")
+    parser.add_argument("--workers", type=int, default=4, help="풀 워커 수")
+    parser.add_argument("--runs", type=int, default=3, help="반복 횟수 (가장 빠른 값)")
+    args = parser.parse_args()
+
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    small = make_pages(random.Random(0), 2)
+    for kind, data in (("pdf", make_pdf(small)), ("pptx", make_pptx(small))): extract_pool(kind, data, 2, pool, 1)  # 워커 띄우기
+    print(f"CPU {os.cpu_count()}개, 풀 워커 {args.workers}개\n")
+    print(f"{'형식':>5} | {'쪽 수':>5} | {'파일':>8} | {'직렬':>8} | {'풀':>8} | {'쪽당(직렬)':>9} | {'풀 이득':>6}")
+    try:
+        for n_pages in args.pages:
+            pages = make_pages(random.Random(n_pages), n_pages)
+            for kind, data in (("pdf", make_pdf(pages)), ("pptx", make_pptx(pages))):
+                serial, count = best_of(args.runs, lambda: extract_serial(kind, data))
+                pooled, pooled_count = best_of(args.runs, lambda: extract_pool(kind, data, n_pages, pool, args.workers))
+                assert count == pooled_count == n_pages, (kind, count, pooled_count)
+                print(f"{kind:>5} | {n_pages:>5} | {len(data) / 1e6:>6.2f}MB | {serial * 1000:>6.0f}ms | {pooled * 1000:>6.0f}ms"
+                      f" | {serial / n_pages * 1000:>7.2f}ms | {serial / pooled:>5.1f}x")
+    finally: pool.shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
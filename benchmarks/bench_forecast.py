@@ -0,0 +1,69 @@
+# ==========================================
+# 복습량 예측 벤치마크: 카드별 파이썬 반복 vs numpy 벡터 계산
+# ==========================================
+# 합성 덱(기본 100,000장)의 (next_review, interval, ease) 로 앞으로 90일 날짜별 복습 예정 수를 셉니다.
+# - 카드별 반복: 카드마다 날짜를 파싱하고 기간이 끝날 때까지 간격 × ease 로 다음 복습일을 따라감
+# - 벡터: scheduler.forecast_due (pandas 로 날짜 파싱, numpy bincount 로 세대별 합산)
+# DB 에서 읽는 시간(CardStore.schedule_rows)도 따로 보여주고, 두 결과가 같은지 확인합니다.
+# 사용법: python benchmarks/bench_forecast.py [덱 크기 ...]
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_store import CardStore  # noqa: E402
+from scheduler import FORECAST_DAYS, MAX_INTERVAL, forecast_due  # noqa: E402
+
+
+def make_rows(size, today):
+    rng = random.Random(size)
+    rows = []
+    for _ in range(size):
+        interval = rng.choice([1, 1, 3, 6, 15, 40, 100])
+        rows.append(((today + timedelta(days=rng.randint(-10, interval))).isoformat(), interval, round(rng.uniform(1.3, 3.0), 2)))
+    return rows
+
+
+def forecast_loop(rows, today, days=FORECAST_DAYS):
+    counts = [0] * days
+    for next_review, interval, ease in rows:
+        due = max((date.fromisoformat(next_review) - today).days, 0)
+        interval = max(interval, 1)
+        while due < days:
+            counts[due] += 1
+            interval = min(interval * ease, MAX_INTERVAL)
+            due += max(round(interval), 1)
+    return counts
+
+
+def main(sizes):
+    today = date.today()
+    print(f"{'덱 크기':>8} | {'DB 읽기':>8} | {'카드별 반복':>10} | {'벡터 계산':>9} | 결과 일치")
+    for size in sizes:
+        rows = make_rows(size, today)
+        with tempfile.TemporaryDirectory() as workdir:
+            store = CardStore(os.path.join(workdir, "cards.db"))
+            with store._write():
+                store._conn.executemany(
+                    "INSERT INTO cards (question, options, correct_index, next_review, interval, ease) VALUES ('q', '[]', 0, ?, ?, ?)", rows
+                )
+            start = time.perf_counter()
+            loaded = store.schedule_rows()
+            read = time.perf_counter() - start
+
+        start = time.perf_counter()
+        expected = forecast_loop(loaded, today)
+        loop = time.perf_counter() - start
+
+        start = time.perf_counter()
+        forecast = forecast_due(loaded, today)
+        vector = time.perf_counter() - start
+        same = forecast.tolist() == expected
+        print(f"{size:>8} | {read * 1000:>6.0f}ms | {loop * 1000:>8.0f}ms | {vector * 1000:>7.0f}ms | {'예' if same else '아니오'}")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [10000, 100000])
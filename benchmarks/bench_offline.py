@@ -0,0 +1,259 @@
+# ==========================================
+# 오프라인 성능 측정 모음 (API 키 없이, 가짜 Gemini 클라이언트로)
+# ==========================================
+# 앱의 주요 경로를 합성 덱/문서 크기를 키워 가며 반복 실행하고, 지연 시간 백분위수(p50/p95/최대)와
+# 한 번 실행할 때의 최대 메모리(tracemalloc)를 표로 보여줍니다.
+# - 카드: 문제 목록 한 페이지(search_cards), save_cards(중복 검사 포함), update_card_schedule(SM-2 + 기록), 다음 문제 조회
+# - 문서: read_file (PDF/DOCX/PPTX 추출, 매번 추출 캐시를 비움), 워드 정리본 내보내기(render_summary_docx)
+#   save_cards / update_card_schedule / read_file 은 AIdoctor_app 을 Streamlit 없이(bare mode) 불러와 앱 함수를 그대로 부릅니다.
+#   (작업 폴더에 가짜 secrets 를 두고 불러오며, 카드 저장소만 덱 크기별 저장소로 바꿔 끼웁니다)
+# - 생성: 문제 출제(generate_quiz_batches)와 정리본 생성(stream_summary_topics)을 fake_genai.FakeClient 로 (지연 --latency 초)
+#   요청 간격 제한(RateLimiter, 분당 30회)도 실제와 같이 적용되므로 묶음이 여러 개면 그 간격이 시간에 들어갑니다.
+# - --app: AIdoctor_app.py 전체를 Streamlit AppTest 로 다시 실행하는 시간 (genai.Client 를 가짜로 바꿔 끼움)
+# --json 으로 결과를 저장하고, --baseline 으로 이전 결과와 비교해 p50 이 --threshold 배 넘게 느려진 항목이 있으면 종료 코드 1
+# 사용법: python benchmarks/bench_offline.py [--decks 1000 10000] [--pages 20 100] [--latency 0.2] [--repeat 20] [--app]
+#                                            [--json 결과.json] [--baseline 이전.json] [--threshold 1.5]
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date
+from io import BytesIO
+from unittest import mock
+
+import docx
+import numpy as np
+from pptx import Presentation
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import doc_extract  # noqa: E402
+import bench_extract  # noqa: E402
+from bench_summary_docx import make_summary  # noqa: E402
+from card_store import DEFAULT_DECK, CardStore  # noqa: E402
+from fake_genai import FakeClient  # noqa: E402
+from generation import generate_quiz_batches, stream_summary_topics  # noqa: E402
+from summary_docx import render_summary_docx  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "AIdoctor_app.py")
+SENTENCES = [
+    "급성 A형 간염은 IgM anti-HAV 양성으로 진단한다.", "Crohn disease shows skip lesions and transmural inflammation.",
+    "철결핍빈혈에서는 ferritin 이 감소하고 TIBC 가 증가한다.", "Nephrotic syndrome: proteinuria > 3.5 g/day, hypoalbuminemia, edema.",
+    "갑상샘중독증의 1차 치료제는 methimazole 이다.", "심방세동 환자는 CHA2DS2-VASc 점수로 항응고 여부를 정한다."
+]
+
+
+def make_card(rng, i):
+    sentence = rng.choice(SENTENCES)
+    return {
+        "question": f"{i}번. {sentence} 이에 대한 설명으로 옳은 것은? ({rng.random():.6f})",
+        "options": [f"{sentence[k * 5:k * 5 + 15]} {rng.randint(0, 10 ** 6)}" for k in range(5)],
+        "correct_index": rng.randrange(5), "explanation": sentence, "source": "강의.pdf", "tags": ["강의", f"주제{i % 20}"]
+    }
+
+
+def make_pages(rng, n_pages):
+    return [f"{p + 1}쪽\n" + "\n".join(rng.choice(SENTENCES) * rng.randint(1, 4) for _ in range(8)) for p in range(n_pages)]
+
+
+def make_docx(pages):
+    document = docx.Document()
+    for page in pages: document.add_paragraph(page)
+    bio = BytesIO()
+    document.save(bio)
+    return bio.getvalue()
+
+
+def make_pptx(pages):
+    prs = Presentation()
+    for page in pages:
+        slide = prs.slides.add_slide(prs.slide_layouts[1])
+        slide.shapes.title.text = page.split("\n")[0]
+        slide.placeholders[1].text = "\n".join(page.split("\n")[1:])
+    bio = BytesIO()
+    prs.save(bio)
+    return bio.getvalue()
+
+
+def measure(name, size, op, repeat, setup=None):
+    # op 를 repeat 번 실행한 시간 분포 + 한 번 더 실행할 때의 최대 할당 메모리
+    # setup 이 있으면 매번 op 전에 부르고 그 시간은 빼고 잽니다.
+    times = []
+    for _ in range(repeat):
+        if setup: setup()
+        start = time.perf_counter()
+        op()
+        times.append(time.perf_counter() - start)
+    if setup: setup()
+    tracemalloc.start()
+    op()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    ms = np.array(times) * 1000
+    return {
+        "name": name, "size": size, "repeat": repeat, "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)), "max_ms": float(ms.max()), "peak_mb": peak / 1e6
+    }
+
+
+def load_app(workdir):
+    # AIdoctor_app 을 Streamlit 서버 없이 한 번 실행해 앱 함수들을 얻습니다. 앱이 만드는 DB/로그는 workdir 에 생깁니다.
+    # 작업 폴더는 측정이 끝날 때까지 그대로 둡니다. (get_review_log 등이 상대 경로를 처음 부를 때 엽니다)
+    logging.disable(logging.WARNING)  # bare mode 의 "missing ScriptRunContext" 경고는 숨깁니다.
+    os.makedirs(os.path.join(workdir, ".streamlit"))
+    with open(os.path.join(workdir, ".streamlit", "secrets.toml"), "w", encoding="utf-8") as f: f.write('GOOGLE_API_KEY = "offline"\n')
+    os.chdir(workdir)
+    import AIdoctor_app
+    AIdoctor_app.get_review_log()  # 첫 채점 때 pyarrow 를 불러오는 시간은 앱 시작 비용이라 미리 치릅니다.
+    return AIdoctor_app
+
+
+def upload(name, data):
+    # st.file_uploader 가 돌려주는 UploadedFile 처럼 name 과 getvalue() 가 있는 파일 객체
+    file = BytesIO(data)
+    file.name = name
+    return file
+
+
+def card_benchmarks(app, workdir, deck_size, repeat):
+    rng = random.Random(deck_size)
+    store = CardStore(os.path.join(workdir, f"cards_{deck_size}.db"))
+    store.add_cards([make_card(rng, i) for i in range(deck_size)], skip_duplicates=False)
+    ids = [card["id"] for batch in store.iter_cards() for card in batch]
+    today = date.today().isoformat()
+    counter = iter(range(deck_size, deck_size + 10 ** 6))
+
+    shown = {}
+
+    def show_card():
+        # 화면에 문제를 띄울 때 읽어 둔 카드 (채점 시간에는 넣지 않음)
+        shown.update(store.get_card(rng.choice(ids)))
+
+    def update_card_schedule():
+        app.update_card_schedule(shown["id"], True, DEFAULT_DECK, shown["version"], duration_ms=5000)
+
+    def next_question():
+        store.next_due_card(today)
+        store.due_count(today)
+
+    with mock.patch.object(app, "get_card_store", lambda: store):
+        return [
+            measure("문제 목록 한 페이지", deck_size, lambda: store.search_cards(limit=20), repeat),
+            measure("save_cards", deck_size, lambda: app.save_cards([make_card(rng, next(counter))], DEFAULT_DECK, source="강의.pdf"), repeat),
+            measure("update_card_schedule", deck_size, update_card_schedule, repeat, setup=show_card),
+            measure("다음 문제 조회", deck_size, next_question, repeat),
+        ]
+
+
+def document_benchmarks(app, n_pages, repeat):
+    rng = random.Random(n_pages)
+    pages = make_pages(rng, n_pages)
+    files = {
+        "pdf": bench_extract.make_pdf(bench_extract.make_pages(rng, n_pages)),  # 글꼴 없는 PDF 라 영문 문장으로
+        "docx": make_docx(pages), "pptx": make_pptx(pages)
+    }
+    summary = make_summary(n_pages * 5, seed=n_pages)
+    results = [
+        measure(f"read_file ({kind})", n_pages, lambda data=data, kind=kind: app.read_file(upload(f"note.{kind}", data)), max(3, repeat // 4),
+                setup=doc_extract._cache.clear)
+        for kind, data in files.items()
+    ]
+    results.append(measure("워드 내보내기", n_pages * 5, lambda: render_summary_docx(summary), max(3, repeat // 4)))
+    return results
+
+
+def generation_benchmarks(n_pages, latency, repeat):
+    rng = random.Random(n_pages)
+    pages = make_pages(rng, n_pages)
+    jokbo = "\n".join(rng.choice(SENTENCES) for _ in range(40))
+    client = FakeClient(latency=latency, jitter=latency / 4, seed=n_pages)
+    n_questions = min(100, max(5, n_pages // 10 * 5))  # 10쪽당 5문제
+    runs = max(2, repeat // 8)
+    return [
+        measure(f"문제 출제 {n_questions}문제", n_pages, lambda: list(generate_quiz_batches(client, "fake", pages, jokbo, n_questions)), runs),
+        measure("정리본 생성 (스트리밍)", n_pages, lambda: list(stream_summary_topics(client, "fake", pages, jokbo)), runs),
+    ]
+
+
+def app_benchmarks(workdir, deck_size, repeat):
+    # 앱 스크립트 전체 재실행 시간. 가짜 클라이언트를 쓰므로 secrets 에는 아무 키나 넣습니다.
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+    logging.disable(logging.WARNING)  # 재실행마다 나오는 Streamlit 위젯 경고는 숨깁니다.
+    rng = random.Random(deck_size)
+    appdir = os.path.join(workdir, f"app_{deck_size}")
+    os.makedirs(appdir)
+    CardStore(os.path.join(appdir, "medical_flashcards.db")).add_cards([make_card(rng, i) for i in range(deck_size)], skip_duplicates=False)
+    cwd = os.getcwd()
+    os.chdir(appdir)
+    # 같은 프로세스에서 덱 크기별로 앱을 다시 띄우므로, 이전 작업 폴더를 가리키는 캐시된 저장소는 비웁니다.
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    try:
+        with mock.patch("google.genai.Client", lambda *args, **kwargs: FakeClient()):
+            at = AppTest.from_file(APP_PATH, default_timeout=120)
+            at.secrets["GOOGLE_API_KEY"] = "offline"
+            at.run()
+            if at.exception: raise RuntimeError(at.exception[0].message)
+            return [measure("앱 재실행", deck_size, at.run, max(3, repeat // 4))]
+    finally: os.chdir(cwd)
+
+
+def print_table(results):
+    print(f"{'항목':<22} | {'크기':>6} | {'p50':>9} | {'p95':>9} | {'최대':>9} | {'최대 메모리':>9}")
+    for r in results:
+        print(f"{r['name']:<22} | {r['size']:>6} | {r['p50_ms']:>7.1f}ms | {r['p95_ms']:>7.1f}ms | {r['max_ms']:>7.1f}ms | {r['peak_mb']:>7.1f}MB")
+
+
+def compare(results, baseline_path, threshold):
+    # 같은 (항목, 크기) 의 p50 이 threshold 배 넘게 늘어난 항목을 돌려줍니다. 1ms 미만 항목은 잡음이 커서 뺍니다.
+    with open(baseline_path, "r", encoding="utf-8") as f: baseline = {(r["name"], r["size"]): r for r in json.load(f)}
+    regressions = []
+    for r in results:
+        old = baseline.get((r["name"], r["size"]))
+        if old and old["p50_ms"] >= 1 and r["p50_ms"] > old["p50_ms"] * threshold: regressions.append((r, old))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API 키 없이 앱 주요 경로의 지연 시간/메모리를 잽니다.")
+    parser.add_argument("--decks", type=int, nargs="+", default=[1000, 10000], help="덱 크기(카드 수)")
+    parser.add_argument("--pages", type=int, nargs="+", default=[20, 100], help="합성 문서 쪽 수")
+    parser.add_argument("--latency", type=float, default=0.2, help="가짜 Gemini 응답 지연(초)")
+    parser.add_argument("--repeat", type=int, default=20, help="빠른 항목의 반복 횟수 (느린 항목은 줄여서 씀)")
+    parser.add_argument("--app", action="store_true", help="앱 스크립트 전체 재실행 시간도 잽니다. (streamlit 필요)")
+    parser.add_argument("--json", help="결과를 저장할 JSON 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--threshold", type=float, default=1.5, help="p50 이 이 배수 넘게 늘면 회귀로 봅니다.")
+    args = parser.parse_args()
+
+    results = []
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            app = load_app(workdir)
+            for deck_size in args.decks:
+                results += card_benchmarks(app, workdir, deck_size, args.repeat)
+                if args.app: results += app_benchmarks(workdir, deck_size, args.repeat)
+            for n_pages in args.pages:
+                results += document_benchmarks(app, n_pages, args.repeat)
+                results += generation_benchmarks(n_pages, args.latency, args.repeat)
+        finally: os.chdir(cwd)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f: json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        regressions = compare(results, args.baseline, args.threshold)
+        for r, old in regressions:
+            print(f"⚠️ 느려짐: {r['name']} (크기 {r['size']}) p50 {old['p50_ms']:.1f}ms → {r['p50_ms']:.1f}ms")
+        if regressions: return 1
+        print("이전 결과 대비 느려진 항목 없음")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
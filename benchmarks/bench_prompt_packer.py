@@ -0,0 +1,62 @@
+# ==========================================
+# 프롬프트 분량 비교: 글자 수 자르기 vs 토큰 예산 패커
+# ==========================================
+# 한국어 위주 / 영어 위주 / 섞인 정리본(문단 400개, 그중 5% 는 족보와 같은 질환을 다룸)으로 5문제 요청 1회를 만들 때
+# - 이전 방식: 정리본 앞 15,000자 + 족보 앞 20,000자 (글자 수로 자름)
+# - 패커: 정리본 12,000토큰(족보 관련도 순) + 족보 16,000토큰 (문단 단위)
+# 요청에 들어간 추정 토큰 수, 문단 중간에서 잘렸는지, 족보 관련 문단이 몇 개 들어갔는지, 패킹 시간을 보여줍니다.
+# (토큰 수는 prompt_packer.estimate_tokens 추정치)
+# 사용법: python benchmarks/bench_prompt_packer.py [문단 수]
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from generation import JOKBO_TOKENS, QUIZ_SECTION_TOKENS, plan_quiz_batches  # noqa: E402
+from prompt_packer import estimate_tokens, fit_text  # noqa: E402
+
+KOREAN = "급성 간염 환자는 황달과 피로를 호소하며 간수치가 상승한다. 치료는 대증요법이 원칙이고 대부분 자연 회복된다."
+ENGLISH = "Patients with acute hepatitis present with jaundice and fatigue, and liver enzymes rise. Treatment is supportive and most recover."
+RELEVANT = "크론병(Crohn disease)은 회장 말단을 침범하는 transmural inflammation 으로 누공과 협착이 특징이며 skip lesion 을 보인다."
+JOKBO = "\n".join(f"{i}. 크론병의 특징으로 옳은 것은? ① 누공 형성 ② 직장에서 연속 병변 ③ 표층 염증 ④ 협착 ⑤ skip lesion" for i in range(1, 80))
+
+
+def make_note(kind, n_paragraphs, rng):
+    pages, relevant = [], set()
+    for i in range(n_paragraphs):
+        if rng.random() < 0.05:
+            pages.append(f"[{i}] " + RELEVANT * 2)
+            relevant.add(i)
+            continue
+        base = {"korean": KOREAN, "english": ENGLISH}.get(kind) or rng.choice([KOREAN, ENGLISH])
+        pages.append(f"[{i}] " + base * rng.randint(2, 5))
+    return pages, relevant
+
+
+def describe(pages, relevant, note_part, jokbo_part):
+    included = {i for i, page in enumerate(pages) if page in note_part}
+    cut = not any(note_part.endswith(page) for page in pages)
+    return estimate_tokens(note_part), estimate_tokens(jokbo_part), cut, len(included & relevant)
+
+
+def main(n_paragraphs=400):
+    rng = random.Random(n_paragraphs)
+    print(f"{'자료':>8} | {'방식':>6} | {'정리본 토큰':>10} | {'족보 토큰':>8} | {'문단 잘림':>8} | 족보 관련 문단 | 패킹 시간")
+    for kind in ("korean", "english", "mixed"):
+        pages, relevant = make_note(kind, n_paragraphs, rng)
+        legacy_note = "\n".join(pages)[:15000]
+        tokens, jokbo_tokens, cut, hits = describe(pages, relevant, legacy_note, JOKBO[:20000])
+        print(f"{kind:>8} | {'글자 수':>6} | {tokens:>10} | {jokbo_tokens:>8} | {'예' if cut else '아니오':>8} | {hits:>3}/{len(relevant):<10} | -")
+
+        start = time.perf_counter()
+        section = plan_quiz_batches(pages, 5, JOKBO)[0][0]
+        jokbo = fit_text(JOKBO, JOKBO_TOKENS)
+        seconds = time.perf_counter() - start
+        tokens, jokbo_tokens, cut, hits = describe(pages, relevant, section, jokbo)
+        assert tokens <= QUIZ_SECTION_TOKENS and jokbo_tokens <= JOKBO_TOKENS
+        print(f"{kind:>8} | {'패커':>6} | {tokens:>10} | {jokbo_tokens:>8} | {'예' if cut else '아니오':>8} | {hits:>3}/{len(relevant):<10} | {seconds * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main(*[int(a) for a in sys.argv[1:2]])
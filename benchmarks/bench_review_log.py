@@ -0,0 +1,86 @@
+# ==========================================
+# 채점 기록 통계 벤치마크: SQLite 행 테이블 vs Parquet 세그먼트
+# ==========================================
+# 합성 채점 기록(기본 1,000,000 / 3,000,000건, 덱 4개)에서 한 덱의 통계를 낼 때
+# - SQLite: 모든 기록을 reviews 테이블에 두고 pandas.read_sql_query 로 덱 행을 읽음
+# - Parquet: ReviewLog.load (필요한 컬럼만, 덱 조건으로 세그먼트를 읽음)
+# 의 읽기 시간과, 읽은 표로 review_log.summarize 를 계산하는 시간을 비교합니다. 디스크 크기도 보여줍니다.
+# 사용법: python benchmarks/bench_review_log.py [기록 수 ...]
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_store import REVIEW_COLUMNS, CardStore  # noqa: E402
+from review_log import ANALYTICS_COLUMNS, SCHEMA, ReviewLog, summarize  # noqa: E402
+
+DECKS = ["student0", "student1", "student2", "student3"]
+SEGMENT_ROWS = 250000
+
+
+def make_frame(size):
+    rng = np.random.default_rng(size)
+    sources = [f"강의{i:02d}.pdf" for i in range(40)]
+    source_no = rng.integers(0, len(sources), size)
+    topics = rng.integers(0, 12, size)
+    tags = np.array([[json.dumps([f"강의{s:02d}", f"주제{t}"], ensure_ascii=False) for t in range(12)] for s in range(len(sources))])
+    return pd.DataFrame({
+        "id": np.arange(1, size + 1), "card_id": rng.integers(1, 50000, size), "deck": np.array(DECKS)[rng.integers(0, len(DECKS), size)],
+        "reviewed_at": pd.Timestamp("2026-01-01") + pd.to_timedelta(np.sort(rng.integers(0, 300 * 86400, size)), unit="s"),
+        "grade": rng.choice([1, 3], size, p=[0.25, 0.75]), "scheduler": "sm2",
+        "elapsed_days": pd.array(rng.integers(0, 90, size), dtype="Int64"), "interval": rng.integers(1, 90, size),
+        "ease": 2.5, "stability": np.nan, "difficulty": np.nan,
+        "source": np.array(sources)[source_no], "tags": tags[source_no, topics],
+        "duration_ms": pd.array(rng.integers(3000, 120000, size), dtype="Int64"),
+    })
+
+
+def file_size(path):
+    if os.path.isfile(path): return os.path.getsize(path)
+    return sum(os.path.getsize(os.path.join(path, name)) for name in os.listdir(path))
+
+
+def main(sizes):
+    print(f"{'기록 수':>9} | {'SQLite 읽기':>10} | {'Parquet 읽기':>11} | {'통계 계산':>9} | 디스크(SQLite/Parquet)")
+    for size in sizes:
+        frame = make_frame(size)
+        with tempfile.TemporaryDirectory() as workdir:
+            store = CardStore(os.path.join(workdir, "cards.db"))
+            rows_db = sqlite3.connect(os.path.join(workdir, "rows.db"))
+            rows_db.execute(f"CREATE TABLE reviews ({', '.join(REVIEW_COLUMNS)})")
+            rows_db.execute("CREATE INDEX idx_reviews_deck ON reviews(deck, reviewed_at)")
+            as_rows = frame.assign(reviewed_at=frame["reviewed_at"].dt.strftime("%Y-%m-%dT%H:%M:%S")).astype(object)
+            rows_db.executemany(f"INSERT INTO reviews VALUES ({', '.join('?' * len(REVIEW_COLUMNS))})", as_rows.where(as_rows.notna(), None).itertuples(index=False))
+            rows_db.commit()
+
+            log = ReviewLog(os.path.join(workdir, "log"))
+            for start in range(0, size, SEGMENT_ROWS):
+                part = frame.iloc[start:start + SEGMENT_ROWS]
+                log._write_table(pa.Table.from_pandas(part, schema=SCHEMA, preserve_index=False), int(part["id"].iloc[0]), int(part["id"].iloc[-1]))
+
+            start = time.perf_counter()
+            from_sqlite = pd.read_sql_query(f"SELECT {', '.join(ANALYTICS_COLUMNS)} FROM reviews WHERE deck = ?", rows_db, params=(DECKS[0],))
+            sqlite_read = time.perf_counter() - start
+
+            start = time.perf_counter()
+            loaded = log.load(store, DECKS[0])
+            parquet_read = time.perf_counter() - start
+
+            start = time.perf_counter()
+            stats = summarize(loaded)
+            compute = time.perf_counter() - start
+            assert len(from_sqlite) == len(loaded) == stats["overview"]["reviews"]
+            sizes_mb = file_size(os.path.join(workdir, "rows.db")) / 1e6, file_size(log.directory) / 1e6
+            rows_db.close()
+        print(f"{size:>9} | {sqlite_read * 1000:>8.0f}ms | {parquet_read * 1000:>9.0f}ms | {compute * 1000:>7.0f}ms | {sizes_mb[0]:.0f}MB / {sizes_mb[1]:.0f}MB")
+
+
+if __name__ == "__main__":
+    main([int(a) for a in sys.argv[1:]] or [1000000, 3000000])
@@ -0,0 +1,73 @@
+# ==========================================
+# 망가진 생성 응답 처리: 묶음 전체 재요청 vs 부분 구제 + 모자란 개수만 재요청
+# ==========================================
+# fake_genai.FakeClient(corrupt_rate) 로 응답 일부를 망가뜨리고(잘림 / correct_index 빠짐 / 보기 7개) 5문제 묶음을 여러 번 만듭니다.
+# - 이전 방식: json.loads 가 실패하면 같은 요청을 통째로 다시 보내고, 형식이 틀린 문제가 하나라도 있으면 묶음 저장이 실패
+#   (+ 재생성: 실패한 묶음을 사용자가 다시 생성하는 경우, 최대 REGENERATE 번)
+# - 새 방식: generation.generate_quiz_batch (response_schema + llm_schema 검사/보정, 모자란 문제만 다시 요청)
+# API 호출 수, 요청한 문제 수(출력 토큰 양의 대용), 얻은 문제 수, 실패한 묶음 수, 오류 없이 모자라게 끝난 묶음 수, 걸린 시간을 비교합니다. (재시도 백오프 대기는 0 으로 두고 잽니다)
+# 사용법: python benchmarks/bench_salvage.py [--batches 100] [--corrupt 0.3] [--latency 0.02]
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import generation  # noqa: E402
+from card_store import validate_card  # noqa: E402
+from fake_genai import FakeClient  # noqa: E402
+from generation import QUIZ_BATCH_SIZE, build_quiz_prompt, call_json, generate_quiz_batch  # noqa: E402
+
+REGENERATE = 5
+SECTION = "\n".join(f"{i}. 급성 A형 간염은 IgM anti-HAV 양성으로 진단하며 대부분 자연 회복된다." for i in range(40))
+
+
+def legacy_batch(client, n):
+    quizzes = call_json(client, "fake", build_quiz_prompt(SECTION, "", n))
+    for quiz in quizzes: validate_card(quiz)
+    return quizzes
+
+
+def legacy_regenerate(client, n):
+    for attempt in range(REGENERATE):
+        try: return legacy_batch(client, n)
+        except Exception:
+            if attempt == REGENERATE - 1: raise
+
+
+def salvage_batch(client, n):
+    return generate_quiz_batch(client, "fake", SECTION, "", n)
+
+
+def run(label, make_batch, args):
+    client = FakeClient(latency=args.latency, corrupt_rate=args.corrupt, seed=1)
+    got, failed, short = 0, 0, 0
+    start = time.perf_counter()
+    for _ in range(args.batches):
+        try: quizzes = make_batch(client, QUIZ_BATCH_SIZE)
+        except Exception:
+            failed += 1
+            continue
+        got += len(quizzes)
+        short += len(quizzes) < QUIZ_BATCH_SIZE
+    seconds = time.perf_counter() - start
+    calls = client.calls['generate_content']
+    print(f"{label:<22} | {calls:>8} | {client.calls['corrupted']:>8} | {client.calls['quiz_items']:>8} | {got:>5}/{args.batches * QUIZ_BATCH_SIZE:<5} | "
+          f"{failed:>8} | {short:>8} | {calls / max(got, 1):>10.3f} | {seconds:7.2f}초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="망가진 응답 처리 방식 비교")
+    parser.add_argument("--batches", type=int, default=100)
+    parser.add_argument("--corrupt", type=float, default=0.3, help="응답을 망가뜨릴 비율")
+    parser.add_argument("--latency", type=float, default=0.02, help="가짜 응답 지연(초)")
+    args = parser.parse_args()
+    generation.BACKOFF_SECONDS = 0
+    print(f"{'방식':<22} | {'API 호출':>6} | {'망가진 응답':>6} | {'요청 문제':>6} | {'얻은 문제':>11} | {'실패 묶음':>6} | {'모자란 묶음':>6} | {'문제당 호출':>8} | 시간")
+    run("이전 (전체 재요청)", legacy_batch, args)
+    run("이전 + 실패 묶음 재생성", legacy_regenerate, args)
+    run("새 방식 (부분 구제)", salvage_batch, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,313 @@
+# ==========================================
+# 워드(DOCX) 정리본 렌더링 벤치마크 + 결과 비교
+# ==========================================
+# 합성 정리본(50 / 500 / 5000 행)을 이전 렌더러와 summary_docx.render_summary_docx 로 각각 만들고,
+# 소요 시간을 비교한 뒤 두 문서의 내용·서식(셀 병합/너비/음영, run 글자와 최종 글꼴·굵기·색·크기)이 같은지 확인합니다.
+# 사용법: python benchmarks/bench_summary_docx.py [행 수 ...]
+import os
+import random
+import re
+import sys
+import time
+import zipfile
+from io import BytesIO
+
+from docx import Document as DocxDocument
+from docx.enum.table import WD_CELL_VERTICAL_ALIGNMENT, WD_ROW_HEIGHT_RULE
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_COLOR_INDEX
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Cm, Pt, RGBColor
+from lxml import etree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from summary_docx import render_summary_docx  # noqa: E402
+
+ROWS_PER_TOPIC = 5
+
+
+# ── 이전 렌더러 (셀 API + run 마다 w:rFonts 추가) : 비교 기준 ──
+def legacy_set_cell_background(cell, color_hex):
+    cell_properties = cell._element.get_or_add_tcPr()
+    shading_elm = OxmlElement('w:shd')
+    shading_elm.set(qn('w:fill'), color_hex)
+    cell_properties.append(shading_elm)
+
+
+def legacy_set_font_style(run, font_name='맑은 고딕', font_size=9, is_bold=False):
+    run.font.name = font_name
+    run.font.size = Pt(font_size)
+    run.bold = is_bold
+    r = run._element
+    rPr = r.get_or_add_rPr()
+    fonts = OxmlElement('w:rFonts')
+    fonts.set(qn('w:eastAsia'), font_name)
+    fonts.set(qn('w:ascii'), font_name)
+    fonts.set(qn('w:hAnsi'), font_name)
+    rPr.append(fonts)
+
+
+def legacy_render_summary_docx(summary_data):
+    doc_out = DocxDocument()
+
+    # [제목]
+    title = doc_out.add_heading('의대 강의/족보 통합 정리본', level=0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run_title = title.runs[0]
+    legacy_set_font_style(run_title, font_size=16, is_bold=True)
+
+    # [범례]
+    legend = doc_out.add_paragraph()
+    legend.alignment = WD_ALIGN_PARAGRAPH.CENTER
+
+    run_y = legend.add_run('■ 정답  ')
+    legacy_set_font_style(run_y, font_size=9)
+    run_y.font.highlight_color = WD_COLOR_INDEX.YELLOW
+
+    run_b = legend.add_run('■ 관련 오답  ')
+    legacy_set_font_style(run_b, font_size=9)
+    run_b.font.color.rgb = RGBColor(0x19, 0x71, 0xC2)
+
+    run_g = legend.add_run('■ 무관 오답')
+    legacy_set_font_style(run_g, font_size=9)
+    run_g.font.color.rgb = RGBColor(0xAD, 0xB5, 0xBD)
+
+    doc_out.add_paragraph()
+
+    for item in summary_data:
+        main_topic = item.get('main_topic', '')
+        sub_sections = item.get('sub_sections', [])
+
+        if not sub_sections: continue
+
+        # 3열 테이블 생성 (소주제 / 세부분류 / 내용)
+        table = doc_out.add_table(rows=0, cols=3)
+        table.style = 'Table Grid'
+
+        # 메인 주제 행 (3칸 병합)
+        row_main = table.add_row()
+        cell_main = row_main.cells[0]
+        cell_main.merge(row_main.cells[1])
+        cell_main.merge(row_main.cells[2])
+        cell_main.text = main_topic
+
+        legacy_set_cell_background(cell_main, "495057")
+        p_main = cell_main.paragraphs[0]
+        p_main.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        run_main = p_main.runs[0]
+        run_main.font.color.rgb = RGBColor(255, 255, 255)
+        legacy_set_font_style(run_main, font_size=10, is_bold=True)
+
+        last_key = None
+        key_cell_anchor = None
+
+        for sub in sub_sections:
+            key = sub.get('key', '')
+            sub_key = sub.get('sub_key', '')
+            content = sub.get('value', '')
+
+            row = table.add_row()
+            row.height_rule = WD_ROW_HEIGHT_RULE.AT_LEAST
+            row.height = Cm(1.5)
+
+            # ── 1열: 소주제 (셀 병합 + 폰트 9pt) ──
+            cell_key = row.cells[0]
+
+            if key == last_key and key_cell_anchor is not None:
+                key_cell_anchor.merge(cell_key)
+            else:
+                cell_key.text = key
+                cell_key.width = Cm(2.5)
+                legacy_set_cell_background(cell_key, "E9ECEF")
+
+                p_k = cell_key.paragraphs[0]
+                p_k.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                legacy_set_font_style(p_k.runs[0], font_size=9, is_bold=True)
+                cell_key.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
+
+                key_cell_anchor = cell_key
+                last_key = key
+
+            # ── 2열 & 3열 처리 ──
+            if sub_key and sub_key.strip():
+                cell_sub = row.cells[1]
+                cell_sub.text = sub_key
+                cell_sub.width = Cm(2.5)
+                legacy_set_cell_background(cell_sub, "F8F9FA")
+
+                p_sub = cell_sub.paragraphs[0]
+                p_sub.alignment = WD_ALIGN_PARAGRAPH.CENTER
+                legacy_set_font_style(p_sub.runs[0], font_size=9, is_bold=True)
+                cell_sub.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
+
+                cell_val = row.cells[2]
+            else:
+                cell_sub = row.cells[1]
+                cell_sub.merge(row.cells[2])
+                cell_val = row.cells[1]
+
+            # ── 내용 채우기 ──
+            cell_val.vertical_alignment = WD_CELL_VERTICAL_ALIGNMENT.CENTER
+            p = cell_val.paragraphs[0]
+            p.paragraph_format.line_spacing = 1.0
+            p.paragraph_format.space_before = Pt(6)
+            p.paragraph_format.space_after = Pt(6)
+
+            parts = re.split(r'(<(?:yellow|blue|gray)>.*?</(?:yellow|blue|gray)>)', content)
+            for part in parts:
+                if not part: continue
+                tag_match = re.match(r'<(yellow|blue|gray)>(.*?)</\1>', part)
+                if tag_match:
+                    tag_type = tag_match.group(1)
+                    text_body = tag_match.group(2)
+                    run = p.add_run(text_body)
+
+                    if tag_type == 'yellow':
+                        run.font.highlight_color = WD_COLOR_INDEX.YELLOW
+                        legacy_set_font_style(run, font_size=9, is_bold=False)
+                    elif tag_type == 'blue':
+                        run.font.color.rgb = RGBColor(0x19, 0x71, 0xC2)
+                        legacy_set_font_style(run, font_size=9, is_bold=True)
+                    elif tag_type == 'gray':
+                        run.font.color.rgb = RGBColor(0xAD, 0xB5, 0xBD)
+                        legacy_set_font_style(run, font_size=9, is_bold=False)
+                else:
+                    run = p.add_run(part)
+                    legacy_set_font_style(run, font_size=9, is_bold=False)
+
+        doc_out.add_paragraph()
+
+    bio = BytesIO()
+    doc_out.save(bio)
+    return bio.getvalue()
+
+
+# ── 합성 데이터 ──
+def make_summary(n_rows, seed=0):
+    rng = random.Random(seed)
+    keys = ["개요", "원인", "진단", "진단", "치료", "예후"]
+    values = [
+        "1. 정의: 급성 간염\n2. 역학: 소아에서 흔함",
+        "1. IgM anti-HAV <yellow>양성</yellow>\n2. <blue>LFT 상승</blue> 및 <gray>HBsAg 음성</gray>",
+        "1. 대증 치료\t(입원 불필요)\n2. <yellow></yellow>예방접종 <blue>2회</gray>",
+        "  앞뒤 공백 & <특수문자>  ",
+        "",
+    ]
+    summary = []
+    for topic in range(-(-n_rows // ROWS_PER_TOPIC)):
+        n = min(ROWS_PER_TOPIC, n_rows - topic * ROWS_PER_TOPIC)
+        subs = sorted(rng.sample(range(len(keys)), n))
+        summary.append({
+            "main_topic": f"주제 {topic} - 질환명",
+            "sub_sections": [
+                {"key": keys[k], "sub_key": rng.choice(["", "혈액검사", "영상검사", None]), "value": rng.choice(values)}
+                for k in subs
+            ]
+        })
+    summary.append({"main_topic": "빈 주제", "sub_sections": []})
+    return summary
+
+
+# ── 비교: 스타일 상속까지 풀어서 최종 서식을 비교합니다 ──
+W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+def _merge_rpr(props, rpr):
+    if rpr is None: return
+    for child in rpr:
+        tag = child.tag.replace(W, "")
+        if tag == "rFonts":
+            fonts = props.setdefault("rFonts", {})
+            for name, value in child.attrib.items():
+                fonts[name.replace(W, "")] = value
+        elif tag in ("b", "color", "sz", "highlight"):
+            value = child.get(W + "val")
+            props[tag] = (value not in ("0", "false")) if tag == "b" else value
+
+
+class _Styles:
+    def __init__(self, styles_xml):
+        root = etree.fromstring(styles_xml)
+        self.styles = {s.get(W + "styleId"): s for s in root.iter(W + "style")}
+        self.defaults = {}
+        _merge_rpr(self.defaults, root.find(f"{W}docDefaults/{W}rPrDefault/{W}rPr"))
+
+    def chain(self, style_id):
+        chain = []
+        while style_id and style_id in self.styles:
+            chain.insert(0, self.styles[style_id])
+            based_on = self.styles[style_id].find(W + "basedOn")
+            style_id = based_on.get(W + "val") if based_on is not None else None
+        return chain
+
+    def run_props(self, p_style, r_style, rpr):
+        props = {k: (dict(v) if isinstance(v, dict) else v) for k, v in self.defaults.items()}
+        for style in self.chain(p_style or "Normal") + self.chain(r_style):
+            _merge_rpr(props, style.find(W + "rPr"))
+        _merge_rpr(props, rpr)
+        props.pop("rStyle", None)
+        props.setdefault("b", False)
+        return tuple(sorted((k, tuple(sorted(v.items())) if isinstance(v, dict) else v) for k, v in props.items()))
+
+
+def _props(element, skip=()):
+    if element is None: return ()
+    return tuple(
+        (child.tag.replace(W, ""), tuple(sorted((k.replace(W, ""), v) for k, v in child.attrib.items())))
+        for child in element if child.tag.replace(W, "") not in skip
+    )
+
+
+def _paragraph(p, styles):
+    ppr = p.find(W + "pPr")
+    p_style = ppr.find(W + "pStyle").get(W + "val") if ppr is not None and ppr.find(W + "pStyle") is not None else None
+    runs = []
+    for r in p.iter(W + "r"):
+        rpr = r.find(W + "rPr")
+        r_style = rpr.find(W + "rStyle").get(W + "val") if rpr is not None and rpr.find(W + "rStyle") is not None else None
+        text = "".join(
+            (c.text or "") if c.tag == W + "t" else "\n" if c.tag == W + "br" else "\t" if c.tag == W + "tab" else ""
+            for c in r
+        )
+        runs.append((text, styles.run_props(p_style, r_style, rpr)))
+    return ("p", p_style, _props(ppr, skip=("pStyle", "rPr")), tuple(runs))
+
+
+def normalized_document(docx_bytes):
+    with zipfile.ZipFile(BytesIO(docx_bytes)) as z:
+        body = etree.fromstring(z.read("word/document.xml")).find(W + "body")
+        styles = _Styles(z.read("word/styles.xml"))
+    blocks = []
+    for block in body:
+        if block.tag == W + "p": blocks.append(_paragraph(block, styles))
+        elif block.tag == W + "tbl":
+            rows = []
+            for tr in block.iter(W + "tr"):
+                cells = tuple(
+                    (_props(tc.find(W + "tcPr")), tuple(_paragraph(p, styles) for p in tc.iter(W + "p")))
+                    for tc in tr.iter(W + "tc")
+                )
+                rows.append((_props(tr.find(W + "trPr")), cells))
+            blocks.append(("tbl", _props(block.find(W + "tblPr")), _props(block.find(W + "tblGrid")), tuple(rows)))
+    return blocks
+
+
+def main(sizes):
+    print(f"{'행 수':>6} | {'이전 렌더러':>10} | {'새 렌더러':>9} | {'배속':>6} | 결과 동일")
+    all_same = True
+    for n_rows in sizes:
+        summary = make_summary(n_rows)
+        start = time.perf_counter()
+        old = legacy_render_summary_docx(summary)
+        old_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        new = render_summary_docx(summary)
+        new_seconds = time.perf_counter() - start
+        same = normalized_document(old) == normalized_document(new)
+        all_same = all_same and same
+        print(f"{n_rows:>6} | {old_seconds:>9.2f}s | {new_seconds:>8.3f}s | {old_seconds / new_seconds:>5.1f}x | {'예' if same else '아니오'}")
+    return 0 if all_same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main([int(a) for a in sys.argv[1:]] or [50, 500, 5000]))
@@ -0,0 +1,112 @@
+# ==========================================
+# 로컬 Gemini 대역 (API 키/네트워크 없이 생성 흐름을 재기 위한 가짜 클라이언트)
+# ==========================================
+# genai.Client 와 같은 모양(client.models.generate_content / generate_content_stream / count_tokens)만 흉내 냅니다.
+# - 응답 지연: latency 초 ± jitter (스트리밍이면 조각들에 나눠서 기다림)
+# - 응답 내용: 프롬프트 종류를 보고 만든 JSON (문제 생성 → 요청한 개수만큼 문제, 정리본 → 구간 내용으로 만든 주제 몇 개)
+# - failure_rate 비율로 예외를 내서 재시도/부분 실패 경로도 돌려 볼 수 있습니다.
+# - corrupt_rate 비율로 응답을 망가뜨립니다. (배열 중간에서 잘림 / 한 문제의 correct_index 빠짐 / 한 문제의 보기 7개)
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from types import SimpleNamespace
+
+_QUIZ_COUNT = re.compile(r"객관식 문제 (\d+)개")
+_NOTE_SECTION = re.compile(r"\[정리본\]\s*(.*?)\s*(?:\[족보|\[이미|JSON 배열로)", re.S)
+_LECTURE_SECTION = re.compile(r"강의: (.*?)\n\s*족보:", re.S)
+
+
+class FakeGenAIError(Exception):
+    pass
+
+
+class FakeModels:
+    def __init__(self, client):
+        self._client = client
+
+    def generate_content(self, model, contents, config=None):
+        self._client._record("generate_content")
+        self._client._sleep(1.0)
+        self._client._maybe_fail()
+        return SimpleNamespace(text=self._client._maybe_corrupt(self._client.respond(contents)))
+
+    def generate_content_stream(self, model, contents, config=None):
+        self._client._record("generate_content_stream")
+        self._client._maybe_fail()
+        text = self._client._maybe_corrupt(self._client.respond(contents))
+        pieces = max(1, self._client.stream_chunks)
+        size = -(-len(text) // pieces)
+        for i in range(0, len(text), size):
+            self._client._sleep(1.0 / pieces)
+            yield SimpleNamespace(text=text[i:i + size])
+
+    def count_tokens(self, model, contents):
+        self._client._record("count_tokens")
+        return SimpleNamespace(total_tokens=max(1, len(str(contents)) * 2 // 3))
+
+
+class FakeClient:
+    def __init__(self, latency=0.0, jitter=0.0, stream_chunks=8, failure_rate=0.0, seed=0, corrupt_rate=0.0):
+        self.latency, self.jitter, self.stream_chunks, self.failure_rate = latency, jitter, stream_chunks, failure_rate
+        self.corrupt_rate = corrupt_rate
+        self.calls = Counter()
+        self.models = FakeModels(self)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _record(self, name):
+        with self._lock: self.calls[name] += 1
+
+    def _sleep(self, share):
+        with self._lock: delay = max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter))
+        if delay: time.sleep(delay * share)
+
+    def _maybe_fail(self):
+        with self._lock: fail = self._rng.random() < self.failure_rate
+        if fail: raise FakeGenAIError("가짜 클라이언트가 일부러 낸 오류입니다.")
+
+    def _maybe_corrupt(self, text):
+        with self._lock:
+            if self._rng.random() >= self.corrupt_rate: return text
+            mode, point = self._rng.choice(("truncate", "missing_answer", "too_many_options")), self._rng.uniform(0.3, 0.9)
+        self._record("corrupted")
+        if mode == "truncate": return text[:int(len(text) * point)]
+        items = json.loads(text)
+        target = items[int(len(items) * point) % len(items)]
+        if "options" not in target: return text[:int(len(text) * point)]  # 정리본 응답은 잘라서 망가뜨립니다.
+        if mode == "missing_answer": target.pop("correct_index", None)
+        else: target["options"] += ["보기 6", "보기 7"]; target["correct_index"] = 6
+        return json.dumps(items, ensure_ascii=False)
+
+    def respond(self, prompt):
+        # 프롬프트 안의 자료 문장으로 응답을 만들어, 구간마다 다른 문제/주제가 나오게 합니다.
+        quiz = _QUIZ_COUNT.search(prompt)
+        if quiz:
+            source = _NOTE_SECTION.search(prompt)
+            return json.dumps(self._quiz(int(quiz.group(1)), source.group(1) if source else prompt), ensure_ascii=False)
+        source = _LECTURE_SECTION.search(prompt)
+        return json.dumps(self._summary(source.group(1) if source else prompt), ensure_ascii=False)
+
+    def _sentences(self, text, n):
+        lines = [line.strip() for line in text.split("\n") if len(line.strip()) > 10] or [text.strip() or "내용 없음"]
+        with self._lock: return [self._rng.choice(lines)[:120] for _ in range(n)]
+
+    def _quiz(self, n, text):
+        with self._lock: self.calls["quiz_items"] += n  # 요청받은 문제 수 (출력 토큰 양의 대용)
+        return [
+            {"question": f"{sentence} 에 대한 설명으로 옳은 것은?", "options": [f"보기 {k + 1} {sentence[k * 7:k * 7 + 20]}" for k in range(5)],
+             "correct_index": i % 5, "explanation": sentence, "topic": sentence[:10]}
+            for i, sentence in enumerate(self._sentences(text, n))
+        ]
+
+    def _summary(self, text):
+        return [
+            {"main_topic": sentence[:20], "sub_sections": [
+                {"key": key, "sub_key": "", "value": f"1. {sentence}\n2. <yellow>{sentence[:15]}</yellow>"}
+                for key in ("개요", "진단", "치료")
+            ]}
+            for sentence in self._sentences(text, 3)
+        ]
@@ -0,0 +1,116 @@
+# ==========================================
+# 카드 저장소 동시성 스트레스 테스트: 여러 세션이 같은 DB 파일을 동시에 씀
+# ==========================================
+# 세션마다 별도 연결(CardStore)을 열어 서로 다른 프로세스처럼 동작시킵니다.
+# (문제 문장이 거의 같으므로 중복 검사는 끄고 저장합니다)
+# - 각 세션은 자기 덱에 문제를 추가/삭제하고, 공용 덱("class")에도 문제를 추가합니다.
+# - 모든 세션이 공용 덱의 카드 1장을 낙관적 잠금(version)으로 반복 채점합니다. (실패하면 다시 읽고 재시도)
+# 끝나면 덱별 카드 수와 채점 횟수가 기대값과 정확히 같은지(잃어버린 갱신 0건) 확인합니다.
+# 비교용으로 이전 방식(JSON 전체 읽고-고치고-쓰기)을 같은 조건으로 돌려 사라진 카드 수도 보여줍니다.
+# 사용법: python benchmarks/stress_card_store.py [세션 수] [세션당 반복 수]
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from card_store import CardStore  # noqa: E402
+from scheduler import GRADE_GOOD  # noqa: E402
+
+SHARED_DECK = "class"
+
+
+def make_card(tag):
+    return {"question": f"{tag} 급성 A형 간염의 진단에 가장 유용한 검사는?", "options": ["IgM anti-HAV", "HBsAg"], "correct_index": 0}
+
+
+def deck_cards(store, deck):
+    return [card for batch in store.iter_cards(deck) for card in batch]
+
+
+def count_review(store, card):
+    # 채점 카운터: interval 을 1 늘린 상태를 낙관적 잠금(version)으로 저장합니다. 반환: 저장했으면 True
+    state = {key: card[key] for key in ("next_review", "ease", "stability", "difficulty", "reps", "lapses", "last_review")}
+    return store.record_review(card["id"], {**state, "interval": card["interval"] + 1}, GRADE_GOOD, "stress", SHARED_DECK, card["version"])
+
+
+def run_sessions(n_sessions, target):
+    barrier = threading.Barrier(n_sessions)
+    errors = []
+
+    def worker(n):
+        try:
+            barrier.wait()
+            target(n)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(n_sessions)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    for t in threads: t.join()
+    if errors: raise errors[0]
+    return time.perf_counter() - start
+
+
+def stress_store(path, n_sessions, rounds):
+    setup = CardStore(path)
+    counter_id = setup.add_card(make_card("채점 카운터"), deck=SHARED_DECK)
+    conflicts = []
+
+    def session(n):
+        store = CardStore(path)
+        deck = f"student{n}"
+        retries = 0
+        for r in range(rounds):
+            store.add_cards([make_card(f"{n}-{r}-{k}") for k in range(3)], deck=deck, skip_duplicates=False)
+            store.add_card(make_card(f"공용 {n}-{r}"), deck=SHARED_DECK)
+            # 방금 넣은 카드 중 1장을 삭제 → 세션 덱에는 라운드마다 2장씩 남아야 합니다.
+            store.delete_cards([deck_cards(store, deck)[-1]["id"]], deck=deck)
+            while True:
+                if count_review(store, store.get_card(counter_id, SHARED_DECK)): break
+                retries += 1
+        conflicts.append(retries)
+
+    seconds = run_sessions(n_sessions, session)
+    check = CardStore(path)
+    lost = sum(abs(len(deck_cards(check, f"student{n}")) - 2 * rounds) for n in range(n_sessions))
+    lost += abs(len(deck_cards(check, SHARED_DECK)) - (1 + n_sessions * rounds))
+    lost_reviews = (1 + n_sessions * rounds) - check.get_card(counter_id, SHARED_DECK)["interval"]
+    return seconds, lost, lost_reviews, sum(conflicts)
+
+
+def stress_legacy_json(path, n_sessions, rounds):
+    # 이전 방식: 매번 파일 전체를 읽고, 한 장 추가해서, 전체를 다시 씀 (잠금 없음)
+    with open(path, "w", encoding="utf-8") as f: json.dump([], f)
+
+    def session(n):
+        for r in range(rounds):
+            # 이전 load_cards 와 같이, 다른 세션이 쓰는 중이라 깨진 파일은 빈 목록으로 읽습니다.
+            try:
+                with open(path, "r", encoding="utf-8") as f: cards = json.load(f)
+            except ValueError: cards = []
+            cards.append(make_card(f"{n}-{r}"))
+            with open(path, "w", encoding="utf-8") as f: json.dump(cards, f, ensure_ascii=False)
+
+    seconds = run_sessions(n_sessions, session)
+    try:
+        with open(path, "r", encoding="utf-8") as f: saved = len(json.load(f))
+    except ValueError: saved = 0  # 마지막 쓰기끼리 겹쳐 파일 자체가 깨진 경우
+    return seconds, n_sessions * rounds - saved
+
+
+def main(n_sessions=8, rounds=50):
+    with tempfile.TemporaryDirectory() as workdir:
+        seconds, lost, lost_reviews, retries = stress_store(os.path.join(workdir, "cards.db"), n_sessions, rounds)
+        print(f"SQLite 저장소: 세션 {n_sessions}개 x {rounds}회, {seconds:.2f}초")
+        print(f"  사라지거나 남은 카드 {lost}장 / 잃어버린 채점 {lost_reviews}건 / 버전 충돌 후 재시도 {retries}회")
+        legacy_seconds, legacy_lost = stress_legacy_json(os.path.join(workdir, "legacy.json"), n_sessions, rounds)
+        print(f"이전 JSON 방식: {legacy_seconds:.2f}초, 사라진 카드 {legacy_lost}장 / {n_sessions * rounds}장")
+    return 0 if lost == 0 and lost_reviews == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main(*[int(a) for a in sys.argv[1:3]]))
@@ -0,0 +1,94 @@
+# ==========================================
+# 비슷한 문제 찾기 (MinHash + LSH)
+# ==========================================
+# 문제와 정답 보기를 정규화해 글자 3-gram 집합으로 만들고, MinHash 서명(64개 값)으로 줄입니다.
+# 오답 보기는 넣지 않습니다. 같은 오답 보기를 쓰는 다른 문제(예: A형/B형 간염 진단 검사)가 비슷해 보이기 때문입니다.
+# 두 서명에서 같은 위치 값이 같은 비율 ≈ 두 집합의 자카드 유사도입니다.
+# 서명을 4개씩 16개 밴드로 나눠 밴드별 버킷 키를 만들면, 버킷이 하나라도 겹치는 카드만 후보가 되므로
+# 덱 전체와 1:1 비교하지 않고 인덱스 조회 몇 번으로 중복 후보를 찾을 수 있습니다.
+# (유사도 0.7 이면 후보로 잡힐 확률 ≈ 99%, 0.3 이면 ≈ 13%)
+# 후보는 정규화한 정답이 같고 실제 자카드 유사도가 DUPLICATE_THRESHOLD 이상일 때만 중복으로 봅니다. (is_duplicate)
+import hashlib
+import re
+import unicodedata
+
+import numpy as np
+
+NUM_PERM = 64
+BANDS = 16
+ROWS_PER_BAND = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+DUPLICATE_THRESHOLD = 0.7  # 정답이 같고 실제 자카드 유사도가 이 이상이면 같은 문제로 봅니다.
+CANDIDATE_THRESHOLD = 0.5  # 서명으로 추정한 유사도가 이 이상인 후보만 실제 유사도를 계산합니다. (64개 서명의 추정 오차를 감안해 낮게)
+
+_PRIME = (1 << 31) - 1
+_rng = np.random.RandomState(20240601)  # 서명이 디스크에 저장되므로 순열 계수는 항상 같아야 합니다.
+_PERM_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.uint64)
+_PERM_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.uint64)
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize_text(text):
+    # 전각/반각, 대소문자, 공백, 문장부호 차이는 무시합니다.
+    text = unicodedata.normalize("NFKC", str(text or "")).casefold()
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def answer_text(card):
+    # 정규화한 정답 보기 문장 (보기 순서가 바뀌어도 같음). 정답을 알 수 없으면 ""
+    options, index = card.get("options") or [], card.get("correct_index")
+    if isinstance(index, bool) or not isinstance(index, int) or not 0 <= index < len(options): return ""
+    return normalize_text(options[index])
+
+
+def shingles(card):
+    # 문제와 정답 보기를 따로 쪼개 합집합을 씁니다.
+    grams = set()
+    for part in (card.get("question"), answer_text(card)):
+        text = normalize_text(part)
+        if len(text) <= SHINGLE_SIZE: grams.add(text)
+        else: grams.update(text[i:i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1))
+    return grams
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def is_duplicate(card, other):
+    # 정답이 같고 문제+정답 3-gram 자카드 유사도가 DUPLICATE_THRESHOLD 이상이면 같은 문제입니다.
+    return answer_text(card) == answer_text(other) and jaccard(shingles(card), shingles(other)) >= DUPLICATE_THRESHOLD
+
+
+def signature(card):
+    # MinHash 서명 (uint32 NUM_PERM 개)
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(gram.encode("utf-8"), digest_size=4).digest(), "little") for gram in shingles(card)),
+        dtype=np.uint64
+    )
+    if hashes.size == 0: return np.zeros(NUM_PERM, dtype=np.uint32)
+    values = (np.outer(hashes, _PERM_A) + _PERM_B) % _PRIME
+    return values.min(axis=0).astype(np.uint32)
+
+
+def signature_to_blob(sig):
+    return sig.astype("<u4").tobytes()
+
+
+def blob_to_signature(blob):
+    return np.frombuffer(blob, dtype="<u4").astype(np.uint32)
+
+
+def similarity(sig_a, sig_b):
+    return float(np.count_nonzero(sig_a == sig_b)) / NUM_PERM
+
+
+def lsh_keys(sig, deck):
+    # 밴드별 버킷 키 (SQLite INTEGER 에 들어가도록 부호 있는 64비트). 덱 이름을 섞어 다른 덱과는 겹치지 않게 합니다.
+    prefix = deck.encode("utf-8") + b"\0"
+    keys = []
+    for band in range(BANDS):
+        chunk = sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND].astype("<u4").tobytes()
+        digest = hashlib.blake2b(prefix + bytes([band]) + chunk, digest_size=8).digest()
+        keys.append(int.from_bytes(digest, "little", signed=True))
+    return keys
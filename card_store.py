@@ -0,0 +1,528 @@
+# ==========================================
+# 플래시카드 저장소 (SQLite)
+# ==========================================
+# 예전에는 medical_flashcards.json 전체를 매번 읽고 다시 쓰는 구조였습니다.
+# 이제는 카드 1장 = 1행으로 저장하고, 추가/수정/삭제는 해당 행만 건드립니다.
+# 카드마다 고정 id가 부여되고, (deck, next_review) 에는 인덱스가 걸려 있습니다.
+# 한 서버를 여러 학생이 같이 쓰므로 모든 조회/쓰기는 덱(deck) 단위로 나뉩니다.
+# 쓰기는 BEGIN IMMEDIATE 트랜잭션으로 하고, 복습 일정 갱신은 version 컬럼으로 낙관적 잠금을 겁니다.
+# 새 문제는 저장 전에 MinHash/LSH 인덱스(card_lsh)로 같은 덱의 비슷한 문제가 있는지 확인합니다. (card_dedup.py)
+# 문제/보기/해설/태그는 FTS5(trigram) 색인으로 검색하고, 태그는 card_tags 로 정확히 거릅니다. (둘 다 트리거로 유지)
+# 채점할 때마다 스케줄러 상태(ease/stability/...)를 카드에 저장하고 reviews 테이블에 기록을 남깁니다. (scheduler.py)
+import json
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+import perf
+from card_dedup import CANDIDATE_THRESHOLD, blob_to_signature, is_duplicate, lsh_keys, signature, signature_to_blob, similarity
+
+# 스키마 버전별 마이그레이션 (PRAGMA user_version 으로 적용 여부를 기록)
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS cards (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        question TEXT NOT NULL,
+        options TEXT NOT NULL,
+        correct_index INTEGER NOT NULL,
+        explanation TEXT NOT NULL DEFAULT '',
+        next_review TEXT NOT NULL,
+        interval INTEGER NOT NULL DEFAULT 1
+    );
+    CREATE INDEX IF NOT EXISTS idx_cards_next_review ON cards(next_review);
+    """,
+    # 덱 분리 + 낙관적 잠금용 버전. 기존 카드는 모두 기본 덱으로 들어갑니다.
+    """
+    ALTER TABLE cards ADD COLUMN deck TEXT NOT NULL DEFAULT 'default';
+    ALTER TABLE cards ADD COLUMN version INTEGER NOT NULL DEFAULT 1;
+    DROP INDEX IF EXISTS idx_cards_next_review;
+    CREATE INDEX IF NOT EXISTS idx_cards_deck_next_review ON cards(deck, next_review);
+    """,
+    # 중복 검사용 MinHash 서명 + LSH 버킷 인덱스. 카드가 지워지면 버킷 행도 트리거로 같이 지웁니다.
+    """
+    ALTER TABLE cards ADD COLUMN minhash BLOB;
+    CREATE TABLE IF NOT EXISTS card_lsh (
+        bucket INTEGER NOT NULL,
+        card_id INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_card_lsh_bucket ON card_lsh(bucket);
+    CREATE INDEX IF NOT EXISTS idx_card_lsh_card ON card_lsh(card_id);
+    CREATE TRIGGER IF NOT EXISTS cards_lsh_cleanup AFTER DELETE ON cards BEGIN
+        DELETE FROM card_lsh WHERE card_id = old.id;
+    END;
+    """,
+    # 검색: 출처 문서/태그(JSON 배열) 컬럼 + 전문 검색 색인(trigram 이라 한국어 부분 문자열도 찾음) + 태그 색인
+    """
+    ALTER TABLE cards ADD COLUMN source TEXT NOT NULL DEFAULT '';
+    ALTER TABLE cards ADD COLUMN tags TEXT NOT NULL DEFAULT '[]';
+    CREATE VIRTUAL TABLE IF NOT EXISTS cards_fts USING fts5(
+        question, options, explanation, tags, content='cards', content_rowid='id', tokenize='trigram'
+    );
+    INSERT INTO cards_fts(cards_fts) VALUES ('rebuild');
+    CREATE TABLE IF NOT EXISTS card_tags (
+        card_id INTEGER NOT NULL,
+        tag TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_card_tags_tag ON card_tags(tag, card_id);
+    CREATE INDEX IF NOT EXISTS idx_card_tags_card ON card_tags(card_id);
+    CREATE TRIGGER IF NOT EXISTS cards_search_insert AFTER INSERT ON cards BEGIN
+        INSERT INTO cards_fts(rowid, question, options, explanation, tags) VALUES (new.id, new.question, new.options, new.explanation, new.tags);
+        INSERT INTO card_tags (card_id, tag) SELECT new.id, value FROM json_each(new.tags);
+    END;
+    CREATE TRIGGER IF NOT EXISTS cards_search_delete AFTER DELETE ON cards BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, question, options, explanation, tags) VALUES ('delete', old.id, old.question, old.options, old.explanation, old.tags);
+        DELETE FROM card_tags WHERE card_id = old.id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS cards_search_update AFTER UPDATE OF question, options, explanation, tags ON cards BEGIN
+        INSERT INTO cards_fts(cards_fts, rowid, question, options, explanation, tags) VALUES ('delete', old.id, old.question, old.options, old.explanation, old.tags);
+        INSERT INTO cards_fts(rowid, question, options, explanation, tags) VALUES (new.id, new.question, new.options, new.explanation, new.tags);
+        DELETE FROM card_tags WHERE card_id = old.id;
+        INSERT INTO card_tags (card_id, tag) SELECT new.id, value FROM json_each(new.tags);
+    END;
+    """,
+    # 복습 스케줄러 상태(scheduler.py) + 채점 기록. 이전 방식으로 한 번 이상 맞힌 카드(간격 > 1)는 연속 정답 2회로 봅니다.
+    # 채점 기록은 카드를 지워도 통계용으로 남겨 둡니다.
+    """
+    ALTER TABLE cards ADD COLUMN ease REAL NOT NULL DEFAULT 2.5;
+    ALTER TABLE cards ADD COLUMN stability REAL;
+    ALTER TABLE cards ADD COLUMN difficulty REAL;
+    ALTER TABLE cards ADD COLUMN reps INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE cards ADD COLUMN lapses INTEGER NOT NULL DEFAULT 0;
+    ALTER TABLE cards ADD COLUMN last_review TEXT;
+    UPDATE cards SET reps = 2 WHERE interval > 1;
+    CREATE TABLE IF NOT EXISTS reviews (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        card_id INTEGER NOT NULL,
+        deck TEXT NOT NULL,
+        reviewed_at TEXT NOT NULL,
+        grade INTEGER NOT NULL,
+        scheduler TEXT NOT NULL,
+        elapsed_days INTEGER,
+        interval INTEGER NOT NULL,
+        ease REAL,
+        stability REAL,
+        difficulty REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_reviews_card ON reviews(card_id, id);
+    CREATE INDEX IF NOT EXISTS idx_reviews_deck ON reviews(deck, reviewed_at);
+    """,
+    # 통계용: 채점 당시 카드의 출처/태그와 푸는 데 걸린 시간. reviews 는 이제 Parquet 로 옮기기 전까지의 버퍼입니다. (review_log.py)
+    """
+    ALTER TABLE reviews ADD COLUMN source TEXT NOT NULL DEFAULT '';
+    ALTER TABLE reviews ADD COLUMN tags TEXT NOT NULL DEFAULT '[]';
+    ALTER TABLE reviews ADD COLUMN duration_ms INTEGER;
+    UPDATE reviews SET source = (SELECT source FROM cards WHERE cards.id = reviews.card_id), tags = (SELECT tags FROM cards WHERE cards.id = reviews.card_id)
+        WHERE card_id IN (SELECT id FROM cards);
+    """,
+    # 중복 검사 서명을 문제 + 정답 보기 기준으로 다시 계산합니다. (오답 보기만 비슷한 다른 문제를 중복으로 보던 문제)
+    """
+    DELETE FROM card_lsh;
+    """,
+]
+
+MAX_OPTIONS = 5
+DEFAULT_DECK = "default"
+MAX_DECK_NAME = 40
+MAX_TAGS = 5
+MAX_TAG_LENGTH = 30
+FTS_MIN_TERM = 3  # trigram 색인은 3글자 이상 검색어만 찾을 수 있습니다. 더 짧으면 LIKE 로 거릅니다.
+_CARD_COLUMNS = (
+    "id, question, options, correct_index, explanation, next_review, interval, version, source, tags,"
+    " ease, stability, difficulty, reps, lapses, last_review"
+)
+REVIEW_COLUMNS = (
+    "id", "card_id", "deck", "reviewed_at", "grade", "scheduler", "elapsed_days", "interval", "ease", "stability", "difficulty",
+    "source", "tags", "duration_ms"
+)
+_INSERT_CARD = (
+    "INSERT INTO cards (question, options, correct_index, explanation, next_review, interval, source, tags,"
+    " ease, stability, difficulty, reps, lapses, last_review, deck, minhash)"
+    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+
+def _statements(script):
+    # 마이그레이션 스크립트를 문장 단위로 나눕니다. (트리거 본문 안의 ; 는 문장이 끝날 때까지 이어 붙임)
+    buffer = ""
+    for piece in script.split(";"):
+        buffer += piece + ";"
+        if sqlite3.complete_statement(buffer):
+            if buffer.strip(" \n;"): yield buffer
+            buffer = ""
+
+
+def _today():
+    return datetime.now().strftime("%Y-%m-%d")
+
+
+def normalize_deck(name):
+    # 덱 이름: 앞뒤 공백 제거, 최대 길이 제한. 비어 있으면 기본 덱입니다.
+    name = " ".join(str(name or "").split())[:MAX_DECK_NAME]
+    return name or DEFAULT_DECK
+
+
+def normalize_tags(tags):
+    # 태그: 공백 정리, 길이 제한, 중복 제거(순서 유지), 최대 MAX_TAGS 개
+    result = []
+    for tag in tags or []:
+        tag = " ".join(str(tag or "").split())[:MAX_TAG_LENGTH]
+        if tag and tag not in result: result.append(tag)
+    return result[:MAX_TAGS]
+
+
+def validate_card(card):
+    # 카드 스키마 검사: 문제/보기(2~5개, 원문자 ①~⑤ 개수)/정답 번호/해설
+    if not isinstance(card, dict): raise ValueError("카드는 dict 여야 합니다.")
+    if not isinstance(card.get("question"), str) or not card["question"].strip():
+        raise ValueError("question 이 비어 있습니다.")
+    options = card.get("options")
+    if not isinstance(options, list) or not 2 <= len(options) <= MAX_OPTIONS or not all(isinstance(o, str) for o in options):
+        raise ValueError(f"options 는 문자열 2~{MAX_OPTIONS}개의 리스트여야 합니다.")
+    correct_index = card.get("correct_index")
+    if isinstance(correct_index, bool) or not isinstance(correct_index, int) or not 0 <= correct_index < len(options):
+        raise ValueError("correct_index 가 보기 범위를 벗어났습니다.")
+    if not isinstance(card.get("explanation", ""), str):
+        raise ValueError("explanation 은 문자열이어야 합니다.")
+
+
+def _row_to_card(row):
+    return {
+        "id": row[0], "question": row[1], "options": json.loads(row[2]), "correct_index": row[3],
+        "explanation": row[4], "next_review": row[5], "interval": row[6], "version": row[7],
+        "source": row[8], "tags": json.loads(row[9]),
+        "ease": row[10], "stability": row[11], "difficulty": row[12], "reps": row[13], "lapses": row[14], "last_review": row[15]
+    }
+
+
+def _card_meta(card):
+    return str(card.get("source") or ""), json.dumps(normalize_tags(card.get("tags")), ensure_ascii=False)
+
+
+def _card_state(card):
+    # 스케줄러 상태 (없으면 새 카드 기본값)
+    return (
+        card.get("ease") or 2.5, card.get("stability"), card.get("difficulty"),
+        card.get("reps") or 0, card.get("lapses") or 0, card.get("last_review")
+    )
+
+
+def _like_pattern(term):
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _card_to_params(card):
+    return (
+        card["question"], json.dumps(card["options"], ensure_ascii=False), card["correct_index"],
+        card.get("explanation", ""), card.get("next_review") or _today(), card.get("interval", 1)
+    )
+
+
+class CardStore:
+    def __init__(self, path, legacy_json_path=None, busy_timeout=10.0):
+        self.path = path
+        # Streamlit 은 세션마다 다른 스레드에서 스크립트를 돌리므로 연결 하나를 잠금으로 보호합니다.
+        # 다른 프로세스(다른 연결)와는 SQLite 파일 잠금으로 직렬화되며, 잠겨 있으면 busy_timeout 초까지 기다립니다.
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=busy_timeout, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self.legacy_import = None  # 기존 JSON 을 옮겼으면 {"cards": 옮긴 수, "skipped": 형식 오류로 건너뛴 수}
+        self._migrate(legacy_json_path)
+
+    @contextmanager
+    def _write(self):
+        # 쓰기 트랜잭션: 시작할 때 바로 쓰기 잠금을 잡으므로(BEGIN IMMEDIATE) 읽고-고치고-쓰는 사이에
+        # 다른 연결이 끼어들 수 없습니다. 예외가 나면 전부 되돌립니다.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try: yield
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._conn.commit()
+
+    def _migrate(self, legacy_json_path):
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, script in enumerate(_MIGRATIONS[version:], start=version + 1):
+                # 스키마 변경, 기존 JSON 이전, 버전 기록을 한 트랜잭션으로 묶습니다. (executescript 는 중간에 커밋하므로 쓰지 않음)
+                with self._write():
+                    for statement in _statements(script): self._conn.execute(statement)
+                    if target == 1 and legacy_json_path:
+                        self._import_legacy_json(legacy_json_path)
+                    if target == 7: self._backfill_fingerprints()  # 3번에서 만든 인덱스를 지금 서명 방식으로 다시 채웁니다.
+                    self._conn.execute(f"PRAGMA user_version = {target}")
+
+    def _import_legacy_json(self, json_path):
+        # 최초 실행 시 기존 JSON 카드들을 한 번만 옮겨옵니다. (원본 파일은 백업으로 그대로 둡니다)
+        if not os.path.exists(json_path): return
+        try:
+            with open(json_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError): return
+        # 형식이 틀린 카드(정답 번호가 없는 등)는 건너뜁니다. 하나 때문에 마이그레이션 전체가 되돌려지면 앱이 매번 시작하지 못합니다.
+        cards, skipped = [], 0
+        for card in data if isinstance(data, list) else []:
+            try: validate_card(card)
+            except ValueError:
+                skipped += 1
+                continue
+            cards.append(card)
+        self.legacy_import = {"cards": len(cards), "skipped": skipped}
+        self._conn.executemany(
+            "INSERT INTO cards (question, options, correct_index, explanation, next_review, interval) VALUES (?, ?, ?, ?, ?, ?)",
+            [_card_to_params(card) for card in cards]
+        )
+
+    def _backfill_fingerprints(self):
+        # 이미 저장된 모든 카드의 서명/버킷을 지금 방식(card_dedup.signature)으로 계산해 둡니다.
+        rows = self._conn.execute("SELECT id, question, options, correct_index, deck FROM cards").fetchall()
+        for card_id, question, options, correct_index, deck in rows:
+            sig = signature({"question": question, "options": json.loads(options), "correct_index": correct_index})
+            self._conn.execute("UPDATE cards SET minhash = ? WHERE id = ?", (signature_to_blob(sig), card_id))
+            self._conn.executemany("INSERT INTO card_lsh (bucket, card_id) VALUES (?, ?)", [(key, card_id) for key in lsh_keys(sig, deck)])
+
+    def _insert_card(self, card, deck, sig):
+        cur = self._conn.execute(_INSERT_CARD, _card_to_params(card) + _card_meta(card) + _card_state(card) + (deck, signature_to_blob(sig)))
+        self._conn.executemany("INSERT INTO card_lsh (bucket, card_id) VALUES (?, ?)", [(key, cur.lastrowid) for key in lsh_keys(sig, deck)])
+        return cur.lastrowid
+
+    def _find_similar(self, card, sig, deck):
+        # LSH 버킷이 하나라도 겹치는 카드만 꺼내 서명으로 추린 뒤, 정답과 실제 유사도로 확인합니다. (card_dedup.is_duplicate)
+        # 반환: 같은 문제로 본 기존 카드 (id, 문제), 없으면 None
+        keys = lsh_keys(sig, deck)
+        rows = self._conn.execute(
+            "SELECT DISTINCT c.id, c.minhash, c.question, c.options, c.correct_index FROM card_lsh l JOIN cards c ON c.id = l.card_id"
+            f" WHERE l.bucket IN ({', '.join('?' * len(keys))})",
+            keys
+        ).fetchall()
+        for card_id, blob, question, options, correct_index in rows:
+            if not blob or similarity(sig, blob_to_signature(blob)) < CANDIDATE_THRESHOLD: continue
+            if is_duplicate(card, {"question": question, "options": json.loads(options), "correct_index": correct_index}):
+                return card_id, question
+        return None
+
+    # ── 조회 (모두 덱 단위) ──
+    def iter_cards(self, deck=DEFAULT_DECK, batch_size=1000):
+        # 덱의 카드를 id 순으로 batch_size 장씩 읽습니다. (내보내기처럼 덱 전체를 한 번에 올리지 않을 때)
+        after_id = 0
+        while True:
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {_CARD_COLUMNS} FROM cards WHERE deck = ? AND id > ? ORDER BY id LIMIT ?", (deck, after_id, batch_size)
+                ).fetchall()
+            if not rows: return
+            yield [_row_to_card(row) for row in rows]
+            after_id = rows[-1][0]
+
+    # ── 검색: 현재 페이지에 필요한 카드만 읽습니다 ──
+    def _search_condition(self, deck, query, tag):
+        # 검색어는 공백으로 나눠 모두 포함(AND)하는 카드를 찾습니다. 반환: (WHERE 절, 파라미터)
+        where, params = ["c.deck = ?"], [deck]
+        terms = query.split()
+        long_terms = [term for term in terms if len(term) >= FTS_MIN_TERM]
+        if long_terms:
+            where.append("c.id IN (SELECT rowid FROM cards_fts WHERE cards_fts MATCH ?)")
+            params.append(" AND ".join('"' + term.replace('"', '""') + '"' for term in long_terms))
+        for term in terms:
+            if len(term) >= FTS_MIN_TERM: continue
+            where.append("(c.question || ' ' || c.options || ' ' || c.explanation || ' ' || c.tags) LIKE ? ESCAPE '\\'")
+            params.append(_like_pattern(term))
+        if tag:
+            where.append("c.id IN (SELECT card_id FROM card_tags WHERE tag = ?)")
+            params.append(tag)
+        return " AND ".join(where), params
+
+    @perf.timed("store.search_cards")
+    def search_cards(self, deck=DEFAULT_DECK, query="", tag=None, limit=20, after_id=0):
+        # id 순으로 after_id 다음 카드부터 limit 장을 읽습니다. (키셋 페이지: 앞 페이지에서 카드가 지워져도 밀리지 않음)
+        # 반환: (카드 리스트, 전체 일치 수)
+        condition, params = self._search_condition(deck, query, tag)
+        columns = ", ".join(f"c.{column.strip()}" for column in _CARD_COLUMNS.split(","))
+        with self._lock:
+            total = self._conn.execute(f"SELECT COUNT(*) FROM cards c WHERE {condition}", params).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT {columns} FROM cards c WHERE {condition} AND c.id > ? ORDER BY c.id LIMIT ?", params + [after_id, limit]
+            ).fetchall()
+        return [_row_to_card(row) for row in rows], total
+
+    @perf.timed("store.tag_counts")
+    def tag_counts(self, deck=DEFAULT_DECK):
+        # 덱의 태그별 카드 수 (많은 순)
+        with self._lock:
+            return self._conn.execute(
+                "SELECT t.tag, COUNT(*) FROM card_tags t JOIN cards c ON c.id = t.card_id WHERE c.deck = ? GROUP BY t.tag ORDER BY COUNT(*) DESC, t.tag",
+                (deck,)
+            ).fetchall()
+
+    def get_card(self, card_id, deck=DEFAULT_DECK):
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_CARD_COLUMNS} FROM cards WHERE id = ? AND deck = ?", (card_id, deck)).fetchone()
+        return _row_to_card(row) if row else None
+
+    # ── 복습 대기열: (deck, next_review) 인덱스를 (next_review, id) 순서로 타므로 전체 스캔이 없습니다 ──
+    @perf.timed("store.next_due_card")
+    def next_due_card(self, today, deck=DEFAULT_DECK):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_CARD_COLUMNS} FROM cards WHERE deck = ? AND next_review <= ? ORDER BY next_review, id LIMIT 1", (deck, today)
+            ).fetchone()
+        return _row_to_card(row) if row else None
+
+    @perf.timed("store.due_count")
+    def due_count(self, today, deck=DEFAULT_DECK):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cards WHERE deck = ? AND next_review <= ?", (deck, today)).fetchone()[0]
+
+    @perf.timed("store.due_histogram")
+    def due_histogram(self, start, end, deck=DEFAULT_DECK):
+        # start~end 날짜별 복습 예정 카드 수 {"YYYY-MM-DD": 개수} (같은 인덱스의 범위 조회)
+        with self._lock:
+            return dict(self._conn.execute(
+                "SELECT next_review, COUNT(*) FROM cards WHERE deck = ? AND next_review BETWEEN ? AND ? GROUP BY next_review", (deck, start, end)
+            ).fetchall())
+
+    @perf.timed("store.schedule_rows")
+    def schedule_rows(self, deck=DEFAULT_DECK):
+        # 복습량 예측용 (next_review, interval, ease) 목록. 카드 본문은 읽지 않습니다.
+        with self._lock:
+            return self._conn.execute("SELECT next_review, interval, ease FROM cards WHERE deck = ?", (deck,)).fetchall()
+
+    # ── 채점 기록 버퍼 (review_log.py 가 Parquet 세그먼트로 옮겨 감) ──
+    def pending_reviews(self, deck=None, after_id=0):
+        # 아직 옮기지 않은 채점 기록 (REVIEW_COLUMNS 순서의 튜플). deck 이 None 이면 모든 덱
+        sql, params = f"SELECT {', '.join(REVIEW_COLUMNS)} FROM reviews WHERE id > ?", [after_id]
+        if deck is not None: sql, params = sql + " AND deck = ?", params + [deck]
+        with self._lock:
+            return self._conn.execute(sql + " ORDER BY id", params).fetchall()
+
+    def pending_review_stats(self):
+        # (버퍼 행 수, 마지막 id) — 통계 캐시 키와 압축 시점 판단용
+        with self._lock:
+            count, last_id = self._conn.execute("SELECT COUNT(*), MAX(id) FROM reviews").fetchone()
+        return count, last_id or 0
+
+    @perf.timed("store.compact_reviews")
+    def compact_reviews(self, write_segment, flushed_id, min_rows=1):
+        # 버퍼가 min_rows 이상이면 write_segment(행 목록)로 넘기고, 성공하면 버퍼에서 지웁니다. 반환: 옮긴 행 수
+        # 쓰기 잠금 안에서 하므로 여러 프로세스가 동시에 압축해도 같은 행이 두 번 옮겨지지 않습니다.
+        # flushed_id() 는 이미 세그먼트에 들어간 마지막 id 로, 파일은 썼는데 커밋 전에 죽은 경우 그 행들을 먼저 정리합니다.
+        with self._write():
+            self._conn.execute("DELETE FROM reviews WHERE id <= ?", (flushed_id(),))
+            if self._conn.execute("SELECT COUNT(*) FROM reviews").fetchone()[0] < min_rows: return 0
+            rows = self._conn.execute(f"SELECT {', '.join(REVIEW_COLUMNS)} FROM reviews ORDER BY id").fetchall()
+            write_segment(rows)
+            self._conn.execute("DELETE FROM reviews WHERE id <= ?", (rows[-1][0],))
+            return len(rows)
+
+    # ── 쓰기 (모두 단일 트랜잭션) ──
+    def add_card(self, card, deck=DEFAULT_DECK):
+        sig = signature(card)
+        with self._write():
+            return self._insert_card(card, deck, sig)
+
+    @perf.timed("store.add_cards")
+    def add_cards(self, cards, deck=DEFAULT_DECK, skip_duplicates=True, skipped=None):
+        # 배치 전체를 먼저 검사한 뒤 하나의 트랜잭션으로 넣습니다. 중간에 실패하면 아무것도 저장되지 않습니다.
+        # skip_duplicates 면 덱에 이미 있거나 같은 배치 안에서 앞에 나온 비슷한 문제는 건너뜁니다.
+        # skipped(list) 를 넘기면 건너뛴 문제마다 {"question": 새 문제, "similar_to": 기존 문제} 를 덧붙입니다.
+        # 반환: 실제로 저장한 카드 수
+        for i, card in enumerate(cards):
+            try: validate_card(card)
+            except ValueError as e: raise ValueError(f"{i + 1}번째 문제: {e}") from None
+        sigs = [signature(card) for card in cards]
+        saved = 0
+        with self._write():
+            for card, sig in zip(cards, sigs):
+                found = self._find_similar(card, sig, deck) if skip_duplicates else None
+                if found:
+                    if skipped is not None: skipped.append({"question": card["question"], "similar_to": found[1]})
+                    continue
+                self._insert_card(card, deck, sig)
+                saved += 1
+        return saved
+
+    @perf.timed("store.import_cards")
+    def import_cards(self, cards, deck=DEFAULT_DECK, skip_duplicates=True):
+        # 내보낸 덱 파일의 카드 묶음을 복습 상태와 채점 기록(card["reviews"])까지 그대로 넣습니다. (한 트랜잭션)
+        # 형식이 틀린 카드는 건너뜁니다. 채점 기록은 새 카드 id 로 reviews 버퍼에 들어가 나중에 Parquet 로그로 옮겨집니다.
+        # 반환: {"cards": 저장한 카드 수, "duplicates": 비슷한 문제가 있어 건너뛴 수, "invalid": 형식 오류 수, "reviews": 옮긴 기록 수,
+        #        "skipped": 건너뛴 문제 목록 (add_cards 의 skipped 와 같은 모양)}
+        result = {"cards": 0, "duplicates": 0, "invalid": 0, "reviews": 0, "skipped": []}
+        valid = []
+        for card in cards:
+            try: validate_card(card)
+            except ValueError:
+                result["invalid"] += 1
+                continue
+            valid.append((card, signature(card)))
+        with self._write():
+            for card, sig in valid:
+                found = self._find_similar(card, sig, deck) if skip_duplicates else None
+                if found:
+                    result["duplicates"] += 1
+                    result["skipped"].append({"question": card["question"], "similar_to": found[1]})
+                    continue
+                card_id = self._insert_card(card, deck, sig)
+                source, tags = _card_meta(card)
+                reviews = [review for review in card.get("reviews") or [] if isinstance(review, dict) and review.get("reviewed_at") and review.get("grade")]
+                self._conn.executemany(
+                    "INSERT INTO reviews (card_id, deck, reviewed_at, grade, scheduler, elapsed_days, interval, ease, stability, difficulty,"
+                    " source, tags, duration_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(card_id, deck, review["reviewed_at"], review["grade"], review.get("scheduler") or "", review.get("elapsed_days"),
+                      review.get("interval") or 1, review.get("ease"), review.get("stability"), review.get("difficulty"),
+                      source, tags, review.get("duration_ms")) for review in reviews]
+                )
+                result["cards"] += 1
+                result["reviews"] += len(reviews)
+        return result
+
+    @perf.timed("store.record_review")
+    def record_review(self, card_id, state, grade, scheduler, deck=DEFAULT_DECK, expected_version=None, duration_ms=None):
+        # 스케줄러가 계산한 새 상태(state)를 카드에 저장하고 채점 기록을 한 행 남깁니다. (한 트랜잭션)
+        # expected_version 을 넘기면 그 사이 다른 세션이 카드를 고치지 않았을 때만 저장합니다. (낙관적 잠금)
+        # 반환: 저장했으면 True, 버전이 달라졌거나 카드가 없으면 False
+        with self._write():
+            row = self._conn.execute(
+                "SELECT version, last_review, source, tags FROM cards WHERE id = ? AND deck = ?", (card_id, deck)
+            ).fetchone()
+            if row is None or (expected_version is not None and row[0] != expected_version): return False
+            self._conn.execute(
+                "UPDATE cards SET interval = ?, next_review = ?, ease = ?, stability = ?, difficulty = ?, reps = ?, lapses = ?,"
+                " last_review = ?, version = version + 1 WHERE id = ?",
+                (state["interval"], state["next_review"], state["ease"], state["stability"], state["difficulty"],
+                 state["reps"], state["lapses"], state["last_review"], card_id)
+            )
+            elapsed = None
+            if row[1]: elapsed = (datetime.fromisoformat(state["last_review"]) - datetime.fromisoformat(row[1])).days
+            self._conn.execute(
+                "INSERT INTO reviews (card_id, deck, reviewed_at, grade, scheduler, elapsed_days, interval, ease, stability, difficulty,"
+                " source, tags, duration_ms) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (card_id, deck, datetime.now().isoformat(timespec="seconds"), grade, scheduler, elapsed,
+                 state["interval"], state["ease"], state["stability"], state["difficulty"], row[2], row[3], duration_ms)
+            )
+            return True
+
+    @perf.timed("store.delete_cards")
+    def delete_cards(self, card_ids, deck=DEFAULT_DECK):
+        # 선택한 카드들만 id 로 지웁니다. 목록 전체를 다시 쓰지 않으므로 그 사이 다른 세션이 추가한 카드가 사라지지 않습니다.
+        # id 집합을 JSON 배열 하나로 넘겨 DELETE 한 문장으로 처리합니다. 반환: 지운 카드 수
+        ids = json.dumps(sorted({int(card_id) for card_id in card_ids}))
+        with self._write():
+            return self._conn.execute(
+                "DELETE FROM cards WHERE deck = ? AND id IN (SELECT value FROM json_each(?))", (deck, ids)
+            ).rowcount
+
+    @perf.timed("store.delete_matching")
+    def delete_matching(self, deck=DEFAULT_DECK, query="", tag=None):
+        # 검색 결과 전체를 한 문장으로 지웁니다. 반환: 지운 카드 수
+        condition, params = self._search_condition(deck, query, tag)
+        with self._write():
+            return self._conn.execute(f"DELETE FROM cards WHERE id IN (SELECT c.id FROM cards c WHERE {condition})", params).rowcount
+
+    def clear_deck(self, deck=DEFAULT_DECK):
+        # 반환: 지운 카드 수
+        with self._write():
+            return self._conn.execute("DELETE FROM cards WHERE deck = ?", (deck,)).rowcount
@@ -0,0 +1,192 @@
+# ==========================================
+# 덱 통째로 내보내기 / 가져오기 (Parquet 또는 gzip JSONL)
+# ==========================================
+# 다른 기기로 옮기거나 친구와 나누기 위한 덱 파일입니다. 카드 1장 = 1레코드이고, 복습 상태(next_review/interval/ease/...)와
+# 그 카드의 채점 기록(reviews)을 함께 담습니다. (카드를 지운 뒤 남은 채점 기록은 담지 않습니다)
+# - .parquet : 컬럼 단위 zstd 압축. 카드 batch_size 장이 한 row group 이라 가져올 때 그만큼씩만 읽습니다.
+# - .jsonl.gz: 첫 줄은 머리말({"format": "aidoctor-deck", ...}), 그 뒤로 카드 한 줄씩. 다른 도구로 열어 보기 쉽습니다.
+# - .json    : 예전 medical_flashcards.json (가져오기만, 통째로 읽음)
+# 쓰기와 읽기 모두 카드 묶음 단위로 흘려보내므로 10만 장짜리 덱도 메모리는 묶음 크기만큼만 씁니다.
+# 가져오기는 묶음마다 한 트랜잭션이고, 형식이 틀린 카드와 덱에 이미 있는 비슷한 문제는 건너뜁니다.
+# 사용법: python deck_io.py export 덱이름 파일.parquet   /   python deck_io.py import 파일.jsonl.gz [--deck 새이름]
+import argparse
+import gzip
+import json
+import os
+from datetime import datetime
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from card_store import DEFAULT_DECK, CardStore, normalize_deck
+
+FORMAT_NAME = "aidoctor-deck"
+FORMAT_VERSION = 1
+BATCH_SIZE = 2000
+MAX_SKIPPED_REPORT = 100  # 건너뛴 비슷한 문제는 이만큼만 목록으로 돌려줍니다. (개수는 duplicates 에 모두 셈)
+REVIEW_FIELDS = ("reviewed_at", "grade", "scheduler", "elapsed_days", "interval", "ease", "stability", "difficulty", "duration_ms")
+CARD_SCHEMA = pa.schema([
+    ("question", pa.string()), ("options", pa.list_(pa.string())), ("correct_index", pa.int8()), ("explanation", pa.string()),
+    ("source", pa.string()), ("tags", pa.list_(pa.string())),
+    ("next_review", pa.string()), ("interval", pa.int32()), ("ease", pa.float64()), ("stability", pa.float64()),
+    ("difficulty", pa.float64()), ("reps", pa.int32()), ("lapses", pa.int32()), ("last_review", pa.string()),
+    ("reviews", pa.list_(pa.struct([
+        ("reviewed_at", pa.string()), ("grade", pa.int8()), ("scheduler", pa.string()), ("elapsed_days", pa.int32()),
+        ("interval", pa.int32()), ("ease", pa.float64()), ("stability", pa.float64()), ("difficulty", pa.float64()),
+        ("duration_ms", pa.int64())
+    ]))),
+])
+_CARD_FIELDS = tuple(name for name in CARD_SCHEMA.names if name != "reviews")
+
+
+def deck_format(name):
+    # 파일 이름 → "parquet" / "jsonl.gz" / "json"
+    name = name.lower()
+    if name.endswith(".parquet"): return "parquet"
+    if name.endswith(".jsonl.gz") or name.endswith(".gz"): return "jsonl.gz"
+    if name.endswith(".json"): return "json"
+    raise ValueError("덱 파일은 .parquet / .jsonl.gz / .json 중 하나여야 합니다.")
+
+
+def _header(deck):
+    return {"format": FORMAT_NAME, "version": FORMAT_VERSION, "deck": deck, "exported_at": datetime.now().isoformat(timespec="seconds")}
+
+
+def _review_groups(review_log, store, deck, card_ids):
+    # 카드 id -> 채점 기록 dict 목록 (오래된 순)
+    if review_log is None: return {}
+    frame = review_log.load(store, deck, ("id", "card_id") + REVIEW_FIELDS, card_ids=card_ids)
+    if not len(frame): return {}
+    frame = frame.sort_values("id")
+    frame["reviewed_at"] = frame["reviewed_at"].dt.strftime("%Y-%m-%dT%H:%M:%S")
+    frame = frame.astype(object).where(frame.notna(), None)
+    groups = {}
+    for row in frame.itertuples(index=False):
+        groups.setdefault(row.card_id, []).append({field: getattr(row, field) for field in REVIEW_FIELDS})
+    return groups
+
+
+def iter_export_batches(store, deck, review_log=None, batch_size=BATCH_SIZE):
+    # 내보낼 카드 레코드를 batch_size 장씩 (id 는 덱마다 다르므로 빼고, 채점 기록을 reviews 로 붙입니다)
+    for cards in store.iter_cards(deck, batch_size):
+        reviews = _review_groups(review_log, store, deck, [card["id"] for card in cards])
+        yield [{**{field: card[field] for field in _CARD_FIELDS}, "reviews": reviews.get(card["id"], [])} for card in cards]
+
+
+def export_deck(store, deck, target, fmt=None, review_log=None, batch_size=BATCH_SIZE):
+    # target: 경로 또는 바이너리 파일 객체. 경로면 임시 파일에 다 쓴 뒤 이름을 바꿉니다. 반환: {"cards", "reviews"}
+    fmt = fmt or deck_format(target)
+    path = target if isinstance(target, str) else None
+    out = path + ".tmp" if path else target
+    counts = {"cards": 0, "reviews": 0}
+    batches = iter_export_batches(store, deck, review_log, batch_size)
+    if fmt == "parquet":
+        schema = CARD_SCHEMA.with_metadata({"aidoctor": json.dumps(_header(deck), ensure_ascii=False)})
+        with pq.ParquetWriter(out, schema, compression="zstd") as writer:
+            for records in batches:
+                writer.write_table(pa.Table.from_pylist(records, schema=schema))
+                counts["cards"] += len(records)
+                counts["reviews"] += sum(len(record["reviews"]) for record in records)
+    elif fmt == "jsonl.gz":
+        with gzip.open(out, "wt", encoding="utf-8", compresslevel=6) as f:
+            f.write(json.dumps(_header(deck), ensure_ascii=False) + "\n")
+            for records in batches:
+                f.writelines(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n" for record in records)
+                counts["cards"] += len(records)
+                counts["reviews"] += sum(len(record["reviews"]) for record in records)
+    else: raise ValueError(f"{fmt} 형식으로는 내보낼 수 없습니다.")
+    if path: os.replace(out, path)
+    return counts
+
+
+def _records(batch):
+    # RecordBatch → 카드 dict 목록. 컬럼마다 한 번에 파이썬 값으로 바꾼 뒤 묶는 쪽이 행 단위 to_pylist 보다 빠릅니다.
+    names = batch.schema.names
+    return [dict(zip(names, values)) for values in zip(*(column.to_pylist() for column in batch.columns))]
+
+
+def _jsonl_batches(source, batch_size):
+    # 머리말 다음 줄부터 읽습니다. 파일은 다 읽거나 이터레이터를 버릴 때 닫힙니다.
+    if not isinstance(source, str): source.seek(0)
+    with gzip.open(source, "rt", encoding="utf-8") as f:
+        f.readline()
+        batch = []
+        for line in f:
+            if not line.strip(): continue
+            batch.append(json.loads(line))
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch: yield batch
+
+
+def open_deck_file(source, fmt=None, batch_size=BATCH_SIZE):
+    # source: 경로 또는 바이너리 파일 객체(예: Streamlit 업로드 파일)
+    # 반환: (머리말 dict, 카드 묶음 이터레이터). 머리말이 없는 파일(예전 JSON)은 {} 입니다.
+    fmt = fmt or deck_format(source if isinstance(source, str) else getattr(source, "name", ""))
+    if fmt == "parquet":
+        parquet = pq.ParquetFile(source)
+        metadata = parquet.schema_arrow.metadata or {}
+        header = json.loads(metadata.get(b"aidoctor", b"{}"))
+        return header, (_records(batch) for batch in parquet.iter_batches(batch_size))
+    if fmt == "jsonl.gz":
+        with gzip.open(source, "rt", encoding="utf-8") as f: header = json.loads(f.readline() or "{}")
+        if header.get("format") != FORMAT_NAME:
+            raise ValueError("덱 파일 머리말이 없습니다. 이 앱에서 내보낸 .jsonl.gz 파일인지 확인하세요.")
+        return header, _jsonl_batches(source, batch_size)
+    if fmt == "json":
+        if isinstance(source, str):
+            with open(source, encoding="utf-8") as f: data = json.load(f)
+        else: data = json.load(source)
+        cards = [card for card in data if isinstance(card, dict)] if isinstance(data, list) else []
+        return {}, (cards[i:i + batch_size] for i in range(0, len(cards), batch_size))
+    raise ValueError(f"{fmt} 형식은 읽을 수 없습니다.")
+
+
+def import_deck(store, source, deck=None, fmt=None, skip_duplicates=True, batch_size=BATCH_SIZE, progress=None):
+    # 덱 파일을 묶음 단위로 읽어 넣습니다. deck 을 주지 않으면 파일에 적힌 덱 이름(없으면 기본 덱)으로 넣습니다.
+    # progress(누적 결과) 를 넘기면 묶음마다 부릅니다. 반환: {"deck", "cards", "duplicates", "invalid", "reviews", "skipped"}
+    header, batches = open_deck_file(source, fmt, batch_size)
+    if header.get("version", FORMAT_VERSION) > FORMAT_VERSION: raise ValueError("더 새 버전 앱에서 내보낸 덱 파일입니다.")
+    deck = normalize_deck(deck or header.get("deck") or DEFAULT_DECK)
+    totals = {"deck": deck, "cards": 0, "duplicates": 0, "invalid": 0, "reviews": 0, "skipped": []}
+    for cards in batches:
+        for key, value in store.import_cards(cards, deck, skip_duplicates).items(): totals[key] += value
+        del totals["skipped"][MAX_SKIPPED_REPORT:]
+        if progress: progress(totals)
+    return totals
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="덱 내보내기 / 가져오기 (.parquet, .jsonl.gz)")
+    parser.add_argument("--db", default="medical_flashcards.db", help="카드 DB 경로 (앱과 같은 파일)")
+    parser.add_argument("--review-log", default="review_log", help="채점 기록 폴더 (앱과 같은 폴더)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    commands = parser.add_subparsers(dest="command", required=True)
+    export_parser = commands.add_parser("export", help="덱을 파일로 내보내기")
+    export_parser.add_argument("deck")
+    export_parser.add_argument("path", help="파일.parquet 또는 파일.jsonl.gz")
+    import_parser = commands.add_parser("import", help="덱 파일 가져오기")
+    import_parser.add_argument("path", help="파일.parquet / 파일.jsonl.gz / 예전 medical_flashcards.json")
+    import_parser.add_argument("--deck", help="넣을 덱 이름 (기본: 파일에 적힌 덱 이름)")
+    import_parser.add_argument("--keep-duplicates", action="store_true", help="덱에 있는 비슷한 문제도 그대로 넣기")
+    args = parser.parse_args(argv)
+
+    from review_log import ReviewLog
+    store = CardStore(args.db)
+    if args.command == "export":
+        deck = normalize_deck(args.deck)
+        counts = export_deck(store, deck, args.path, review_log=ReviewLog(args.review_log), batch_size=args.batch_size)
+        print(f"'{deck}' 덱: 카드 {counts['cards']:,}장, 채점 기록 {counts['reviews']:,}건 → {args.path} ({os.path.getsize(args.path):,} bytes)")
+    else:
+        totals = import_deck(
+            store, args.path, args.deck, skip_duplicates=not args.keep_duplicates, batch_size=args.batch_size,
+            progress=lambda t: print(f"\r{t['cards']:,}장 저장됨", end="", flush=True)
+        )
+        print(f"\r'{totals['deck']}' 덱: 카드 {totals['cards']:,}장, 채점 기록 {totals['reviews']:,}건 가져옴"
+              f" (비슷한 문제 {totals['duplicates']:,}장, 형식 오류 {totals['invalid']:,}장 건너뜀)")
+        for item in totals["skipped"][:10]: print(f"  - 건너뜀: {item['question'][:60]}  ≈  {item['similar_to'][:60]}")
+
+
+if __name__ == "__main__":
+    main()
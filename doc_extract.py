@@ -0,0 +1,185 @@
+# ==========================================
+# 문서 텍스트 추출 (PDF / DOCX / PPTX)
+# ==========================================
+# - 페이지(슬라이드/문단) 단위 제너레이터로 추출하므로, 프롬프트에 들어갈 글자 수(max_chars)를
+#   채우면 나머지 페이지는 아예 파싱하지 않습니다.
+# - 파일 내용(sha256) 기준으로 지금까지 추출한 페이지를 캐시하므로, 업로더에 파일이 남아 있는 동안
+#   Streamlit 이 다시 실행되어도 같은 페이지를 다시 파싱하지 않습니다. (부족하면 이어서 추출)
+# - 페이지가 많은 PDF 는 페이지 구간을 나눠 프로세스 풀에서 병렬로 추출합니다.
+#   PPTX 는 슬라이드당 비용이 작고 워커마다 파일 전체를 다시 열어야 해서 나눠도 빨라지지 않으므로 직렬로 읽습니다.
+#   (benchmarks/bench_extract.py)
+# - 파일별 소요 시간을 결과에 함께 담아 돌려줍니다.
+# - 파서(pypdf / python-docx / python-pptx)는 그 형식을 처음 읽을 때 불러옵니다. (셋을 합치면 앱 시작이 0.4초 가량 늦어집니다)
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import perf
+
+PARALLEL_MIN_PAGES = 24   # 이보다 짧은 PDF 는 프로세스를 띄우는 비용이 더 큽니다.
+MAX_WORKERS = min(4, os.cpu_count() or 1)
+MIN_PAGES_PER_TASK = 8
+CACHE_MAX_FILES = 32
+
+_cache = OrderedDict()  # sha256 -> {"pages": 앞에서부터 추출한 텍스트 리스트, "complete": 끝까지 읽었는지}
+_cache_lock = threading.Lock()
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def file_kind(name):
+    ext = os.path.splitext(name.lower())[1]
+    return {".pdf": "pdf", ".docx": "docx", ".pptx": "pptx"}.get(ext)
+
+
+# ── 형식별 추출기 (start 번째 단위부터 하나씩 yield) ──
+def _pdf_page_range(data, start, end):
+    # 프로세스 풀 워커에서 호출되므로 모듈 최상위 함수로 둡니다.
+    from pypdf import PdfReader
+    reader = PdfReader(BytesIO(data))
+    return [reader.pages[i].extract_text() or "" for i in range(start, end)]
+
+
+def _iter_pptx_slides(data, start):
+    from pptx import Presentation as PptxPresentation
+    prs = PptxPresentation(BytesIO(data))
+    for slide in list(prs.slides)[start:]:
+        txt = [shape.text_frame.text for shape in slide.shapes if shape.has_text_frame]
+        yield "\n".join(txt)
+
+
+def _iter_docx_blocks(data, start):
+    import docx
+    doc = docx.Document(BytesIO(data))
+
+    def blocks():
+        for para in doc.paragraphs:
+            if para.text.strip(): yield para.text
+        for table in doc.tables:
+            for row in table.rows:
+                row_texts = [cell.text.strip() for cell in row.cells if cell.text.strip()]
+                if row_texts: yield " | ".join(row_texts)
+
+    for i, text in enumerate(blocks()):
+        if i >= start: yield text
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Streamlit 은 멀티스레드 프로세스라 fork 대신 spawn 으로 워커를 띄웁니다. 풀은 프로세스 동안 재사용합니다.
+            _pool = ProcessPoolExecutor(max_workers=MAX_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def _iter_pdf_pages(data, start):
+    from pypdf import PdfReader
+    reader = PdfReader(BytesIO(data))
+    n_pages = len(reader.pages)
+    pool = None
+    if n_pages - start >= PARALLEL_MIN_PAGES and MAX_WORKERS > 1:
+        try: pool = _get_pool()
+        except Exception: pool = None  # 프로세스 풀을 쓸 수 없는 환경이면 직렬로 처리합니다.
+    if pool is None:
+        for i in range(start, n_pages): yield reader.pages[i].extract_text() or ""
+        return
+    # 구간마다 파일 바이트가 워커로 한 번씩 전달되므로 구간을 너무 잘게 나누지 않습니다.
+    # 동시에 워커 수만큼만 미리 제출해 두고 순서대로 꺼내므로, 소비자가 멈추면 남은 구간은 취소됩니다.
+    step = max(MIN_PAGES_PER_TASK, -(-(n_pages - start) // (MAX_WORKERS * 2)))
+    ranges = deque((s, min(s + step, n_pages)) for s in range(start, n_pages, step))
+    pending = deque()
+    try:
+        while ranges or pending:
+            while ranges and len(pending) < MAX_WORKERS:
+                s, e = ranges.popleft()
+                pending.append(pool.submit(_pdf_page_range, data, s, e))
+            yield from pending.popleft().result()
+    finally:
+        for future in pending: future.cancel()
+
+
+_EXTRACTORS = {"pdf": _iter_pdf_pages, "pptx": _iter_pptx_slides, "docx": _iter_docx_blocks}
+
+
+def iter_pages(name, data, stats=None):
+    # 페이지/슬라이드/문단 텍스트를 앞에서부터 하나씩 돌려줍니다. 캐시된 부분은 바로, 나머지는 이어서 추출합니다.
+    # stats 를 넘기면 새로 추출한 단위 수를 stats["extracted"] 에 기록합니다.
+    key = hashlib.sha256(data).hexdigest()
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry: _cache.move_to_end(key)
+        pages = list(entry["pages"]) if entry else []
+        complete = bool(entry and entry["complete"])
+    yield from pages
+    extractor = _EXTRACTORS.get(file_kind(name))
+    if complete or extractor is None: return
+    finished = False
+    try:
+        for text in extractor(data, len(pages)):
+            pages.append(text)
+            if stats is not None: stats["extracted"] = stats.get("extracted", 0) + 1
+            yield text
+        finished = True
+    finally:
+        # 중간에 멈춘 경우(예산 도달)에도 지금까지 읽은 앞부분은 캐시에 남겨 둡니다.
+        with _cache_lock:
+            current = _cache.get(key)
+            if current is None or len(current["pages"]) < len(pages) or finished:
+                _cache[key] = {"pages": pages, "complete": finished}
+                _cache.move_to_end(key)
+            while len(_cache) > CACHE_MAX_FILES: _cache.popitem(last=False)
+
+
+def extract_document(name, data, max_chars=None):
+    # max_chars 를 채우면 추출을 멈추고 text 를 그 길이로 자릅니다.
+    # 반환: {"name", "text", "page_texts", "pages", "seconds", "cached", "truncated"} (추출 실패 시 text 는 빈 문자열)
+    with perf.timer("extract", kind=file_kind(name) or "unknown") as fields:
+        result = _extract_document(name, data, max_chars)
+        fields.update(pages=result["pages"], chars=len(result["text"]), cached=int(result["cached"]))
+    return result
+
+
+def _extract_document(name, data, max_chars):
+    start = time.perf_counter()
+    stats = {}
+    parts, total, truncated = [], -1, False
+    pages = iter_pages(name, data, stats)
+    try:
+        for text in pages:
+            parts.append(text)
+            total += len(text) + 1
+            if max_chars is not None and total >= max_chars:
+                truncated = True
+                break
+    except Exception:
+        parts = []
+    finally:
+        pages.close()
+    text = "\n".join(parts)
+    if max_chars is not None and len(text) > max_chars:
+        text, truncated = text[:max_chars], True
+        parts[-1] = parts[-1][:max(0, len(parts[-1]) - (total - max_chars))]
+    return {
+        "name": name, "text": text, "page_texts": parts, "pages": len(parts), "seconds": time.perf_counter() - start,
+        "cached": bool(parts) and not stats.get("extracted"), "truncated": truncated
+    }
+
+
+def extract_documents(files, max_chars=None, separator="\n\n"):
+    # 여러 파일을 순서대로 읽되 전체 글자 수 예산을 나눠 씁니다. 예산을 다 쓰면 뒤 파일은 열지도 않습니다.
+    # files: (파일 이름, 바이트) 목록
+    results, remaining = [], max_chars
+    for name, data in files:
+        if remaining is not None and remaining <= 0:
+            results.append({"name": name, "text": "", "page_texts": [], "pages": 0, "seconds": 0.0, "cached": False, "truncated": True, "skipped": True})
+            continue
+        result = extract_document(name, data, remaining)
+        results.append(result)
+        if remaining is not None and result["text"].strip(): remaining -= len(result["text"]) + len(separator)
+    return results
@@ -0,0 +1,418 @@
+# ==========================================
+# Gemini 생성 로직 (프롬프트 / 분할 요청 / 결과 병합)
+# ==========================================
+import json
+import queue
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import perf
+from llm_cache import cache_key
+from llm_schema import QUIZ_SCHEMA, SUMMARY_SCHEMA, clean_quiz, clean_summary_topic
+from prompt_packer import chunk_pages, estimate_tokens, fit_text, pack_sections
+
+# 분량은 토큰 예산으로 정합니다. 페이지/문단 단위로 채우므로 실제 양은 예산보다 조금 적을 수 있습니다. (prompt_packer.py)
+SUMMARY_CHUNK_TOKENS = 24000  # 요청 1회에 넣는 강의 분량
+SUMMARY_MAX_WORKERS = 4       # 동시에 보내는 요청 수
+JOKBO_TOKENS = 16000          # 요청마다 함께 넣는 족보 분량 (앞에서부터)
+
+QUIZ_BATCH_SIZE = 5           # 요청 1회에 만드는 문제 수
+QUIZ_SECTION_TOKENS = 12000   # 요청 1회에 넣는 정리본 분량
+QUIZ_MIN_SECTION_TOKENS = 1500
+QUIZ_MAX_WORKERS = 4
+QUIZ_TOPUP_ATTEMPTS = 2       # 형식이 틀려 버린 문제만큼 다시 요청하는 횟수 (묶음당)
+REQUESTS_PER_MINUTE = 30      # 동시에 보내더라도 이 속도를 넘지 않도록 요청 간격을 둡니다.
+REQUEST_TIMEOUT_MS = 90000
+MAX_ATTEMPTS = 3              # 실패 시 지수 백오프로 재시도
+BACKOFF_SECONDS = 1.0
+
+# 프롬프트 문구나 요청에 넣는 response_schema 를 바꾸면 버전을 올려 주세요. 응답 캐시 키에 들어가므로 예전 응답이 재사용되지 않습니다.
+# (cache_key 는 모델/버전/프롬프트만 보고 요청 설정은 보지 않습니다)
+QUIZ_PROMPT_VERSION = "quiz-v3"
+SUMMARY_PROMPT_VERSION = "summary-v2"
+
+
+class RateLimiter:
+    # 요청 시작 시각을 최소 간격만큼 벌려 주는 간단한 리미터 (여러 스레드가 공유)
+    def __init__(self, per_minute=REQUESTS_PER_MINUTE):
+        self.interval = 60.0 / per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now: time.sleep(slot - now)
+
+
+_CODE_FENCE = re.compile(r"^\s*```(?:json)?\s*|\s*```\s*$")
+
+
+def _config(timeout_ms, schema=None):
+    config = {"response_mime_type": "application/json", "http_options": {"timeout": timeout_ms}}
+    if schema: config["response_schema"] = schema
+    return config
+
+
+def _measure_llm(fields, prompt, text, usage=None):
+    # 계측용 크기: 응답에 usage_metadata 가 있으면 실제 토큰 수, 없으면(캐시 적중 등) 추정치
+    fields.update(prompt_chars=len(prompt), response_chars=len(text or ""))
+    prompt_tokens = getattr(usage, "prompt_token_count", None)
+    response_tokens = getattr(usage, "candidates_token_count", None)
+    fields["prompt_tokens"] = prompt_tokens if prompt_tokens is not None else estimate_tokens(prompt)
+    fields["response_tokens"] = response_tokens if response_tokens is not None else estimate_tokens(text or "")
+
+
+def call_json(client, model, prompt, limiter=None, cache=None, template_version="", refresh=False,
+              attempts=MAX_ATTEMPTS, timeout_ms=REQUEST_TIMEOUT_MS, schema=None, parse=None, stats=None):
+    # JSON 강제 출력으로 한 번 요청하고 파싱까지 합니다. 네트워크 오류/시간 초과/JSON 오류는 백오프 후 재시도합니다.
+    # cache 가 있으면 같은 (모델, 템플릿 버전, 프롬프트) 의 저장된 응답을 먼저 씁니다. refresh=True 면 읽기를 건너뛰고 새로 받아 덮어씁니다.
+    # schema: Gemini response_schema. parse(text) -> (결과, 응답이 온전했는지) 를 넘기면 json.loads 대신 씁니다.
+    # 일부만 건진(온전하지 않은) 결과는 재시도하지 않고 그대로 돌려주되, 캐시에는 남기지 않습니다.
+    # stats(dict) 를 넘기면 캐시에서 꺼낸 응답 수를 stats["cache_hits"] 에 더합니다. (호출한 쪽 작업 단위로 세기 위해)
+    parse = parse or (lambda text: (json.loads(text), True))
+    with perf.timer("llm", kind=template_version or "raw", mode="json") as fields:
+        key = cache_key(model, template_version, prompt) if cache is not None else None
+        if key and not refresh:
+            cached = cache.get(key)
+            if cached is not None:
+                try:
+                    data = parse(cached)[0]
+                    fields["cached"] = 1
+                    if stats is not None: stats["cache_hits"] = stats.get("cache_hits", 0) + 1
+                    _measure_llm(fields, prompt, cached)
+                    return data
+                except ValueError: pass
+        for attempt in range(attempts):
+            if limiter: limiter.wait()
+            fields["attempts"] = attempt + 1
+            try:
+                response = client.models.generate_content(model=model, contents=prompt, config=_config(timeout_ms, schema))
+                data, complete = parse(response.text)
+                if not complete: fields["partial"] = 1
+                elif key: cache.put(key, response.text)
+                _measure_llm(fields, prompt, response.text, getattr(response, "usage_metadata", None))
+                return data
+            except Exception:
+                if attempt == attempts - 1: raise
+                time.sleep(BACKOFF_SECONDS * 2 ** attempt + random.uniform(0, BACKOFF_SECONDS / 2))
+
+
+class JsonArrayStreamParser:
+    # 스트리밍으로 조금씩 들어오는 JSON 배열 텍스트에서, 닫힌 최상위 원소(객체)를 바로바로 꺼냅니다.
+    # 문자열 안의 괄호/따옴표(이스케이프 포함)는 무시하고 깊이만 셉니다. 원소 하나가 완성될 때만 json.loads 합니다.
+    # skip_invalid 면 JSON 으로 읽을 수 없는 원소는 오류 대신 건너뛰고 skipped 에 셉니다.
+    def __init__(self, skip_invalid=False):
+        self.skip_invalid = skip_invalid
+        self.skipped = 0
+        self.text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._start = None
+
+    def feed(self, piece):
+        self.text += piece
+        items = []
+        text = self.text
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape: self._escape = False
+                elif ch == "\\": self._escape = True
+                elif ch == '"': self._in_string = False
+            elif ch == '"': self._in_string = True
+            elif ch in "[{":
+                self._depth += 1
+                if self._depth == 2 and ch == "{": self._start = i
+            elif ch in "]}":
+                self._depth -= 1
+                if self._depth == 1 and ch == "}" and self._start is not None:
+                    try: items.append(json.loads(text[self._start:i + 1]))
+                    except ValueError:
+                        if not self.skip_invalid: raise
+                        self.skipped += 1
+                    self._start = None
+        self._pos = len(text)
+        return items
+
+
+def salvage_json_array(text):
+    # JSON 배열 응답을 최대한 살려 읽습니다. 반환: (원소 리스트, 응답 전체가 올바른 JSON 이었는지)
+    # 코드 블록(```json)은 벗기고, {"questions": [...]} 처럼 배열 하나를 감싼 객체면 그 배열을 꺼냅니다.
+    # 잘렸거나 중간 원소가 깨진 배열이면 읽을 수 있는 원소만 돌려줍니다. 하나도 못 건지면 원래 JSON 오류를 올립니다.
+    text = _CODE_FENCE.sub("", text or "")
+    try: data = json.loads(text)
+    except json.JSONDecodeError:
+        items = JsonArrayStreamParser(skip_invalid=True).feed(text)
+        if not items: raise
+        return items, False
+    if isinstance(data, dict):
+        arrays = [value for value in data.values() if isinstance(value, list)]
+        data = arrays[0] if len(arrays) == 1 else [data]
+    return (data if isinstance(data, list) else [data]), True
+
+
+def parse_quiz_response(text):
+    # 문제 배열 응답 → (검사/보정을 통과한 문제 리스트, 버린 문제 없이 온전했는지)
+    items, complete = salvage_json_array(text)
+    quizzes = [quiz for quiz in map(clean_quiz, items) if quiz is not None]
+    return quizzes, complete and len(quizzes) == len(items)
+
+
+def stream_json_array(client, model, prompt, limiter=None, cache=None, template_version="", refresh=False,
+                      attempts=MAX_ATTEMPTS, timeout_ms=REQUEST_TIMEOUT_MS, stop_event=None, schema=None):
+    # JSON 배열 응답을 스트리밍으로 받으며 원소가 완성될 때마다 yield 합니다. (call_json 의 스트리밍 버전)
+    # 아직 아무것도 내보내지 않았을 때만 재시도합니다. 일부를 내보낸 뒤 실패하면 오류를 올리고, 받은 원소는 호출한 쪽에 남습니다.
+    # 캐시는 응답 전체가 올바른 JSON 으로 끝났을 때만 저장합니다. 깨진 원소는 건너뛰고 뒤의 원소를 계속 꺼냅니다.
+    # 계측 시간에는 호출한 쪽이 원소를 처리하는 시간도 들어갑니다. 첫 원소까지 걸린 시간은 first_item_seconds 로 따로 남깁니다.
+    with perf.timer("llm", kind=template_version or "raw", mode="stream") as fields:
+        start = time.perf_counter()
+        key = cache_key(model, template_version, prompt) if cache is not None else None
+        if key and not refresh:
+            cached = cache.get(key)
+            if cached is not None:
+                try: data = json.loads(_CODE_FENCE.sub("", cached))
+                except ValueError: data = None
+                if isinstance(data, list):
+                    fields["cached"] = 1
+                    _measure_llm(fields, prompt, cached)
+                    yield from data
+                    return
+        for attempt in range(attempts):
+            if limiter: limiter.wait()
+            parser, emitted, usage = JsonArrayStreamParser(skip_invalid=True), 0, None
+            fields["attempts"] = attempt + 1
+            try:
+                stream = client.models.generate_content_stream(model=model, contents=prompt, config=_config(timeout_ms, schema))
+                for response in stream:
+                    if stop_event is not None and stop_event.is_set(): return
+                    usage = getattr(response, "usage_metadata", None) or usage
+                    for item in parser.feed(response.text or ""):
+                        if not emitted: fields["first_item_seconds"] = time.perf_counter() - start
+                        emitted += 1
+                        yield item
+                text = _CODE_FENCE.sub("", parser.text)
+                data = json.loads(text)
+                if key: cache.put(key, text)  # 코드 펜스를 뗀 채로 저장해야 다음에 그대로 json.loads 할 수 있습니다.
+                _measure_llm(fields, prompt, parser.text, usage)
+                # 배열이 아닌 형태(예: 객체 하나)로 왔다면 파서가 꺼내지 못했으므로 통째로 내보냅니다.
+                if not emitted: yield from (data if isinstance(data, list) else [data])
+                return
+            except Exception:
+                if emitted or attempt == attempts - 1: raise
+                time.sleep(BACKOFF_SECONDS * 2 ** attempt + random.uniform(0, BACKOFF_SECONDS / 2))
+
+
+def build_quiz_prompt(note_text, jokbo_text, n_questions=QUIZ_BATCH_SIZE, avoid=()):
+    # avoid: 이미 만든 문제들 (모자란 개수만 다시 요청할 때 같은 문제가 또 나오지 않도록)
+    avoid_text = "\n                    ".join(f"- {question}" for question in avoid)
+    if avoid_text: avoid_text = f"""
+                    [이미 만든 문제 - 이것과 겹치지 않게 새로 만드세요]
+                    {avoid_text}
+"""
+    if jokbo_text:
+        return f"""
+                    아래는 의대생이 공부한 정리본입니다. 이 학생이 정리본의 내용을 제대로 암기했는지 테스트하는 객관식 문제 {n_questions}개를 만드세요.
+
+                    [규칙]
+                    - 정리본에 직접 나오는 질환명, 증상, 진단법, 치료법, 수치 등을 묻는 문제를 만드세요.
+                    - "만약~했다면", "어떤 유형의 지식을~" 같은 메타 질문은 절대 만들지 마세요.
+                    - 예시: "~의 1차 치료제는?", "~에서 나타나는 특징적 소견은?", "~의 진단 기준으로 옳은 것은?"
+                    - [족보]의 문제 형식(문체, 보기 개수)만 참고하세요.
+
+                    [정리본]
+                    {note_text}
+
+                    [족보 - 형식 참고용]
+                    {jokbo_text}
+{avoid_text}
+                    JSON 배열로 {n_questions}개 출력 (topic 은 문제가 다루는 질환명/주제를 짧게):
+                    [{{"question": "질문", "options": ["보기1", "보기2", ...], "correct_index": 0, "explanation": "해설", "topic": "주제"}}]
+                    """
+    return f"""
+                    아래는 의대생이 공부한 정리본입니다. 이 학생이 정리본의 내용을 제대로 암기했는지 테스트하는 5지선다형 객관식 문제 {n_questions}개를 만드세요.
+
+                    [규칙]
+                    - 정리본에 직접 나오는 질환명, 증상, 진단법, 치료법, 수치 등을 묻는 문제를 만드세요.
+                    - "만약~했다면", "어떤 유형의 지식을~" 같은 메타 질문은 절대 만들지 마세요.
+                    - 예시: "~의 1차 치료제는?", "~에서 나타나는 특징적 소견은?", "~의 진단 기준으로 옳은 것은?"
+
+                    [정리본]
+                    {note_text}
+{avoid_text}
+                    JSON 배열로 {n_questions}개 출력 (topic 은 문제가 다루는 질환명/주제를 짧게):
+                    [{{"question": "질문", "options": ["보기1", "보기2", "보기3", "보기4", "보기5"], "correct_index": 0, "explanation": "해설", "topic": "주제"}}]
+                    """
+
+
+def build_summary_prompt(lecture_text, jokbo_text):
+    return f"""
+                당신은 의대 학습 정리 전문가입니다.
+                강의자료를 메인 주제(질환 등)별로 나누고, 표 형태로 정리하세요.
+
+                [구조 요구사항]
+                1. 기본적으로 '소주제' - '내용'의 2단 구성을 따릅니다.
+                2. 단, 소주제 내부에서 또다시 분류가 필요한 경우(예: 진단 내의 혈액검사/영상검사 등)에는 '세부 분류'를 추가하여 3단으로 구성하세요.
+
+                [서식 규칙]
+                1. 내용(value)은 긴 줄글로 쓰지 말고, 반드시 '1. ', '2. ' 번호를 붙여 개조식으로 작성하세요.
+                2. 각 번호 항목이 끝날 때마다 반드시 줄바꿈을 하세요.
+
+                [색상 태그 규칙]
+                - 족보 정답 선지 내용: <yellow>내용</yellow>
+                - 족보 오답 선지(강의 관련): <blue>내용</blue>
+                - 족보 오답 선지(강의 무관): <gray>내용</gray>
+
+                [입력 자료]
+                강의: {lecture_text}
+                족보: {jokbo_text}
+
+                [출력 형식 - JSON 배열]
+                반드시 아래 구조를 지키세요. 'sub_key'는 하위 분류가 있을 때만 작성하고, 없으면 null 또는 빈 문자열로 두세요.
+                [
+                  {{
+                    "main_topic": "메인 주제명 (예: 급성 A형 간염)",
+                    "sub_sections": [
+                      {{ "key": "개요", "sub_key": "", "value": "1. 정의: ...\\n2. 역학: ..." }},
+                      {{ "key": "진단", "sub_key": "혈액검사", "value": "1. IgM anti-HAV <yellow>양성</yellow>...\\n2. LFT 상승..." }},
+                      {{ "key": "진단", "sub_key": "영상검사", "value": "1. 초음파: 간비대 소견..." }}
+                    ]
+                  }},
+                  ...
+                ]
+                """
+
+
+def _normalize(text):
+    return re.sub(r"\s+", " ", str(text or "")).strip().casefold()
+
+
+def merge_summary_topics(topic_lists):
+    # 덩어리별 결과를 합칩니다. 같은 main_topic 은 하나로 모으고, 같은 (key, sub_key, value) 행은 한 번만 남깁니다.
+    # 소주제(key)가 여러 덩어리에 흩어져 있어도 표에서 한 칸으로 병합되도록 처음 나온 key 순서대로 모아 둡니다.
+    merged, seen_rows = {}, {}
+    for topics in topic_lists:
+        for item in topics or []:
+            if not isinstance(item, dict): continue
+            topic_key = _normalize(item.get('main_topic'))
+            if topic_key not in merged:
+                merged[topic_key] = {"main_topic": item.get('main_topic', ''), "sub_sections": []}
+                seen_rows[topic_key] = set()
+            for sub in item.get('sub_sections') or []:
+                if not isinstance(sub, dict): continue
+                row_key = (_normalize(sub.get('key')), _normalize(sub.get('sub_key')), _normalize(sub.get('value')))
+                if row_key in seen_rows[topic_key]: continue
+                seen_rows[topic_key].add(row_key)
+                merged[topic_key]["sub_sections"].append(sub)
+    for topic in merged.values():
+        key_order = {}
+        for sub in topic["sub_sections"]: key_order.setdefault(_normalize(sub.get('key')), len(key_order))
+        topic["sub_sections"].sort(key=lambda sub: key_order[_normalize(sub.get('key'))])
+    return list(merged.values())
+
+
+def stream_summary_topics(client, model, lecture_pages, jokbo_text, cache=None, refresh=False,
+                          chunk_tokens=SUMMARY_CHUNK_TOKENS, max_workers=SUMMARY_MAX_WORKERS, count=estimate_tokens):
+    # 강의 구간별 요청을 동시에 스트리밍으로 보내고, 주제(main_topic 객체)가 완성되는 대로
+    # (구간 번호, 주제, 오류) 를 yield 합니다. 구간이 실패하면 (구간 번호, None, 오류) 가 한 번 나옵니다.
+    # 소비자가 중간에 멈추면(예: Streamlit 재실행) 남은 스트림도 멈춥니다.
+    # count: 토큰 수 세는 함수 (prompt_packer.calibrated_counter 로 보정한 것을 넘길 수 있음)
+    chunks = chunk_pages(lecture_pages, chunk_tokens, count)
+    jokbo_text = fit_text(jokbo_text, JOKBO_TOKENS, count)
+    if not chunks: return
+    limiter = RateLimiter()
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def summarize(chunk_no, chunk):
+        try:
+            for topic in stream_json_array(
+                client, model, build_summary_prompt(chunk, jokbo_text), limiter, cache, SUMMARY_PROMPT_VERSION, refresh,
+                stop_event=stop, schema=SUMMARY_SCHEMA
+            ):
+                topic = clean_summary_topic(topic)
+                if topic is not None: events.put((chunk_no, topic, None))
+        except Exception as e:
+            events.put((chunk_no, None, e))
+        finally:
+            events.put(None)
+
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks))))
+    try:
+        for i, chunk in enumerate(chunks): pool.submit(summarize, i + 1, chunk)
+        remaining = len(chunks)
+        while remaining:
+            event = events.get()
+            if event is None: remaining -= 1
+            else: yield event
+    finally:
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def plan_quiz_batches(note_pages, n_questions, jokbo_text="", batch_size=QUIZ_BATCH_SIZE, section_tokens=QUIZ_SECTION_TOKENS,
+                      count=estimate_tokens):
+    # n_questions 를 batch_size 씩 나누고, 요청마다 정리본의 다른 구간을 배정합니다.
+    # 정리본이 짧으면 구간을 잘게 나눠(최소 QUIZ_MIN_SECTION_TOKENS) 같은 내용으로 중복 출제되는 것을 줄입니다.
+    # 족보가 있으면 족보와 관련이 깊은 페이지가 앞 배치들에 먼저 들어갑니다.
+    counts = [batch_size] * (n_questions // batch_size)
+    if n_questions % batch_size: counts.append(n_questions % batch_size)
+    sections = pack_sections(note_pages, len(counts), section_tokens, jokbo_text, count, QUIZ_MIN_SECTION_TOKENS) or [""]
+    return [(sections[i % len(sections)], n) for i, n in enumerate(counts)]
+
+
+def generate_quiz_batch(client, model, section, jokbo_text, n_questions, limiter=None, cache=None, refresh=False,
+                        topups=QUIZ_TOPUP_ATTEMPTS, stats=None):
+    # 요청 1회분(묶음) 문제 생성. 응답이 잘렸거나 형식이 틀린 문제가 섞여 있으면 올바른 문제만 남기고,
+    # 모자란 개수만 (이미 만든 문제를 알려 주며) 다시 요청합니다. 첫 요청이 끝내 실패하면 오류를 올리고,
+    # 보충 요청이 실패하면 그때까지 모은 문제만 돌려줍니다. stats 는 call_json 과 같고, 끝내 모자란 문제 수를 stats["shortfall"] 에 더합니다.
+    request = lambda n, avoid=(): call_json(
+        client, model, build_quiz_prompt(section, jokbo_text, n, avoid), limiter, cache, QUIZ_PROMPT_VERSION, refresh,
+        schema=QUIZ_SCHEMA, parse=parse_quiz_response, stats=stats
+    )
+    quizzes = request(n_questions)
+    for _ in range(topups):
+        missing = n_questions - len(quizzes)
+        if missing <= 0: break
+        try: more = request(missing, [quiz["question"] for quiz in quizzes])
+        except Exception: break
+        if not more: break
+        quizzes += more
+    quizzes = quizzes[:n_questions]
+    if stats is not None and len(quizzes) < n_questions: stats["shortfall"] = stats.get("shortfall", 0) + n_questions - len(quizzes)
+    return quizzes
+
+
+def generate_quiz_batches(client, model, note_pages, jokbo_text, n_questions, cache=None, refresh=False, max_workers=QUIZ_MAX_WORKERS,
+                          count=estimate_tokens, stats=None):
+    # 구간별 요청을 동시에 보내고, 끝나는 순서대로 (배치 번호, 문제 리스트, 오류) 를 yield 합니다.
+    # 가장 느린 요청을 기다리지 않고 먼저 끝난 배치부터 바로 저장할 수 있습니다.
+    # stats(dict) 를 넘기면 배치마다 센 값(cache_hits, shortfall)을 yield 하기 전에 더해 둡니다. (배치는 각자 센 뒤 여기서만 합치므로 스레드 안전)
+    plan = plan_quiz_batches(note_pages, n_questions, jokbo_text, count=count)
+    jokbo_text = fit_text(jokbo_text, JOKBO_TOKENS, count)
+    limiter = RateLimiter()
+    pool = ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(plan))))
+
+    def batch(section, n):
+        batch_stats = {}
+        return generate_quiz_batch(client, model, section, jokbo_text, n, limiter, cache, refresh, stats=batch_stats), batch_stats
+
+    try:
+        futures = {pool.submit(batch, section, n): i + 1 for i, (section, n) in enumerate(plan)}
+        for future in as_completed(futures):
+            try: quizzes, batch_stats = future.result()
+            except Exception as e:
+                yield futures[future], None, e
+                continue
+            if stats is not None:
+                for name, value in batch_stats.items(): stats[name] = stats.get(name, 0) + value
+            yield futures[future], quizzes, None
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,177 @@
+# ==========================================
+# 백그라운드 생성 작업 큐 (스레드 풀 + SQLite 작업 테이블)
+# ==========================================
+# 문제/정리본 생성을 Streamlit 스크립트 스레드 밖에서 돌립니다.
+# - submit() 은 바로 작업 id 를 돌려주고, 작업은 스레드 풀에서 실행됩니다.
+# - 상태/진행률/(중간)결과는 디스크의 작업 테이블에 기록되므로, 브라우저를 새로고침해도
+#   작업 id 만 있으면 다시 이어서 볼 수 있습니다.
+# - 작업마다 맡은 프로세스(owner)와 마지막 생존 신호(heartbeat_at)를 기록합니다. 맡은 프로세스가 사라졌거나
+#   생존 신호가 끊긴 작업만 'interrupted' 로 표시하므로, 같은 DB 를 쓰는 다른 프로세스나 같은 프로세스에서
+#   새로 만든 큐(st.cache_resource.clear() 등)가 아직 돌고 있는 작업을 끊긴 것으로 잘못 표시하지 않습니다.
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+_MIGRATIONS = [
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        progress REAL NOT NULL DEFAULT 0,
+        message TEXT NOT NULL DEFAULT '',
+        result TEXT,
+        error TEXT,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS idx_jobs_updated_at ON jobs(updated_at);
+    """,
+    # 작업을 맡은 프로세스("호스트:pid:토큰")와 생존 신호 시각. 예전 작업은 NULL 이라 생존 신호가 끊긴 것으로 봅니다.
+    """
+    ALTER TABLE jobs ADD COLUMN owner TEXT;
+    ALTER TABLE jobs ADD COLUMN heartbeat_at REAL;
+    """,
+]
+
+JOB_MAX_WORKERS = 2
+JOB_RETENTION_SECONDS = 7 * 24 * 3600  # 끝난 작업 기록은 일주일 뒤 정리
+HEARTBEAT_SECONDS = 5                  # 대기/실행 중인 작업의 생존 신호 간격
+STALE_SECONDS = 60                     # 생존 신호가 이보다 오래 없으면 맡은 프로세스가 죽은 것으로 봅니다.
+
+QUEUED, RUNNING, DONE, FAILED, INTERRUPTED = "queued", "running", "done", "failed", "interrupted"
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+_JOB_COLUMNS = "id, kind, status, progress, message, result, error, created_at, updated_at, owner, heartbeat_at"
+
+# 이 프로세스의 이름표. 컨테이너가 다시 뜨면 pid 가 같을 수 있으므로 프로세스마다 새 토큰을 붙입니다.
+_HOST = socket.gethostname()
+OWNER = f"{_HOST}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _row_to_job(row):
+    return {
+        "id": row[0], "kind": row[1], "status": row[2], "progress": row[3], "message": row[4],
+        "result": json.loads(row[5]) if row[5] is not None else None, "error": row[6],
+        "created_at": row[7], "updated_at": row[8], "owner": row[9], "heartbeat_at": row[10]
+    }
+
+
+def _owner_alive(owner):
+    # True: 살아 있음 / False: 사라짐 / None: 알 수 없음(다른 호스트 등, 생존 신호로만 판단)
+    if owner == OWNER: return True
+    host, pid, _ = (owner or "::").rsplit(":", 2)
+    if host != _HOST or not pid.isdigit(): return None
+    if int(pid) == os.getpid(): return False  # pid 는 같은데 토큰이 다르면 이 프로세스 이전에 떠 있던 프로세스입니다.
+    if os.name != "posix": return None
+    try: os.kill(int(pid), 0)
+    except ProcessLookupError: return False
+    except PermissionError: return True
+    return True
+
+
+class JobQueue:
+    def __init__(self, path, max_workers=JOB_MAX_WORKERS):
+        self.path = path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._migrate()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._active = set()  # 이 큐가 맡아서 생존 신호를 보내는 작업 id
+        self._interrupt_orphans()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM jobs WHERE updated_at < ?", (time.time() - JOB_RETENTION_SECONDS,))
+        threading.Thread(target=self._heartbeat_loop, name="job-heartbeat", daemon=True).start()
+
+    def _interrupt_orphans(self, job_id=None):
+        # 대기/실행 중으로 남았지만 맡은 프로세스가 사라졌거나 생존 신호가 끊긴 작업을 'interrupted' 로 바꿉니다.
+        now = time.time()
+        sql = f"SELECT id, owner, COALESCE(heartbeat_at, updated_at) FROM jobs WHERE status IN ({', '.join('?' * len(ACTIVE_STATUSES))})"
+        params = list(ACTIVE_STATUSES)
+        if job_id is not None: sql, params = sql + " AND id = ?", params + [job_id]
+        with self._lock, self._conn:
+            orphans = [
+                row[0] for row in self._conn.execute(sql, params).fetchall()
+                if _owner_alive(row[1]) is False or row[2] < now - STALE_SECONDS
+            ]
+            self._conn.executemany(
+                f"UPDATE jobs SET status = ?, updated_at = ? WHERE id = ? AND status IN ({', '.join('?' * len(ACTIVE_STATUSES))})",
+                [(INTERRUPTED, now, orphan, *ACTIVE_STATUSES) for orphan in orphans]
+            )
+
+    def _heartbeat_loop(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            with self._lock: active = list(self._active)
+            if not active: continue
+            try:
+                with self._lock, self._conn:
+                    self._conn.executemany("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", [(time.time(), job_id) for job_id in active])
+            except sqlite3.Error: pass  # 잠깐 잠겨 있으면 다음 차례에 다시 보냅니다.
+
+    def _migrate(self):
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            for target, script in enumerate(_MIGRATIONS[version:], start=version + 1):
+                self._conn.executescript(script)
+                with self._conn: self._conn.execute(f"PRAGMA user_version = {target}")
+
+    def _update(self, job_id, **fields):
+        fields["updated_at"] = time.time()
+        if "result" in fields: fields["result"] = json.dumps(fields["result"], ensure_ascii=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE jobs SET {', '.join(f'{name} = ?' for name in fields)} WHERE id = ?", (*fields.values(), job_id)
+            )
+
+    # ── 작업 등록 / 조회 ──
+    def submit(self, kind, func, *args):
+        # func(report, *args) 를 백그라운드에서 실행합니다. 반환값(JSON 직렬화 가능)이 작업 결과가 됩니다.
+        # report(progress=None, message=None, result=None) 로 진행률/메시지/중간 결과를 남길 수 있습니다.
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, kind, status, created_at, updated_at, owner, heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, QUEUED, now, now, OWNER, now)
+            )
+            self._active.add(job_id)
+        self._pool.submit(self._run, job_id, func, args)
+        return job_id
+
+    def get(self, job_id):
+        # 다른 프로세스가 맡았던 작업이면 그 프로세스가 죽었는지 여기서 확인합니다. (그 프로세스는 스스로 표시할 수 없으므로)
+        with self._lock:
+            row = self._conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row and row[2] in ACTIVE_STATUSES and job_id not in self._active:
+            self._interrupt_orphans(job_id)
+            with self._lock:
+                row = self._conn.execute(f"SELECT {_JOB_COLUMNS} FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _row_to_job(row) if row else None
+
+    def _run(self, job_id, func, args):
+        self._update(job_id, status=RUNNING)
+
+        def report(progress=None, message=None, result=None):
+            fields = {}
+            if progress is not None: fields["progress"] = progress
+            if message is not None: fields["message"] = message
+            if result is not None: fields["result"] = result
+            if fields: self._update(job_id, **fields)
+
+        try:
+            result = func(report, *args)
+        except Exception as e:
+            # 실패해도 마지막으로 보고한 중간 결과는 그대로 남깁니다.
+            self._update(job_id, status=FAILED, error=str(e) or type(e).__name__)
+        else:
+            self._update(job_id, status=DONE, progress=1.0, result=result)
+        finally:
+            with self._lock: self._active.discard(job_id)
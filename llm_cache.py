@@ -0,0 +1,72 @@
+# ==========================================
+# Gemini 응답 캐시 (디스크, 내용 주소 기반)
+# ==========================================
+# 키 = sha256(모델명 + 프롬프트 템플릿 버전 + 프롬프트 전체). 프롬프트에 입력 자료가 들어 있으므로
+# 같은 정리본/족보로 다시 생성하면 API 를 부르지 않고 저장된 응답을 씁니다.
+# 전체 크기가 max_bytes 를 넘으면 가장 오래 쓰지 않은 파일부터 지웁니다. (파일 mtime = 마지막 사용 시각)
+import hashlib
+import os
+import tempfile
+import threading
+
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def cache_key(model, template_version, prompt):
+    h = hashlib.sha256()
+    for part in (model, template_version, prompt):
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._total_bytes = sum(entry.stat().st_size for entry in os.scandir(directory) if entry.name.endswith(".json"))
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                text = f.read()
+            os.utime(path)  # LRU 순서 갱신
+        except OSError:
+            with self._lock: self.stats["misses"] += 1
+            return None
+        with self._lock: self.stats["hits"] += 1
+        return text
+
+    def put(self, key, text):
+        path = self._path(key)
+        data = text.encode("utf-8")
+        # 임시 파일에 쓴 뒤 rename 하므로, 중간에 죽어도 반쯤 쓰인 응답이 캐시에 남지 않습니다.
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f: f.write(data)
+        with self._lock:
+            old_size = os.path.getsize(path) if os.path.exists(path) else 0
+            os.replace(tmp_path, path)
+            self._total_bytes += len(data) - old_size
+            if self._total_bytes > self.max_bytes: self._evict()
+
+    def _evict(self):
+        # 90% 까지 줄여서 매번 지우지 않도록 합니다.
+        entries = sorted(
+            (entry for entry in os.scandir(self.directory) if entry.name.endswith(".json")),
+            key=lambda entry: entry.stat().st_mtime
+        )
+        target = self.max_bytes * 0.9
+        for entry in entries:
+            if self._total_bytes <= target: break
+            size = entry.stat().st_size
+            try: os.remove(entry.path)
+            except OSError: continue
+            self._total_bytes -= size
+
@@ -0,0 +1,90 @@
+# ==========================================
+# 생성 결과 형식 (Gemini response_schema + 로컬 검사/보정)
+# ==========================================
+# response_schema 로 형식을 강제해도 응답이 잘리거나(출력 길이 한도) 필드가 빠진 문제가 가끔 섞입니다.
+# 여기서는 원소 하나하나를 검사해 고칠 수 있는 것은 고치고, 살릴 수 없는 것만 버립니다.
+# - 문제: 정답 번호가 숫자 문자열/원문자/보기 문장이면 번호로 바꾸고, 보기 앞의 원문자(①)는 떼고,
+#   보기가 5개를 넘으면 정답을 포함해 앞에서부터 5개만 남깁니다. 문제/보기/정답을 알 수 없으면 버립니다.
+# - 정리본 주제: key/value 가 있는 행만 남기고, 남는 행이 없으면 버립니다.
+# 버려서 모자란 문제 수는 generation.py 가 그만큼만 다시 요청합니다.
+from card_store import MAX_OPTIONS
+
+_CIRCLED = "①②③④⑤⑥⑦⑧⑨⑩"
+
+QUIZ_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "question": {"type": "STRING"},
+            "options": {"type": "ARRAY", "items": {"type": "STRING"}, "min_items": 2, "max_items": MAX_OPTIONS},
+            "correct_index": {"type": "INTEGER", "minimum": 0, "maximum": MAX_OPTIONS - 1},
+            "explanation": {"type": "STRING"},
+            "topic": {"type": "STRING"},
+        },
+        "required": ["question", "options", "correct_index", "explanation"],
+        "property_ordering": ["question", "options", "correct_index", "explanation", "topic"],
+    },
+}
+
+SUMMARY_SCHEMA = {
+    "type": "ARRAY",
+    "items": {
+        "type": "OBJECT",
+        "properties": {
+            "main_topic": {"type": "STRING"},
+            "sub_sections": {"type": "ARRAY", "items": {
+                "type": "OBJECT",
+                "properties": {"key": {"type": "STRING"}, "sub_key": {"type": "STRING", "nullable": True}, "value": {"type": "STRING"}},
+                "required": ["key", "value"],
+                "property_ordering": ["key", "sub_key", "value"],
+            }},
+        },
+        "required": ["main_topic", "sub_sections"],
+        "property_ordering": ["main_topic", "sub_sections"],
+    },
+}
+
+
+def _text(value):
+    return value.strip() if isinstance(value, str) else ("" if value is None else str(value).strip())
+
+
+def _answer_index(value, options):
+    # 정답 번호: 0부터 세는 정수(또는 그런 숫자 문자열), 원문자("③"), 보기 문장 그대로. 알 수 없으면 None
+    if isinstance(value, bool): return None
+    if isinstance(value, float) and value.is_integer(): value = int(value)
+    if isinstance(value, int): return value
+    if not isinstance(value, str): return None
+    text = value.strip()
+    if text[:1] and text[0] in _CIRCLED: return _CIRCLED.index(text[0])
+    if text.isascii() and text.isdigit(): return int(text)
+    return options.index(text) if text in options else None
+
+
+def clean_quiz(item):
+    # 문제 하나 → 보정한 dict (question/options/correct_index/explanation/topic), 살릴 수 없으면 None
+    if not isinstance(item, dict) or not isinstance(item.get("options"), list): return None
+    question = _text(item.get("question"))
+    options = [_text(option).lstrip(_CIRCLED).strip() for option in item["options"]]
+    answer = _answer_index(item.get("correct_index"), options)
+    if not question or answer is None or not 0 <= answer < len(options) or not options[answer]: return None
+    keep = [i for i, option in enumerate(options) if option]
+    if len(keep) > MAX_OPTIONS: keep = sorted([i for i in keep if i != answer][:MAX_OPTIONS - 1] + [answer])
+    if len(keep) < 2: return None
+    return {
+        "question": question, "options": [options[i] for i in keep], "correct_index": keep.index(answer),
+        "explanation": _text(item.get("explanation")), "topic": _text(item.get("topic"))
+    }
+
+
+def clean_summary_topic(item):
+    # 정리본 주제 하나 → key/value 가 있는 행만 남긴 dict, 남는 행이 없으면 None
+    if not isinstance(item, dict) or not isinstance(item.get("sub_sections"), list): return None
+    rows = [
+        {"key": _text(sub.get("key")), "sub_key": _text(sub.get("sub_key")), "value": _text(sub.get("value"))}
+        for sub in item["sub_sections"] if isinstance(sub, dict)
+    ]
+    rows = [row for row in rows if row["key"] and row["value"]]
+    if not rows: return None
+    return {"main_topic": _text(item.get("main_topic")), "sub_sections": rows}
@@ -0,0 +1,141 @@
+# ==========================================
+# 성능 계측 (구간 타이머 + 재실행별 기록 + Prometheus 텍스트 내보내기)
+# ==========================================
+# with perf.timer("extract", kind="pdf") as fields: ...  처럼 감싸면
+# - 프로세스 전체 누적값(횟수/합계/최대/구간 히스토그램)에 더하고
+# - 지금 스레드에서 Streamlit 재실행을 기록 중이면(begin_rerun ~ end_rerun) 그 재실행의 이벤트 목록에도 남기고
+# - AIDOCTOR_PERF_LOG 환경 변수에 경로가 있으면 이벤트를 JSON 한 줄씩 덧붙입니다.
+# fields 에 값을 넣으면(예: 프롬프트 글자/토큰 수) 이벤트와 함께 기록되고, 숫자 값은 누적 합계도 냅니다.
+# 백그라운드 작업 스레드의 이벤트는 재실행 기록에는 없고 누적값/로그에만 들어갑니다.
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+METRIC_PREFIX = "aidoctor"
+LOG_PATH = os.environ.get("AIDOCTOR_PERF_LOG")
+
+_lock = threading.Lock()
+_stats = {}  # (이름, 라벨 튜플) -> {"count", "sum", "max", "buckets", "fields"}
+_local = threading.local()
+
+
+def _labels_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def record(name, seconds, labels=None, fields=None):
+    labels, fields = labels or {}, fields or {}
+    key = (name, _labels_key(labels))
+    with _lock:
+        stat = _stats.get(key)
+        if stat is None: stat = _stats[key] = {"count": 0, "sum": 0.0, "max": 0.0, "buckets": [0] * len(BUCKETS), "fields": {}}
+        stat["count"] += 1
+        stat["sum"] += seconds
+        stat["max"] = max(stat["max"], seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound: stat["buckets"][i] += 1
+        for field, value in fields.items():
+            if isinstance(value, (int, float)) and not isinstance(value, bool): stat["fields"][field] = stat["fields"].get(field, 0) + value
+    event = {"name": name, "seconds": seconds, **labels, **fields}
+    trace = getattr(_local, "trace", None)
+    if trace is not None: trace.append(event)
+    if LOG_PATH:
+        line = json.dumps({"ts": time.time(), "thread": threading.current_thread().name, **event}, ensure_ascii=False, default=str)
+        with _lock, open(LOG_PATH, "a", encoding="utf-8") as f: f.write(line + "\n")
+
+
+@contextmanager
+def timer(name, **labels):
+    fields = {}
+    start = time.perf_counter()
+    try: yield fields
+    except Exception:
+        fields["error"] = True
+        raise
+    finally: record(name, time.perf_counter() - start, labels, fields)
+
+
+def timed(name, **labels):
+    # 함수 전체를 timer 로 감싸는 데코레이터
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with timer(name, **labels): return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+# ── 재실행 단위 기록 (Streamlit 스크립트 스레드) ──
+def begin_rerun():
+    _local.trace = []
+    _local.started = time.perf_counter()
+
+
+def end_rerun():
+    # 반환: (이번 재실행의 이벤트 목록, 재실행 전체 시간)
+    trace, started = getattr(_local, "trace", None), getattr(_local, "started", None)
+    _local.trace = None
+    if trace is None: return [], 0.0
+    seconds = time.perf_counter() - started
+    record("rerun", seconds)
+    return trace, seconds
+
+
+def summarize_events(events):
+    # 이벤트 목록 → 이름별 [(이름, 횟수, 합계 초)] (오래 걸린 순)
+    totals = {}
+    for event in events:
+        count, total = totals.get(event["name"], (0, 0.0))
+        totals[event["name"]] = (count + 1, total + event["seconds"])
+    return sorted(((name, count, total) for name, (count, total) in totals.items()), key=lambda row: -row[2])
+
+
+def snapshot():
+    # 누적값 복사본: [{"name", "labels", "count", "sum", "max", "fields"}]
+    with _lock:
+        return [
+            {"name": name, "labels": dict(labels), "count": s["count"], "sum": s["sum"], "max": s["max"], "fields": dict(s["fields"])}
+            for (name, labels), s in sorted(_stats.items())
+        ]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels: return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def prometheus_text():
+    # Prometheus 텍스트 형식: 구간별 소요 시간 히스토그램 + 숫자 필드 누적 카운터
+    metric = f"{METRIC_PREFIX}_operation_seconds"
+    lines = [f"# HELP {metric} 구간별 소요 시간", f"# TYPE {metric} histogram"]
+    counters = {}
+    with _lock:
+        for (name, labels), s in sorted(_stats.items()):
+            base = (("op", name),) + labels
+            for bound, count in zip(BUCKETS, s["buckets"]): lines.append(f"{metric}_bucket{_format_labels(base + (('le', bound),))} {count}")
+            lines.append(f"{metric}_bucket{_format_labels(base + (('le', '+Inf'),))} {s['count']}")
+            lines.append(f"{metric}_sum{_format_labels(base)} {s['sum']:.6f}")
+            lines.append(f"{metric}_count{_format_labels(base)} {s['count']}")
+            for field, value in s["fields"].items(): counters.setdefault(field, []).append((base, value))
+    for field, rows in sorted(counters.items()):
+        counter = f"{METRIC_PREFIX}_{field}_total"
+        lines += [f"# TYPE {counter} counter"] + [f"{counter}{_format_labels(base)} {value}" for base, value in rows]
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    # node_exporter textfile 수집기용. 임시 파일에 쓰고 이름을 바꿔 반쯤 쓴 파일이 읽히지 않게 합니다.
+    with open(path + ".tmp", "w", encoding="utf-8") as f: f.write(prometheus_text())
+    os.replace(path + ".tmp", path)
+
+
+def reset():
+    with _lock: _stats.clear()
@@ -0,0 +1,149 @@
+# ==========================================
+# 프롬프트 분량 맞추기 (토큰 예산 + 족보 관련도 순위)
+# ==========================================
+# 글자 수로 자르면 한국어 위주 자료와 영어 위주 자료의 토큰 수가 크게 달라지고, 문장/표 중간에서 잘립니다.
+# 여기서는 토큰 수를 문자 종류별로 추정해(필요하면 count_tokens 로 한 번 보정) 예산을 채우되,
+# 페이지(슬라이드/문단) 단위로만 넣습니다. 예산보다 긴 페이지만 문단 → 줄 → 문장 순으로 쪼갭니다.
+# 문제 출제용 구간은 족보와 겹치는 용어가 많은 단위(BM25 점수)부터 채우고, 구간 안에서는 원래 순서로 되돌립니다.
+import hashlib
+import math
+import re
+import threading
+from collections import Counter
+
+# 문자 종류별 토큰 추정치 (한글 음절 ≈ 0.7토큰, 한자/가나 ≈ 0.9토큰, 그 밖의 글자 ≈ 4글자당 1토큰)
+HANGUL_TOKENS = 0.7
+CJK_TOKENS = 0.9
+OTHER_TOKENS = 0.28
+CALIBRATION_SAMPLE_CHARS = 4000
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+_CJK = re.compile(r"[぀-ヿ㐀-鿿]")
+_SPACE = re.compile(r"\s")
+_WORD = re.compile(r"[0-9A-Za-z]+|[가-힣]+")
+_SENTENCE = re.compile(r"(?<=[.!?。])\s+")
+_scale_cache = {}
+_scale_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    hangul = len(_HANGUL.findall(text))
+    cjk = len(_CJK.findall(text))
+    other = len(text) - hangul - cjk - len(_SPACE.findall(text))
+    return math.ceil(hangul * HANGUL_TOKENS + cjk * CJK_TOKENS + other * OTHER_TOKENS)
+
+
+def calibrated_counter(client, model, texts):
+    # 입력 자료 표본을 count_tokens 로 한 번 세어 추정치 보정 배율을 구하고, 그 배율을 곱하는 함수를 돌려줍니다.
+    # 같은 표본은 프로세스 안에서 다시 묻지 않습니다. 호출이 실패하면 추정치를 그대로 씁니다.
+    sample = "\n".join(text[:CALIBRATION_SAMPLE_CHARS // max(len(texts), 1)] for text in texts if text)
+    if client is None or not sample.strip(): return estimate_tokens
+    key = hashlib.sha256(f"{model}\0{sample}".encode("utf-8")).hexdigest()
+    with _scale_lock: scale = _scale_cache.get(key)
+    if scale is None:
+        try: actual = client.models.count_tokens(model=model, contents=sample).total_tokens
+        except Exception: return estimate_tokens
+        scale = actual / max(estimate_tokens(sample), 1)
+        with _scale_lock: _scale_cache[key] = scale
+    return lambda text: math.ceil(estimate_tokens(text) * scale)
+
+
+def _split_oversized(text, max_tokens, count):
+    # 문단 → 줄 → 문장 경계로 나누고, 그래도 긴 조각은 글자 수 비율로 자릅니다.
+    for pattern in ("\n\n", "\n", _SENTENCE):
+        parts = [p for p in (text.split(pattern) if isinstance(pattern, str) else pattern.split(text)) if p.strip()]
+        if len(parts) > 1: break
+    else:
+        size = max(1, int(len(text) * max_tokens / max(count(text), 1)))
+        return [text[i:i + size] for i in range(0, len(text), size)]
+    units = []
+    for part in parts:
+        if count(part) > max_tokens: units.extend(_split_oversized(part, max_tokens, count))
+        else: units.append(part)
+    return units
+
+
+def split_units(pages, max_tokens, count=estimate_tokens):
+    # 페이지 목록 → [(텍스트, 토큰 수)]. 예산 안에 들어가는 페이지는 통째로 둡니다.
+    units = []
+    for page in pages:
+        if not page.strip(): continue
+        tokens = count(page)
+        if tokens <= max_tokens: units.append((page, tokens))
+        else: units.extend((piece, count(piece)) for piece in _split_oversized(page, max_tokens, count))
+    return units
+
+
+def chunk_pages(pages, max_tokens, count=estimate_tokens):
+    # 순서대로 max_tokens 이하 덩어리로 묶습니다. (정리본 생성처럼 자료 전체를 빠짐없이 보내야 할 때)
+    chunks, current, size = [], [], 0
+    for text, tokens in split_units(pages, max_tokens, count):
+        if current and size + tokens > max_tokens:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(text)
+        size += tokens
+    if current: chunks.append("\n".join(current))
+    return chunks
+
+
+def _terms(text):
+    # 검색어 단위: 영문/숫자 단어 + 한글 단어의 2글자 조각 (조사가 붙어도 겹치도록)
+    terms = []
+    for word in _WORD.findall(text.casefold()):
+        if len(word) > 2 and word[0] >= "가": terms.extend(word[i:i + 2] for i in range(len(word) - 1))
+        else: terms.append(word)
+    return terms
+
+
+def relevance_scores(texts, query):
+    # 각 텍스트의 query(족보) 관련도 (BM25). query 가 비어 있으면 모두 0
+    query_terms = set(_terms(query))
+    if not query_terms: return [0.0] * len(texts)
+    term_counts = [Counter(_terms(text)) for text in texts]
+    lengths = [sum(counts.values()) for counts in term_counts]
+    average = sum(lengths) / max(len(lengths), 1) or 1
+    document_freq = Counter(term for counts in term_counts for term in query_terms.intersection(counts))
+    n = len(texts)
+    idf = {term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_freq.items()}
+    scores = []
+    for counts, length in zip(term_counts, lengths):
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+        scores.append(sum(idf[t] * counts[t] * (BM25_K1 + 1) / (counts[t] + norm) for t in idf if t in counts))
+    return scores
+
+
+def pack_sections(pages, n_sections, max_tokens, query="", count=estimate_tokens, min_tokens=1500):
+    # 요청 n_sections 개에 나눠 줄 구간들. 구간 크기는 자료를 고르게 나눈 양(최소 min_tokens, 최대 max_tokens)입니다.
+    # 족보(query)와 관련도가 높은 단위부터 앞 구간을 채우고, 남는 자리에 들어갈 수 있는 더 작은 단위도 넣습니다.
+    units = split_units(pages, max_tokens, count)
+    if not units: return []
+    total = sum(tokens for _, tokens in units)
+    budget = min(max_tokens, max(min_tokens, -(-total // max(n_sections, 1))))
+    scores = relevance_scores([text for text, _ in units], query)
+    order = sorted(range(len(units)), key=lambda i: (-scores[i], i))
+    sections, sizes = [], []
+    for i in order:
+        tokens = units[i][1]
+        for s, size in enumerate(sizes):
+            if size + tokens <= budget:
+                sections[s].append(i)
+                sizes[s] += tokens
+                break
+        else:
+            sections.append([i])
+            sizes.append(tokens)
+    return ["\n".join(units[i][0] for i in sorted(section)) for section in sections]
+
+
+def fit_text(text, max_tokens, count=estimate_tokens):
+    # 앞에서부터 온전한 문단만 max_tokens 까지 담습니다. (족보처럼 앞부분이 곧 형식 예시인 자료)
+    if count(text) <= max_tokens: return text
+    kept, size = [], 0
+    for piece, tokens in split_units(text.split("\n"), max_tokens, count):
+        if size + tokens > max_tokens: break
+        kept.append(piece)
+        size += tokens
+    return "\n".join(kept)
@@ -0,0 +1,149 @@
+# ==========================================
+# 채점 기록 로그 (Parquet 세그먼트) + 학습 통계
+# ==========================================
+# 채점은 먼저 SQLite reviews 테이블(버퍼)에 카드 갱신과 같은 트랜잭션으로 들어갑니다. (card_store.py)
+# 버퍼가 COMPACT_ROWS 행을 넘으면 통째로 Parquet 파일(세그먼트) 하나로 옮기고 버퍼에서 지웁니다.
+#   review_log/reviews_<첫 id>_<마지막 id>.parquet  (id 범위가 파일 이름이라 어디까지 옮겼는지 파일만 보고 압니다)
+# 세그먼트가 MAX_SEGMENTS 개를 넘으면 하나로 합칩니다. 합친 뒤 옛 파일을 지우기 전에 죽어도 범위가 겹치는 파일은 무시합니다.
+# 통계는 필요한 컬럼만 덱 조건으로 읽어 pandas groupby 로 한 번에 계산하므로 기록이 수백만 건이어도 빠릅니다.
+import json
+import os
+import re
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import perf
+from card_store import REVIEW_COLUMNS
+from scheduler import GRADE_AGAIN
+
+COMPACT_ROWS = 2000
+MAX_SEGMENTS = 32
+MAX_DURATION_MS = 30 * 60 * 1000  # 창을 켜 두고 자리를 비운 경우는 30분으로 자릅니다.
+ANALYTICS_COLUMNS = ("reviewed_at", "grade", "elapsed_days", "source", "tags", "duration_ms")
+RETENTION_BINS = [0, 1, 2, 4, 8, 15, 31, 61, float("inf")]
+RETENTION_LABELS = ["당일", "1일", "2~3일", "4~7일", "8~14일", "15~30일", "31~60일", "61일 이상"]
+
+SCHEMA = pa.schema([
+    ("id", pa.int64()), ("card_id", pa.int64()), ("deck", pa.string()), ("reviewed_at", pa.timestamp("s")),
+    ("grade", pa.int8()), ("scheduler", pa.string()), ("elapsed_days", pa.int32()), ("interval", pa.int32()),
+    ("ease", pa.float64()), ("stability", pa.float64()), ("difficulty", pa.float64()),
+    ("source", pa.string()), ("tags", pa.string()), ("duration_ms", pa.int64())
+])
+_SEGMENT_NAME = re.compile(r"reviews_(\d+)_(\d+)\.parquet$")
+
+
+def _rows_to_frame(rows):
+    frame = pd.DataFrame(rows, columns=list(REVIEW_COLUMNS))
+    frame["reviewed_at"] = pd.to_datetime(frame["reviewed_at"], format="ISO8601").astype("datetime64[s]")
+    for column in ("elapsed_days", "duration_ms"): frame[column] = frame[column].astype("Int64")
+    return frame
+
+
+class ReviewLog:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _segments(self):
+        # [(첫 id, 마지막 id, 경로)] id 순. 다른 세그먼트 범위에 완전히 들어가는 파일(합치다 남은 것)은 뺍니다.
+        found = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_NAME.match(name)
+            if match: found.append((int(match.group(1)), int(match.group(2)), os.path.join(self.directory, name)))
+        found.sort(key=lambda s: (s[0], -s[1]))
+        segments = []
+        for segment in found:
+            if segments and segment[1] <= segments[-1][1]: continue
+            segments.append(segment)
+        return segments
+
+    def flushed_id(self):
+        segments = self._segments()
+        return max(s[1] for s in segments) if segments else 0
+
+    def version_key(self):
+        # 통계 캐시 키: 세그먼트 목록이 바뀌면 달라집니다.
+        return tuple(os.path.basename(s[2]) for s in self._segments())
+
+    def _write_table(self, table, first_id, last_id):
+        # 임시 파일에 다 쓴 뒤 이름을 바꾸므로 읽는 쪽이 쓰다 만 파일을 보지 않습니다.
+        path = os.path.join(self.directory, f"reviews_{first_id:012d}_{last_id:012d}.parquet")
+        pq.write_table(table, path + ".tmp", compression="zstd")
+        os.replace(path + ".tmp", path)
+
+    def _write_segment(self, rows):
+        table = pa.Table.from_pandas(_rows_to_frame(rows), schema=SCHEMA, preserve_index=False)
+        self._write_table(table, rows[0][0], rows[-1][0])
+        segments = self._segments()
+        if len(segments) > MAX_SEGMENTS: self._merge(segments)
+
+    def _merge(self, segments):
+        paths = [s[2] for s in segments]
+        self._write_table(ds.dataset(paths, format="parquet", schema=SCHEMA).to_table(), segments[0][0], segments[-1][1])
+        for path in paths: os.remove(path)
+
+    def maybe_compact(self, store, min_rows=COMPACT_ROWS):
+        # 버퍼가 min_rows 행 이상일 때만 옮깁니다. (매 채점마다 쓰기 트랜잭션을 열지 않도록 먼저 개수만 봅니다)
+        if store.pending_review_stats()[0] < min_rows: return 0
+        return store.compact_reviews(self._write_segment, self.flushed_id, min_rows)
+
+    @perf.timed("review_log.load")
+    def load(self, store, deck, columns=ANALYTICS_COLUMNS, card_ids=None):
+        # 덱의 전체 채점 기록 (세그먼트 + 아직 버퍼에 있는 행). 세그먼트는 columns 만 읽습니다.
+        # card_ids 를 주면 그 카드들의 기록만 읽습니다. (덱 내보내기처럼 카드 묶음 단위로 읽을 때)
+        condition = ds.field("deck") == deck
+        if card_ids is not None: condition &= ds.field("card_id").isin(list(card_ids))
+        for attempt in range(2):
+            segments = self._segments()
+            try:
+                table = ds.dataset([s[2] for s in segments], format="parquet", schema=SCHEMA).to_table(
+                    columns=list(columns), filter=condition
+                )
+                break
+            except FileNotFoundError:
+                if attempt: raise  # 다른 프로세스가 세그먼트를 합치는 중이었으면 목록을 다시 읽습니다.
+        flushed = max((s[1] for s in segments), default=0)
+        frames = [table.to_pandas()]
+        pending = store.pending_reviews(deck, after_id=flushed)
+        if pending:
+            pending = _rows_to_frame(pending)
+            if card_ids is not None: pending = pending[pending["card_id"].isin(list(card_ids))]
+            frames.append(pending[list(columns)])
+        frame = pd.concat(frames, ignore_index=True) if len(frames) > 1 else frames[0]
+        return frame.astype({"elapsed_days": "Int64", "duration_ms": "Int64"}) if len(frame) else frame
+
+
+@perf.timed("review_log.summarize")
+def summarize(frame):
+    # 통계: 전체 요약, 출처 문서별/태그별 정답률과 풀이 시간, 복습 간격별 기억률(망각 곡선), 날짜별 채점 수
+    if frame.empty: return None
+    frame = frame.assign(
+        correct=frame["grade"] > GRADE_AGAIN,
+        seconds=frame["duration_ms"].clip(upper=MAX_DURATION_MS).astype("Float64") / 1000
+    )
+    overview = {
+        "reviews": len(frame), "accuracy": float(frame["correct"].mean()),
+        "median_seconds": float(frame["seconds"].median()) if frame["seconds"].notna().any() else None
+    }
+
+    by_source = frame.groupby("source", sort=False).agg(
+        reviews=("correct", "size"), accuracy=("correct", "mean"), median_seconds=("seconds", "median")
+    ).sort_values("reviews", ascending=False)
+    by_source.index = by_source.index.where(by_source.index != "", "(출처 없음)")
+
+    # 태그 조합(JSON 문자열)은 종류가 적으므로 먼저 묶어서 센 다음, 묶음만 풀어 태그별로 다시 더합니다.
+    grouped = frame.groupby("tags", sort=False).agg(reviews=("correct", "size"), correct=("correct", "sum"))
+    grouped["tag"] = [json.loads(tags) for tags in grouped.index]
+    by_tag = grouped.explode("tag").dropna(subset=["tag"]).groupby("tag")[["reviews", "correct"]].sum()
+    by_tag["accuracy"] = by_tag["correct"] / by_tag["reviews"]
+    by_tag = by_tag.drop(columns="correct").sort_values("reviews", ascending=False)
+
+    reviewed = frame.dropna(subset=["elapsed_days"])
+    buckets = pd.cut(reviewed["elapsed_days"].astype("float64"), RETENTION_BINS, right=False, labels=RETENTION_LABELS)
+    retention = reviewed.groupby(buckets, observed=False)["correct"].agg(["size", "mean"]).rename(columns={"size": "reviews", "mean": "recall"})
+
+    daily = frame.groupby(frame["reviewed_at"].dt.floor("D")).agg(reviews=("correct", "size"), accuracy=("correct", "mean"))
+    return {"overview": overview, "by_source": by_source, "by_tag": by_tag, "retention": retention, "daily": daily}
@@ -0,0 +1,154 @@
+# ==========================================
+# 복습 일정 계산 (SM-2 / FSRS) + 복습량 예측
+# ==========================================
+# 스케줄러는 카드의 현재 상태와 채점 결과(grade)를 받아 다음 상태를 돌려줍니다.
+#   grade: 1 = 다시(틀림), 2 = 어려움, 3 = 알맞음, 4 = 쉬움
+#   상태: interval(일), ease, stability, difficulty, reps(연속 정답), lapses(틀린 횟수), last_review, next_review
+# 새 알고리즘은 같은 review() 를 가진 클래스를 만들어 SCHEDULERS 에 등록하면 됩니다.
+# 다음 복습일은 간격의 ±5% 안에서 이미 잡힌 복습이 가장 적은 날로 골라, 특정 날짜에 복습이 몰리지 않게 합니다.
+import math
+from datetime import date, timedelta
+
+import numpy as np
+
+import perf
+
+GRADE_AGAIN, GRADE_HARD, GRADE_GOOD, GRADE_EASY = 1, 2, 3, 4
+DEFAULT_EASE = 2.5
+MIN_EASE = 1.3
+MAX_INTERVAL = 3650
+FUZZ_RATIO = 0.05
+FORECAST_DAYS = 90
+
+
+def _parse_date(value):
+    if isinstance(value, date): return value
+    try: return date.fromisoformat(str(value)[:10])
+    except ValueError: return None
+
+
+def _elapsed_days(card, today):
+    last = _parse_date(card.get("last_review"))
+    if last is None: return max(card.get("interval") or 1, 1)  # 기록이 없으면 예정대로 복습했다고 봅니다.
+    return max((today - last).days, 0)
+
+
+def pick_due_date(today, interval, load=None):
+    # interval 일 뒤 근처에서 복습이 가장 적게 잡힌 날을 고릅니다. load(start, end) -> {"YYYY-MM-DD": 개수}
+    interval = int(min(max(round(interval), 1), MAX_INTERVAL))
+    spread = int(round(interval * FUZZ_RATIO)) if interval >= 3 else 0
+    if not spread or load is None: return today + timedelta(days=interval)
+    start, end = today + timedelta(days=interval - spread), today + timedelta(days=interval + spread)
+    counts = load(start.isoformat(), end.isoformat())
+    candidates = [today + timedelta(days=d) for d in range(interval - spread, interval + spread + 1)]
+    return min(candidates, key=lambda day: (counts.get(day.isoformat(), 0), abs((day - today).days - interval)))
+
+
+class SM2Scheduler:
+    # SuperMemo-2: 맞히면 간격 × ease, 틀리면 1일부터 다시. ease 는 등급에 따라 조정
+    # 연속 정답 첫 회는 원래 SM-2(1일) 대신 이전 앱과 같은 간격 × 2 + 1 을 씁니다. (새 카드 3일)
+    # reps 가 없던 이전 카드도 쌓아 둔 간격을 이어가고, 1일로 되돌아가지 않습니다.
+    name = "sm2"
+    label = "SM-2"
+
+    def review(self, card, grade, today, load=None):
+        ease = card.get("ease") or DEFAULT_EASE
+        reps, lapses = card.get("reps") or 0, card.get("lapses") or 0
+        interval = card.get("interval") or 1
+        if grade == GRADE_AGAIN:
+            reps, lapses, interval = 0, lapses + 1, 1
+            ease = max(MIN_EASE, ease - 0.2)
+        else:
+            quality = grade + 1  # SM-2 원래 등급(0~5) 중 3~5 에 대응
+            reps += 1
+            if reps == 1: interval = interval * 2 + 1
+            else: interval = interval * ease * (1.3 if grade == GRADE_EASY else 1.0)
+            ease = max(MIN_EASE, ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+        due = pick_due_date(today, interval, load)
+        return {
+            "interval": (due - today).days, "ease": ease, "stability": card.get("stability"), "difficulty": card.get("difficulty"),
+            "reps": reps, "lapses": lapses, "last_review": today.isoformat(), "next_review": due.isoformat()
+        }
+
+
+class FSRSScheduler:
+    # FSRS(v4.5 기본 가중치): 기억 안정도(stability, 일)와 난이도(difficulty, 1~10)로 망각 곡선을 추적하고,
+    # 목표 기억률(desired_retention)까지 떨어지는 시점을 다음 복습일로 잡습니다.
+    name = "fsrs"
+    label = "FSRS"
+    W = (0.4872, 1.4003, 3.7145, 13.8206, 5.1618, 1.2298, 0.8975, 0.031, 1.6474, 0.1367,
+         1.0461, 2.1072, 0.0793, 0.3246, 1.587, 0.2272, 2.8755)
+    DECAY = -0.5
+    FACTOR = 19 / 81
+
+    def __init__(self, desired_retention=0.9):
+        self.desired_retention = desired_retention
+
+    def _init_difficulty(self, grade):
+        return min(max(self.W[4] - (grade - 3) * self.W[5], 1.0), 10.0)
+
+    def _retrievability(self, elapsed, stability):
+        return (1 + self.FACTOR * elapsed / stability) ** self.DECAY
+
+    def _interval(self, stability):
+        return stability / self.FACTOR * (self.desired_retention ** (1 / self.DECAY) - 1)
+
+    def review(self, card, grade, today, load=None):
+        w = self.W
+        reps, lapses = card.get("reps") or 0, card.get("lapses") or 0
+        stability, difficulty = card.get("stability"), card.get("difficulty")
+        if stability is None and reps == 0 and (card.get("interval") or 1) <= 1:
+            # 처음 보는 카드
+            stability, difficulty = w[grade - 1], self._init_difficulty(grade)
+        else:
+            if stability is None:
+                # 이전 방식(간격만 있음)으로 복습하던 카드는 현재 간격을 안정도로 보고 시작합니다.
+                stability, difficulty = max(float(card.get("interval") or 1), 0.1), self._init_difficulty(GRADE_GOOD)
+            r = self._retrievability(_elapsed_days(card, today), stability)
+            difficulty = difficulty - w[6] * (grade - 3)
+            difficulty = min(max(w[7] * self._init_difficulty(GRADE_GOOD) + (1 - w[7]) * difficulty, 1.0), 10.0)
+            if grade == GRADE_AGAIN:
+                stability = w[11] * difficulty ** -w[12] * ((stability + 1) ** w[13] - 1) * math.exp(w[14] * (1 - r))
+            else:
+                hard_penalty = w[15] if grade == GRADE_HARD else 1.0
+                easy_bonus = w[16] if grade == GRADE_EASY else 1.0
+                stability = stability * (1 + math.exp(w[8]) * (11 - difficulty) * stability ** -w[9]
+                                         * (math.exp(w[10] * (1 - r)) - 1) * hard_penalty * easy_bonus)
+        if grade == GRADE_AGAIN: reps, lapses = 0, lapses + 1
+        else: reps += 1
+        due = pick_due_date(today, self._interval(stability), load)
+        return {
+            "interval": (due - today).days, "ease": card.get("ease") or DEFAULT_EASE, "stability": stability, "difficulty": difficulty,
+            "reps": reps, "lapses": lapses, "last_review": today.isoformat(), "next_review": due.isoformat()
+        }
+
+
+SCHEDULERS = {scheduler.name: scheduler for scheduler in (SM2Scheduler(), FSRSScheduler())}
+DEFAULT_SCHEDULER = "sm2"
+
+
+def get_scheduler(name):
+    return SCHEDULERS.get(name) or SCHEDULERS[DEFAULT_SCHEDULER]
+
+
+@perf.timed("forecast")
+def forecast_due(rows, today, days=FORECAST_DAYS):
+    # 앞으로 days 일 동안 날짜별 복습 예정 카드 수 (덱 전체를 numpy 배열로 한 번에 계산)
+    # rows: (next_review, interval, ease) 목록. 밀린 카드는 오늘로 셉니다.
+    # 기간 안에 다시 돌아오는 복습도 세며, 그때는 매번 맞힌다고 보고 간격 × ease 로 늘립니다.
+    import pandas as pd  # 예측 화면을 열 때만 필요하므로 여기서 불러옵니다. (앱 시작 시간)
+    frame = pd.DataFrame(rows, columns=["next_review", "interval", "ease"])
+    offsets = (pd.to_datetime(frame["next_review"], format="%Y-%m-%d", errors="coerce") - pd.Timestamp(today)).dt.days
+    due = np.maximum(offsets.fillna(0).to_numpy(dtype=np.float64), 0)
+    interval = np.maximum(frame["interval"].fillna(1).to_numpy(dtype=np.float64), 1)
+    ease = frame["ease"].fillna(DEFAULT_EASE).to_numpy(dtype=np.float64)
+    counts = np.zeros(days, dtype=np.int64)
+    active = due < days
+    due, interval, ease = due[active], interval[active], ease[active]
+    while due.size:
+        counts += np.bincount(due.astype(np.int64), minlength=days)
+        interval = np.minimum(interval * ease, MAX_INTERVAL)
+        due = due + np.maximum(np.round(interval), 1)
+        active = due < days
+        due, interval, ease = due[active], interval[active], ease[active]
+    return pd.Series(counts, index=pd.date_range(today, periods=days, freq="D"), name="복습 예정")
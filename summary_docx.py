@@ -0,0 +1,185 @@
+# ==========================================
+# 통합 표 정리본 워드(DOCX) 렌더링
+# ==========================================
+# 주제가 수백 개여도 빠르게 만들 수 있도록 표 부분은 python-docx 의 셀 API 를 거치지 않습니다.
+# - 글꼴/굵기/색은 문서에 한 번 정의한 문자 스타일로 지정하고, 각 run 은 스타일 이름만 참조합니다.
+# - 색상 태그는 미리 컴파일한 정규식 한 번으로 나눕니다.
+# - 표의 행(w:tr)은 문자열로 한꺼번에 만든 뒤 한 번에 파싱해서 본문에 붙입니다.
+#   (셀 병합도 merge() 대신 gridSpan / vMerge 를 직접 씁니다)
+# 결과 문서는 이전 렌더러와 내용·서식이 같습니다. (benchmarks/bench_summary_docx.py 로 비교)
+import re
+from io import BytesIO
+from xml.sax.saxutils import escape
+
+from docx import Document as DocxDocument
+from docx.enum.style import WD_STYLE_TYPE
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_COLOR_INDEX
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls, qn
+from docx.shared import Cm, Pt, RGBColor
+from lxml import etree
+
+import perf
+
+FONT_NAME = '맑은 고딕'
+KEY_CELL_WIDTH = Cm(2.5).twips
+ROW_HEIGHT = Cm(1.5).twips
+CELL_SPACING = Pt(6).twips
+
+# 색상 태그: 여는 태그와 닫는 태그 색이 다르면(예: <yellow>..</blue>) 태그째 일반 글자로 둡니다.
+_TAG_PATTERN = re.compile(r'<(yellow|blue|gray)>(.*?)</(yellow|blue|gray)>')
+_TEXT_PIECES = re.compile(r'([\t\r\n])')
+_INVALID_XML_CHARS = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+# 문자 스타일 id -> (기반 스타일, 굵게, 색, 크기pt)
+_CHAR_STYLES = {
+    "SummaryText": (None, False, None, 9),
+    "SummaryTopic": ("SummaryText", True, RGBColor(255, 255, 255), 10),
+    "SummaryKey": ("SummaryText", True, None, None),
+    "SummaryRelated": ("SummaryText", True, RGBColor(0x19, 0x71, 0xC2), None),
+    "SummaryUnrelated": ("SummaryText", False, RGBColor(0xAD, 0xB5, 0xBD), None),
+}
+_TAG_RUN_PROPS = {
+    'yellow': '<w:rPr><w:rStyle w:val="SummaryText"/><w:highlight w:val="yellow"/></w:rPr>',
+    'blue': '<w:rPr><w:rStyle w:val="SummaryRelated"/></w:rPr>',
+    'gray': '<w:rPr><w:rStyle w:val="SummaryUnrelated"/></w:rPr>',
+}
+_PLAIN_RUN_PROPS = '<w:rPr><w:rStyle w:val="SummaryText"/></w:rPr>'
+_CENTER_PPR = '<w:pPr><w:jc w:val="center"/></w:pPr>'
+_VALUE_PPR = f'<w:pPr><w:spacing w:line="240" w:lineRule="auto" w:before="{CELL_SPACING}" w:after="{CELL_SPACING}"/></w:pPr>'
+
+
+def set_font_style(run, font_name=FONT_NAME, font_size=9, is_bold=False):
+    run.font.name = font_name
+    run.font.size = Pt(font_size)
+    run.bold = is_bold
+    run._element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), font_name)
+
+
+def _add_char_styles(doc):
+    for style_id, (base, bold, color, size) in _CHAR_STYLES.items():
+        style = doc.styles.add_style(style_id, WD_STYLE_TYPE.CHARACTER)
+        if base: style.base_style = doc.styles[base]
+        else:
+            style.font.name = FONT_NAME
+            style.element.get_or_add_rPr().get_or_add_rFonts().set(qn('w:eastAsia'), FONT_NAME)
+        style.font.bold = bold
+        if color is not None: style.font.color.rgb = color
+        if size is not None: style.font.size = Pt(size)
+
+
+def _run_xml(text, run_props):
+    # python-docx 의 run.text 와 같은 규칙: 탭 -> w:tab, 줄바꿈 -> w:br, 앞뒤 공백이 있으면 xml:space="preserve"
+    parts = [run_props]
+    for piece in _TEXT_PIECES.split(_INVALID_XML_CHARS.sub('', text)):
+        if not piece: continue
+        if piece == '\t': parts.append('<w:tab/>')
+        elif piece in '\r\n': parts.append('<w:br/>')
+        else:
+            space = ' xml:space="preserve"' if len(piece.strip()) < len(piece) else ''
+            parts.append(f'<w:t{space}>{escape(piece)}</w:t>')
+    return f"<w:r>{''.join(parts)}</w:r>"
+
+
+def _content_runs(content):
+    runs, pos = [], 0
+    for match in _TAG_PATTERN.finditer(content):
+        if match.start() > pos: runs.append(_run_xml(content[pos:match.start()], _PLAIN_RUN_PROPS))
+        if match.group(1) == match.group(3): runs.append(_run_xml(match.group(2), _TAG_RUN_PROPS[match.group(1)]))
+        else: runs.append(_run_xml(match.group(0), _PLAIN_RUN_PROPS))
+        pos = match.end()
+    if pos < len(content): runs.append(_run_xml(content[pos:], _PLAIN_RUN_PROPS))
+    return ''.join(runs)
+
+
+def _tc(width, body, span=None, v_merge=None, fill=None, center=True):
+    props = [f'<w:tcW w:type="dxa" w:w="{width}"/>']
+    if span: props.append(f'<w:gridSpan w:val="{span}"/>')
+    if v_merge == 'restart': props.append('<w:vMerge w:val="restart"/>')
+    elif v_merge == 'continue': props.append('<w:vMerge/>')
+    if fill: props.append(f'<w:shd w:fill="{fill}"/>')
+    if center: props.append('<w:vAlign w:val="center"/>')
+    return f"<w:tc><w:tcPr>{''.join(props)}</w:tcPr>{body}</w:tc>"
+
+
+def _label_paragraph(text, style_id):
+    run_props = f'<w:rPr><w:rStyle w:val="{style_id}"/></w:rPr>'
+    return f'<w:p>{_CENTER_PPR}{_run_xml(text, run_props)}</w:p>'
+
+
+def _topic_rows(main_topic, sub_sections, col_width):
+    # 메인 주제 행 (3칸 병합)
+    rows = [f'<w:tr>{_tc(col_width * 3, _label_paragraph(main_topic, "SummaryTopic"), span=3, fill="495057", center=False)}</w:tr>']
+    # 1열(소주제)은 같은 값이 이어지면 세로 병합하므로, 다음 행을 보고 restart 여부를 정합니다.
+    keys = [sub.get('key', '') for sub in sub_sections]
+    last_key = None
+    for i, sub in enumerate(sub_sections):
+        key, sub_key, content = keys[i], sub.get('sub_key', ''), sub.get('value', '')
+        if key == last_key and i > 0:
+            cells = [_tc(col_width, '<w:p/>', v_merge='continue', center=False)]
+        else:
+            continues = i + 1 < len(keys) and keys[i + 1] == key
+            cells = [_tc(KEY_CELL_WIDTH, _label_paragraph(key or '', "SummaryKey"), v_merge='restart' if continues else None, fill="E9ECEF")]
+            last_key = key
+        value_paragraph = f'<w:p>{_VALUE_PPR}{_content_runs(content or "")}</w:p>'
+        if sub_key and sub_key.strip():
+            cells.append(_tc(KEY_CELL_WIDTH, _label_paragraph(sub_key, "SummaryKey"), fill="F8F9FA"))
+            cells.append(_tc(col_width, value_paragraph))
+        else:
+            cells.append(_tc(col_width * 2, value_paragraph, span=2))
+        rows.append(f'<w:tr><w:trPr><w:trHeight w:hRule="atLeast" w:val="{ROW_HEIGHT}"/></w:trPr>{"".join(cells)}</w:tr>')
+    return ''.join(rows)
+
+
+def render_summary_docx(summary_data):
+    # summary_data(주제별 JSON) -> .docx 파일 바이트
+    with perf.timer("export.docx") as fields:
+        data = _render_summary_docx(summary_data)
+        fields.update(topics=len(summary_data), bytes=len(data))
+    return data
+
+
+def _render_summary_docx(summary_data):
+    doc_out = DocxDocument()
+    _add_char_styles(doc_out)
+
+    # [제목]
+    title = doc_out.add_heading('의대 강의/족보 통합 정리본', level=0)
+    title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    set_font_style(title.runs[0], font_size=16, is_bold=True)
+
+    # [범례]
+    legend = doc_out.add_paragraph()
+    legend.alignment = WD_ALIGN_PARAGRAPH.CENTER
+    run_y = legend.add_run('■ 정답  ')
+    set_font_style(run_y, font_size=9)
+    run_y.font.highlight_color = WD_COLOR_INDEX.YELLOW
+    run_b = legend.add_run('■ 관련 오답  ')
+    set_font_style(run_b, font_size=9)
+    run_b.font.color.rgb = RGBColor(0x19, 0x71, 0xC2)
+    run_g = legend.add_run('■ 무관 오답')
+    set_font_style(run_g, font_size=9)
+    run_g.font.color.rgb = RGBColor(0xAD, 0xB5, 0xBD)
+    doc_out.add_paragraph()
+
+    # 표 머리(tblPr/tblGrid)는 python-docx 로 한 번 만든 3열 표에서 복사해 씁니다.
+    template = doc_out.add_table(rows=0, cols=3)
+    template.style = 'Table Grid'
+    tbl_head = ''.join(etree.tostring(child, encoding='unicode') for child in template._tbl)
+    col_width = int(template._tbl.tblGrid.gridCol_lst[0].get(qn('w:w')))
+    template._tbl.getparent().remove(template._tbl)
+
+    blocks = []
+    for item in summary_data:
+        sub_sections = item.get('sub_sections', [])
+        if not sub_sections: continue
+        blocks.append(f"<w:tbl>{tbl_head}{_topic_rows(item.get('main_topic', '') or '', sub_sections, col_width)}</w:tbl><w:p/>")
+
+    if blocks:
+        fragment = parse_xml(f"<w:body {nsdecls('w')}>{''.join(blocks)}</w:body>")
+        sect_pr = doc_out.element.body.sectPr
+        for element in list(fragment): sect_pr.addprevious(element)
+
+    bio = BytesIO()
+    doc_out.save(bio)
+    return bio.getvalue()
@@ -0,0 +1,6 @@
+# 테스트는 저장소 최상위 모듈(generation.py 등)을 그대로 불러옵니다. (benchmarks/ 와 같은 방식)
+# 사용법: python -m pytest -q
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,37 @@
+# ==========================================
+# 비슷한 문제 찾기 (card_dedup.is_duplicate, CardStore.add_cards 의 중복 건너뛰기)
+# ==========================================
+from card_dedup import DUPLICATE_THRESHOLD, is_duplicate, jaccard, shingles
+from card_store import CardStore
+
+HAV = {"question": "급성 A형 간염의 진단에 가장 유용한 검사는?", "options": ["IgM anti-HAV", "HBsAg", "anti-HCV"], "correct_index": 0}
+# 말만 바꾸고 보기 순서를 섞은 같은 문제 (정답 같음)
+HAV_PARAPHRASE = {"question": "급성 A형 간염 진단에 가장 유용한 검사는 무엇인가?", "options": ["HBsAg", "IgM anti-HAV", "anti-HCV"], "correct_index": 1}
+# 같은 보기를 쓰는 다른 문제 (정답 다름)
+HBV = {"question": "급성 B형 간염의 진단에 가장 유용한 검사는?", "options": ["IgM anti-HAV", "HBsAg", "anti-HCV"], "correct_index": 1}
+
+
+def test_paraphrase_with_same_answer_is_duplicate():
+    assert jaccard(shingles(HAV), shingles(HAV_PARAPHRASE)) >= DUPLICATE_THRESHOLD
+    assert is_duplicate(HAV, HAV_PARAPHRASE)
+
+
+def test_different_answer_is_not_duplicate():
+    assert not is_duplicate(HAV, HBV)
+    assert not is_duplicate(HAV, {**HAV, "correct_index": 1})  # 문제가 같아도 정답이 다르면 다른 카드
+
+
+def test_add_cards_skips_duplicate_and_keeps_distinct(tmp_path):
+    store = CardStore(str(tmp_path / "cards.db"))
+    store.add_card(HAV)
+    skipped = []
+    assert store.add_cards([HAV_PARAPHRASE, HBV], skipped=skipped) == 1
+    assert skipped == [{"question": HAV_PARAPHRASE["question"], "similar_to": HAV["question"]}]
+    assert store.add_cards([HAV_PARAPHRASE], deck="다른 덱") == 1  # 덱마다 따로 검사합니다.
+
+
+def test_add_cards_skips_duplicate_within_batch(tmp_path):
+    store = CardStore(str(tmp_path / "cards.db"))
+    skipped = []
+    assert store.add_cards([HAV, HAV_PARAPHRASE], skipped=skipped) == 1
+    assert [item["question"] for item in skipped] == [HAV_PARAPHRASE["question"]]
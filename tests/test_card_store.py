@@ -0,0 +1,95 @@
+# ==========================================
+# 카드 저장소 (card_store.CardStore): 마이그레이션, 기존 JSON 이전, 낙관적 잠금
+# ==========================================
+import json
+import sqlite3
+from datetime import date
+
+import pytest
+
+from card_store import _MIGRATIONS, CardStore, _statements
+from scheduler import GRADE_GOOD, SM2Scheduler
+
+TODAY = date(2026, 3, 2)
+CARD = {"question": "급성 A형 간염의 진단에 가장 유용한 검사는?", "options": ["IgM anti-HAV", "HBsAg", "anti-HCV"], "correct_index": 0}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "cards.db")
+
+
+def user_version(path):
+    with sqlite3.connect(path) as conn: return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+# ── 마이그레이션 ──
+def test_new_database_gets_latest_schema(db_path):
+    CardStore(db_path)
+    assert user_version(db_path) == len(_MIGRATIONS) == 7
+
+
+def test_upgrade_from_first_schema_keeps_cards(db_path):
+    # 1번 스키마만 있던 DB 의 카드가 기본 덱으로 옮겨지고 중복 검사용 서명/버킷도 채워집니다.
+    conn = sqlite3.connect(db_path)
+    for statement in _statements(_MIGRATIONS[0]): conn.execute(statement)
+    conn.execute(
+        "INSERT INTO cards (question, options, correct_index, explanation, next_review, interval) VALUES (?, ?, ?, '', '2026-01-01', 7)",
+        (CARD["question"], json.dumps(CARD["options"]), CARD["correct_index"])
+    )
+    conn.execute("PRAGMA user_version = 1")
+    conn.commit()
+    conn.close()
+
+    store = CardStore(db_path)
+    assert user_version(db_path) == len(_MIGRATIONS)
+    [card] = [card for batch in store.iter_cards() for card in batch]
+    assert (card["question"], card["interval"], card["version"]) == (CARD["question"], 7, 1)
+    assert store.add_cards([CARD]) == 0  # 옮겨온 카드도 중복 검사에 걸립니다.
+
+
+def test_reopening_does_not_migrate_again(db_path):
+    CardStore(db_path).add_card(CARD)
+    store = CardStore(db_path)
+    assert user_version(db_path) == len(_MIGRATIONS)
+    assert sum(len(batch) for batch in store.iter_cards()) == 1
+
+
+# ── 기존 JSON 이전 ──
+def test_legacy_json_import_skips_malformed_cards(db_path, tmp_path):
+    legacy = tmp_path / "medical_flashcards.json"
+    bad = [{"question": "정답 번호 없음", "options": ["a", "b"]}, {**CARD, "correct_index": 5}, "문제"]
+    legacy.write_text(json.dumps([CARD, *bad], ensure_ascii=False), encoding="utf-8")
+    store = CardStore(db_path, legacy_json_path=str(legacy))
+    assert store.legacy_import == {"cards": 1, "skipped": 3}
+    assert [card["question"] for batch in store.iter_cards() for card in batch] == [CARD["question"]]
+    assert CardStore(db_path, legacy_json_path=str(legacy)).legacy_import is None  # 한 번만 옮깁니다.
+
+
+def test_broken_legacy_json_is_ignored(db_path, tmp_path):
+    legacy = tmp_path / "medical_flashcards.json"
+    legacy.write_text("[{", encoding="utf-8")
+    store = CardStore(db_path, legacy_json_path=str(legacy))
+    assert store.legacy_import is None and user_version(db_path) == len(_MIGRATIONS)
+
+
+# ── 낙관적 잠금 ──
+def test_record_review_rejects_stale_version(db_path):
+    first, second = CardStore(db_path), CardStore(db_path)  # 같은 파일을 연 두 세션
+    card_id = first.add_card(CARD)
+    stale = second.get_card(card_id)
+    scheduler = SM2Scheduler()
+    card = first.get_card(card_id)
+    assert first.record_review(card_id, scheduler.review(card, GRADE_GOOD, TODAY), GRADE_GOOD, "sm2", expected_version=card["version"])
+
+    assert not second.record_review(card_id, scheduler.review(stale, GRADE_GOOD, TODAY), GRADE_GOOD, "sm2",
+                                    expected_version=stale["version"])
+    saved = second.get_card(card_id)
+    assert saved["version"] == card["version"] + 1 and saved["reps"] == 1
+    assert second.pending_review_stats()[0] == 1  # 거절된 채점은 기록도 남기지 않습니다.
+
+
+def test_record_review_missing_card(db_path):
+    store = CardStore(db_path)
+    state = SM2Scheduler().review(CARD, GRADE_GOOD, TODAY)
+    assert not store.record_review(12345, state, GRADE_GOOD, "sm2")
@@ -0,0 +1,68 @@
+# ==========================================
+# 백그라운드 작업 큐 (job_queue.JobQueue): 끊긴 작업 표시(_interrupt_orphans)
+# ==========================================
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from job_queue import _HOST, DONE, INTERRUPTED, OWNER, RUNNING, STALE_SECONDS, JobQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / "jobs.db")
+
+
+def dead_pid():
+    proc = subprocess.Popen([sys.executable, "-c", "pass"])
+    proc.wait()
+    return proc.pid
+
+
+def insert_job(queue, job_id, owner, heartbeat_at, status=RUNNING):
+    now = time.time()
+    with queue._conn:
+        queue._conn.execute(
+            "INSERT INTO jobs (id, kind, status, created_at, updated_at, owner, heartbeat_at) VALUES (?, 'quiz', ?, ?, ?, ?, ?)",
+            (job_id, status, now, heartbeat_at or now - 2 * STALE_SECONDS, owner, heartbeat_at)
+        )
+
+
+def wait_for(queue, job_id, status, seconds=5):
+    deadline = time.time() + seconds
+    while queue.get(job_id)["status"] != status and time.time() < deadline: time.sleep(0.01)
+    return queue.get(job_id)["status"]
+
+
+def test_orphans_are_interrupted_on_start(db_path):
+    queue = JobQueue(db_path)
+    now = time.time()
+    insert_job(queue, "legacy", None, None)                                 # 생존 신호 기록이 없던 예전 작업
+    insert_job(queue, "dead", f"{_HOST}:{dead_pid()}:abcd1234", now)        # 같은 호스트에서 사라진 프로세스
+    insert_job(queue, "stale", "other-host:123:abcd1234", now - 2 * STALE_SECONDS)
+    insert_job(queue, "remote", "other-host:123:abcd1234", now)            # 다른 호스트, 생존 신호 최근
+    insert_job(queue, "finished", None, None, status=DONE)
+
+    JobQueue(db_path)
+    status = {job_id: queue.get(job_id)["status"] for job_id in ("legacy", "dead", "stale", "remote", "finished")}
+    assert status == {"legacy": INTERRUPTED, "dead": INTERRUPTED, "stale": INTERRUPTED, "remote": RUNNING, "finished": DONE}
+
+
+def test_new_queue_in_same_process_keeps_running_job(db_path):
+    # st.cache_resource.clear() 등으로 같은 프로세스에서 큐를 새로 만들어도 돌고 있는 작업은 그대로입니다.
+    queue, release = JobQueue(db_path), threading.Event()
+    job_id = queue.submit("quiz", lambda report: release.wait(5) and "끝")
+    assert wait_for(queue, job_id, RUNNING) == RUNNING
+    other = JobQueue(db_path)
+    assert other.get(job_id)["status"] == RUNNING and other.get(job_id)["owner"] == OWNER
+    release.set()
+    assert wait_for(other, job_id, DONE) == DONE and other.get(job_id)["result"] == "끝"
+
+
+def test_get_interrupts_job_of_dead_process(db_path):
+    queue = JobQueue(db_path)
+    insert_job(queue, "dead", f"{_HOST}:{dead_pid()}:abcd1234", time.time())
+    assert queue.get("dead")["status"] == INTERRUPTED
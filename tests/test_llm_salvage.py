@@ -0,0 +1,156 @@
+# ==========================================
+# 생성 응답 구제/보정 (generation.salvage_json_array, JsonArrayStreamParser, generate_quiz_batch, llm_schema.clean_quiz)
+# ==========================================
+import json
+
+import pytest
+
+from generation import JsonArrayStreamParser, generate_quiz_batch, parse_quiz_response, salvage_json_array
+from llm_schema import clean_quiz
+
+QUIZ = {"question": "갑상샘중독증의 1차 치료제는?", "options": ["methimazole", "PTU", "propranolol"], "correct_index": 0, "explanation": "해설"}
+
+
+def quiz(**fields):
+    return {**QUIZ, **fields}
+
+
+# ── salvage_json_array ──
+def test_fenced_output():
+    assert salvage_json_array('```json\n[{"a": 1}, {"a": 2}]\n```') == ([{"a": 1}, {"a": 2}], True)
+    assert salvage_json_array('```\n[{"a": 1}]\n```') == ([{"a": 1}], True)
+
+
+def test_wrapped_array():
+    assert salvage_json_array('{"questions": [{"a": 1}, {"a": 2}]}') == ([{"a": 1}, {"a": 2}], True)
+
+
+def test_single_object_becomes_list():
+    assert salvage_json_array('{"a": 1, "b": 2}') == ([{"a": 1, "b": 2}], True)
+
+
+@pytest.mark.parametrize("text", [
+    '[{"a": 1}, {"a": 2}, {"question": "잘린 문',                      # 문자열 중간
+    '[{"a": 1}, {"a": 2}, {"options": ["x", "y',                        # 안쪽 배열 중간
+    '[{"a": 1}, {"a": 2}, {"question": "q", "correct_index": 1,',      # 객체 중간
+    '```json\n[{"a": 1}, {"a": 2}, {"b": {"c": [1, 2',                  # 코드 블록 + 중첩 객체 중간
+])
+def test_truncated_keeps_complete_items(text):
+    assert salvage_json_array(text) == ([{"a": 1}, {"a": 2}], False)
+
+
+def test_truncated_with_nothing_to_salvage_raises():
+    with pytest.raises(json.JSONDecodeError):
+        salvage_json_array('[{"question": "잘린')
+
+
+def test_broken_middle_item_is_skipped():
+    assert salvage_json_array('[{"a": 1}, {"b": tru}, {"c": 3}]') == ([{"a": 1}, {"c": 3}], False)
+
+
+# ── JsonArrayStreamParser ──
+def test_stream_parser_across_chunks():
+    text = json.dumps([{"q": "괄호 ] } 와 \"따옴표\" 가 든 문자열", "options": ["[", "{"]}, {"q": "둘째"}], ensure_ascii=False)
+    parser, items = JsonArrayStreamParser(), []
+    for i in range(0, len(text), 3): items += parser.feed(text[i:i + 3])
+    assert items == json.loads(text)
+
+
+def test_stream_parser_skip_invalid():
+    parser = JsonArrayStreamParser(skip_invalid=True)
+    assert parser.feed('[{"a": 1}, {"b": tru}, {"c": 3}]') == [{"a": 1}, {"c": 3}]
+    assert parser.skipped == 1
+    with pytest.raises(json.JSONDecodeError):
+        JsonArrayStreamParser().feed('[{"b": tru}]')
+
+
+# ── clean_quiz ──
+@pytest.mark.parametrize("answer, expected", [
+    (1, 1), (1.0, 1), ("2", 2), ("②", 1), ("③ propranolol", 2), ("PTU", 1), ("  methimazole ", 0),
+])
+def test_answer_forms(answer, expected):
+    assert clean_quiz(quiz(correct_index=answer))["correct_index"] == expected
+
+
+@pytest.mark.parametrize("answer", [None, True, 3, -1, "④", "없는 보기", "1.5", [0]])
+def test_unusable_answer(answer):
+    assert clean_quiz(quiz(correct_index=answer)) is None
+
+
+def test_missing_correct_index():
+    item = dict(QUIZ)
+    del item["correct_index"]
+    assert clean_quiz(item) is None
+
+
+def test_circled_option_prefixes_are_removed():
+    cleaned = clean_quiz(quiz(options=["① methimazole", "②PTU", " ③ propranolol "]))
+    assert cleaned["options"] == ["methimazole", "PTU", "propranolol"]
+
+
+def test_more_than_five_options_keeps_answer():
+    options = [f"보기{i}" for i in range(7)]
+    cleaned = clean_quiz(quiz(options=options, correct_index=6))
+    assert cleaned["options"] == ["보기0", "보기1", "보기2", "보기3", "보기6"]
+    assert cleaned["correct_index"] == 4
+    cleaned = clean_quiz(quiz(options=options, correct_index=1))
+    assert cleaned["options"] == ["보기0", "보기1", "보기2", "보기3", "보기4"] and cleaned["correct_index"] == 1
+
+
+def test_empty_options_are_dropped():
+    cleaned = clean_quiz(quiz(options=["", "methimazole", " ", "PTU"], correct_index=3))
+    assert cleaned["options"] == ["methimazole", "PTU"] and cleaned["correct_index"] == 1
+    assert clean_quiz(quiz(options=["methimazole", ""], correct_index=0)) is None
+
+
+@pytest.mark.parametrize("item", [None, "문제", {"question": "q"}, quiz(question="  "), quiz(options="methimazole, PTU")])
+def test_malformed_items(item):
+    assert clean_quiz(item) is None
+
+
+# ── parse_quiz_response ──
+def test_parse_quiz_response_complete():
+    quizzes, complete = parse_quiz_response(json.dumps([QUIZ, quiz(correct_index="②")], ensure_ascii=False))
+    assert complete and [q["correct_index"] for q in quizzes] == [0, 1]
+
+
+def test_parse_quiz_response_drops_bad_items():
+    bad = dict(QUIZ)
+    del bad["correct_index"]
+    quizzes, complete = parse_quiz_response(json.dumps([QUIZ, bad], ensure_ascii=False))
+    assert not complete and len(quizzes) == 1
+
+
+def test_parse_quiz_response_truncated():
+    text = json.dumps([QUIZ, QUIZ], ensure_ascii=False)
+    quizzes, complete = parse_quiz_response(text[:-20])
+    assert not complete and len(quizzes) == 1
+
+
+# ── generate_quiz_batch: 모자란 개수만 다시 요청하고, 끝내 모자라면 stats["shortfall"] 에 남김 ──
+class CannedClient:
+    # 정해 둔 응답을 차례로 돌려주는 genai.Client 대역
+    def __init__(self, *texts):
+        self.texts, self.prompts = list(texts), []
+        self.models = self
+
+    def generate_content(self, model, contents, config=None):
+        self.prompts.append(contents)
+        return type("Response", (), {"text": self.texts.pop(0), "usage_metadata": None})()
+
+
+def test_generate_quiz_batch_tops_up_missing():
+    bad = dict(QUIZ)
+    del bad["correct_index"]
+    client = CannedClient(json.dumps([QUIZ, bad, bad]), json.dumps([quiz(question="둘째"), quiz(question="셋째")]))
+    stats = {}
+    assert len(generate_quiz_batch(client, "m", "정리본", "", 3, stats=stats)) == 3
+    assert "객관식 문제 2개" in client.prompts[1] and QUIZ["question"] in client.prompts[1]
+    assert "shortfall" not in stats
+
+
+def test_generate_quiz_batch_reports_shortfall():
+    client = CannedClient(json.dumps([QUIZ]), "[]")
+    stats = {}
+    assert len(generate_quiz_batch(client, "m", "정리본", "", 3, stats=stats)) == 1
+    assert stats == {"shortfall": 2}
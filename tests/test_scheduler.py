@@ -0,0 +1,63 @@
+# ==========================================
+# 복습 일정 계산 (scheduler.SM2Scheduler, FSRSScheduler, pick_due_date)
+# ==========================================
+from datetime import date, timedelta
+
+import pytest
+
+from scheduler import GRADE_AGAIN, GRADE_GOOD, FSRSScheduler, SM2Scheduler, pick_due_date
+
+TODAY = date(2026, 3, 2)
+NEW_CARD = {"interval": 1}
+
+
+# ── SM-2 ──
+def test_sm2_first_correct_keeps_previous_app_interval():
+    state = SM2Scheduler().review(NEW_CARD, GRADE_GOOD, TODAY)
+    assert state["interval"] == 3 and state["reps"] == 1
+    assert state["next_review"] == (TODAY + timedelta(days=3)).isoformat()
+
+
+def test_sm2_second_correct_multiplies_by_ease():
+    scheduler = SM2Scheduler()
+    first = scheduler.review(NEW_CARD, GRADE_GOOD, TODAY)
+    second = scheduler.review(first, GRADE_GOOD, TODAY)
+    assert first["ease"] == pytest.approx(2.5) and second["interval"] == 8
+
+
+def test_sm2_legacy_card_continues_interval():
+    # reps 가 없던 이전 카드(간격 31일)는 1일로 돌아가지 않고 이전 앱처럼 간격 × 2 + 1
+    assert SM2Scheduler().review({"interval": 31}, GRADE_GOOD, TODAY)["interval"] == 63
+
+
+def test_sm2_again_resets():
+    state = SM2Scheduler().review({"interval": 20, "reps": 3, "ease": 2.5}, GRADE_AGAIN, TODAY)
+    assert (state["interval"], state["reps"], state["lapses"]) == (1, 0, 1)
+    assert state["ease"] == pytest.approx(2.3)
+
+
+# ── FSRS ──
+def test_fsrs_new_card_interval_is_initial_stability():
+    # 목표 기억률 90% 에서는 다음 간격이 안정도와 같습니다. (알맞음 초기 안정도 3.7145일 → 4일)
+    state = FSRSScheduler().review(NEW_CARD, GRADE_GOOD, TODAY)
+    assert state["stability"] == pytest.approx(FSRSScheduler.W[2])
+    assert state["interval"] == 4
+
+
+def test_fsrs_on_time_review_grows_stability():
+    scheduler = FSRSScheduler()
+    first = scheduler.review(NEW_CARD, GRADE_GOOD, TODAY)
+    second = scheduler.review(first, GRADE_GOOD, TODAY + timedelta(days=first["interval"]))
+    assert second["stability"] > first["stability"] and second["interval"] > first["interval"]
+
+
+# ── pick_due_date: 간격 ±5% 안에서 복습이 가장 적은 날 ──
+def test_pick_due_date_avoids_busy_days():
+    busy = {(TODAY + timedelta(days=d)).isoformat(): 5 for d in range(38, 43)}
+    busy[(TODAY + timedelta(days=39)).isoformat()] = 1
+    assert pick_due_date(TODAY, 40, lambda start, end: busy) == TODAY + timedelta(days=39)
+
+
+def test_pick_due_date_prefers_exact_interval_on_ties():
+    assert pick_due_date(TODAY, 40, lambda start, end: {}) == TODAY + timedelta(days=40)
+    assert pick_due_date(TODAY, 2, lambda start, end: {}) == TODAY + timedelta(days=2)